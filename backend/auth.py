@@ -6,7 +6,7 @@ from typing import Optional
 
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthCredentials
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 
 from .config import settings
@@ -50,7 +50,7 @@ def create_access_token(
 
 
 async def verify_token(
-    credentials: HTTPAuthCredentials = Depends(security),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> TokenData:
     """Verify JWT token and return token data."""
     token = credentials.credentials
@@ -91,8 +91,8 @@ async def get_current_user(
     return token_data
 
 
-async def require_role(role: str):
-    """Dependency: require specific role."""
+def require_role(role: str):
+    """Dependency factory: require specific role (Depends(require_role("admin")))."""
     async def _check_role(current_user: TokenData = Depends(get_current_user)) -> TokenData:
         if current_user.role != role:
             raise HTTPException(
@@ -0,0 +1,395 @@
+"""
+Decision-engine benchmark suite.
+
+Generates policy sets of increasing size (policies x actions x roles x assessment
+types), seeded from the nine corpus policies in datasets/policies_corpus and the
+scenarios in sample_test_data.py, and measures decide() throughput, p50/p99
+latency and memory per compiled policy, the same for the API's entry point
+f(policies, ctx, action) end to end (context conversion, linear decision), the cost of encoding full-trace
+decisions as JSON responses (FastAPI's jsonable_encoder path vs serialization.py),
+and the registry's load of stored policy rows from their compiled snapshots vs
+validating every row's PolicyJSON content.
+
+Usage:
+    python backend/benchmarks/bench_enforcement.py [--quick] [--output PATH] [--no-check]
+
+Results are written as JSON. Limits live in thresholds.json next to this file;
+the script exits with status 1 when any measured value crosses its limit.
+"""
+
+import argparse
+import gc
+import json
+import random
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+REPO_ROOT = BACKEND_DIR.parent
+for _path in (str(REPO_ROOT), str(BACKEND_DIR)):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from backend.models import (  # noqa: E402
+    ActionsConfig, AllowedAction, AssessmentPhase, Base, GovernanceContext, LoggingConfig, Policy,
+    PolicyJSON, PolicyMetadata, PolicyScope, ProhibitedAction, RoleDefinition, TraceLevel,
+)
+from backend.governance_middleware.decision_cache import decision_cache  # noqa: E402
+from backend.governance_middleware.enforcement import CompiledPolicySet, decide, f  # noqa: E402
+from backend.governance_middleware.registry import PolicyRegistry  # noqa: E402
+from backend.policy_compiler.snapshots import snapshot_columns  # noqa: E402
+from backend.governance_middleware.serialization import dumps  # noqa: E402
+from backend.sample_test_data import SAMPLE_POLICIES, SYNTHETIC_TEST_SCENARIOS  # noqa: E402
+
+CORPUS_DIR = REPO_ROOT / "datasets" / "policies_corpus" / "policies_parsed"
+THRESHOLDS_FILE = Path(__file__).with_name("thresholds.json")
+DEFAULT_OUTPUT = Path(__file__).with_name("results") / "enforcement.json"
+
+# (policies, actions per policy, roles, assessment types)
+SCALES: List[Tuple[int, int, int, int]] = [
+    (10, 8, 2, 2),
+    (100, 16, 3, 3),
+    (500, 24, 3, 4),
+    (1000, 32, 4, 5),
+]
+QUICK_SCALES = SCALES[:2]
+
+# Full-trace decisions encoded per scale
+ENCODE_SAMPLES = 2000
+
+# Loads of the stored policy set timed per scale (median reported)
+LOAD_REPEATS = 5
+LOAD_COURSE = "BENCH"
+
+ROLES = ["student", "ta", "instructor", "auditor", "researcher"]
+ASSESSMENT_TYPES = ["problem_set", "project", "exam", "assignment", "peer_review", "lab_report"]
+PHASES = [p.value for p in AssessmentPhase]
+
+_ALLOWED_KEYS = ("allowed", "permitted")
+_PROHIBITED_KEYS = ("prohibited", "impermissible")
+_LABEL_KEYS = ("use_case", "use", "category", "activity", "practice", "prohibition", "violation")
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")[:40]
+
+
+def _labels(entries: Iterable[Any]) -> List[str]:
+    labels = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            label = next((entry[k] for k in _LABEL_KEYS if isinstance(entry.get(k), str)), None)
+            if label:
+                labels.append(_slug(label))
+    return labels
+
+
+def _walk_uses(node: Any, allowed: List[str], prohibited: List[str]) -> None:
+    if not isinstance(node, dict):
+        return
+    for key, value in node.items():
+        if isinstance(value, list) and key.startswith(_ALLOWED_KEYS):
+            allowed.extend(_labels(value))
+        elif isinstance(value, list) and key.startswith(_PROHIBITED_KEYS):
+            prohibited.extend(_labels(value))
+        elif isinstance(value, dict):
+            _walk_uses(value, allowed, prohibited)
+
+
+def load_seeds() -> List[Tuple[str, List[str], List[str]]]:
+    """(source, allowed actions, prohibited actions) from the corpus and sample policies."""
+    seeds = []
+    for path in sorted(CORPUS_DIR.glob("*.json")):
+        allowed: List[str] = []
+        prohibited: List[str] = []
+        _walk_uses(json.loads(path.read_text(encoding="utf-8")), allowed, prohibited)
+        seeds.append((path.stem, allowed, prohibited))
+    for sample in SAMPLE_POLICIES:
+        seeds.append((sample["policy_id"], list(sample["allowed_actions"]), list(sample["prohibited_actions"])))
+    return seeds
+
+
+def _pad(actions: List[str], n: int, suffix: str) -> List[str]:
+    out = list(dict.fromkeys(actions))[:n]
+    i = 0
+    while len(out) < n:
+        out.append(f"{actions[i % len(actions)] if actions else 'action'}_{suffix}{i}")
+        i += 1
+    return out
+
+
+def build_policy_set(n_policies: int, n_actions: int, n_roles: int, n_types: int,
+                     seeds: List[Tuple[str, List[str], List[str]]]) -> List[PolicyJSON]:
+    roles = ROLES[:n_roles]
+    types = ASSESSMENT_TYPES[:n_types]
+    now = datetime(2025, 9, 1)
+    policies = []
+    for i in range(n_policies):
+        source, allowed_seed, prohibited_seed = seeds[i % len(seeds)]
+        n_prohibited = max(1, n_actions * len(prohibited_seed) // max(1, len(allowed_seed) + len(prohibited_seed)))
+        allowed = _pad(allowed_seed, n_actions - n_prohibited, "a")
+        prohibited = _pad(prohibited_seed, n_prohibited, "p")
+        policies.append(PolicyJSON(
+            policy_id=f"bench_{source}_{i}",
+            institution_id=source,
+            course_id=f"C{i:04d}",
+            academic_year="2025-2026",
+            created_at=now,
+            effective_from=now,
+            version="1.0",
+            metadata=PolicyMetadata(title=source, author_id="bench", description="benchmark policy"),
+            scope=PolicyScope(
+                applies_to=["students"],
+                assessment_types=types,
+                assessment_phases=PHASES,
+                roles=[RoleDefinition(role=r, description=r) for r in roles],
+                course_id=f"C{i:04d}",
+            ),
+            actions=ActionsConfig(
+                allowed_actions=[
+                    AllowedAction(
+                        action=a, description=a, applies_to_roles=roles, applies_to_assessment_types=types,
+                        applies_to_assessment_phases=PHASES, disclosure_required=(j % 2 == 0),
+                        disclosure_format="inline_comment" if j % 2 == 0 else None,
+                    )
+                    for j, a in enumerate(allowed)
+                ],
+                prohibited_actions=[
+                    ProhibitedAction(
+                        action=a, description=a, applies_to_roles=roles[:1], applies_to_assessment_types=types,
+                        applies_to_assessment_phases=PHASES,
+                    )
+                    for a in prohibited
+                ],
+            ),
+            disclosure_requirements=[],
+            logging=LoggingConfig(),
+        ))
+    return policies
+
+
+def build_contexts(policies: List[PolicyJSON], n: int, rng: random.Random) -> List[GovernanceContext]:
+    """Random in-scope contexts plus the synthetic test scenarios."""
+    contexts = [
+        GovernanceContext(
+            course_id=s["course_id"], actor_role="student", action=s["action"],
+            assessment_type=s["assessment"], assessment_phase=s["phase"],
+            actor_id_pseudonym=s["student_pseudonym"],
+        )
+        for s in SYNTHETIC_TEST_SCENARIOS
+    ]
+    while len(contexts) < n:
+        p = rng.choice(policies)
+        rules = p.actions.allowed_actions + p.actions.prohibited_actions
+        contexts.append(GovernanceContext(
+            course_id=p.course_id,
+            actor_role=rng.choice(p.scope.roles).role,
+            action=rng.choice(rules).action if rng.random() < 0.9 else "unlisted_action",
+            assessment_type=rng.choice(p.scope.assessment_types),
+            assessment_phase=rng.choice(PHASES),
+            actor_id_pseudonym=f"stu_{rng.randrange(10_000):05d}",
+        ))
+    return contexts
+
+
+def _latency_stats(samples_ns: List[int], total_s: float) -> Dict[str, float]:
+    ordered = sorted(samples_ns)
+    return {
+        "decisions": len(ordered),
+        "throughput_per_s": round(len(ordered) / total_s, 1),
+        "p50_us": round(ordered[len(ordered) // 2] / 1000, 2),
+        "p99_us": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] / 1000, 2),
+        "mean_us": round(statistics.fmean(ordered) / 1000, 2),
+    }
+
+
+def _time_calls(fn, contexts: List[GovernanceContext]) -> Dict[str, float]:
+    samples = []
+    clock = time.perf_counter_ns
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for ctx in contexts:
+            t0 = clock()
+            fn(ctx)
+            samples.append(clock() - t0)
+        total = time.perf_counter() - start
+    finally:
+        gc.enable()
+    return _latency_stats(samples, total)
+
+
+def _median_ms(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return round(statistics.median(samples) * 1000, 2)
+
+
+def time_policy_load(policies: List[PolicyJSON], repeats: int = LOAD_REPEATS) -> Dict[str, float]:
+    """
+    Loading the stored set from a database as the registry does (snapshots, rows
+    without content) vs validating each row's content into PolicyJSON first.
+    """
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        for p in policies:
+            db.add(Policy(
+                policy_id=p.policy_id, institution_id=p.institution_id, course_id=LOAD_COURSE,
+                version=p.version, created_at=p.created_at, effective_from=p.effective_from,
+                **snapshot_columns(p),
+            ))
+        db.commit()
+
+    def from_snapshots():
+        with Session() as db:
+            PolicyRegistry().get(LOAD_COURSE, db)
+
+    def validating():
+        with Session() as db:
+            rows = db.query(Policy).filter(Policy.course_id == LOAD_COURSE).order_by(
+                Policy.effective_from, Policy.policy_id
+            ).all()
+            CompiledPolicySet([PolicyJSON.model_validate(row.content) for row in rows])
+
+    snapshot_ms = _median_ms(from_snapshots, repeats)
+    validate_ms = _median_ms(validating, repeats)
+    engine.dispose()
+    decision_cache.invalidate()
+    return {
+        "snapshot_ms": snapshot_ms,
+        "validate_ms": validate_ms,
+        "speedup": round(validate_ms / snapshot_ms, 2) if snapshot_ms else 0.0,
+    }
+
+
+def run_scale(n_policies: int, n_actions: int, n_roles: int, n_types: int, n_contexts: int,
+              seeds, rng: random.Random) -> Dict[str, Any]:
+    policies = build_policy_set(n_policies, n_actions, n_roles, n_types, seeds)
+    contexts = build_contexts(policies, n_contexts, rng)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    compiled = CompiledPolicySet(policies)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    index_bytes = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    start = time.perf_counter()
+    compiled = CompiledPolicySet(policies)
+    build_s = time.perf_counter() - start
+
+    decision_cache.invalidate()
+    cold = _time_calls(compiled.decide, contexts)
+    warm = _time_calls(compiled.decide, contexts)
+    # What the evaluate routes call with a request's policies; the first call compiles the set
+    f(policies, contexts[0], contexts[0].action)
+    end_to_end = _time_calls(lambda ctx: f(policies, ctx, ctx.action), contexts)
+    reference_contexts = contexts[: max(50, n_contexts // max(1, n_policies // 10))]
+    reference = _time_calls(lambda ctx: decide(policies, ctx), reference_contexts)
+
+    decisions = [compiled.decide(ctx, TraceLevel.FULL) for ctx in contexts[:ENCODE_SAMPLES]]
+    encode_default = _time_calls(lambda d: JSONResponse(jsonable_encoder(d)).body, decisions)
+    encode_fast = _time_calls(dumps, decisions)
+    policy_load = time_policy_load(policies)
+
+    return {
+        "name": f"p{n_policies}_a{n_actions}_r{n_roles}_t{n_types}",
+        "policies": n_policies,
+        "actions_per_policy": n_actions,
+        "roles": n_roles,
+        "assessment_types": n_types,
+        "build_ms": round(build_s * 1000, 2),
+        "memory_per_policy_kb": round(index_bytes / n_policies / 1024, 2),
+        "compiled_cold": cold,
+        "compiled_warm": warm,
+        "end_to_end": end_to_end,
+        "reference_linear": reference,
+        "encode_default": encode_default,
+        "encode_fast": encode_fast,
+        "policy_load": policy_load,
+        "decision_cache": decision_cache.stats(),
+    }
+
+
+def check_thresholds(results: List[Dict[str, Any]], thresholds: Dict[str, Dict[str, float]]) -> List[str]:
+    """Return human-readable regressions; empty when every limit holds."""
+    failures = []
+    for result in results:
+        limits = thresholds.get(result["name"], {})
+        for metric, limit in limits.items():
+            section, _, field = metric.rpartition(".")
+            value = result[section][field] if section else result[field]
+            if field.startswith(("throughput", "speedup")):
+                failed = value < limit
+            else:
+                failed = value > limit
+            if failed:
+                failures.append(f"{result['name']}: {metric}={value} (limit {limit})")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true", help="only the two smallest scales")
+    parser.add_argument("--contexts", type=int, default=5000, help="contexts evaluated per scale")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--thresholds", type=Path, default=THRESHOLDS_FILE)
+    parser.add_argument("--no-check", action="store_true", help="record results without enforcing thresholds")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    seeds = load_seeds()
+    results = []
+    for scale in (QUICK_SCALES if args.quick else SCALES):
+        result = run_scale(*scale, n_contexts=args.contexts, seeds=seeds, rng=rng)
+        results.append(result)
+        print(
+            f"{result['name']:<22} build {result['build_ms']:>9.1f} ms  "
+            f"mem {result['memory_per_policy_kb']:>7.1f} KB/policy  "
+            f"warm {result['compiled_warm']['throughput_per_s']:>10.0f}/s "
+            f"p50 {result['compiled_warm']['p50_us']:>6.1f}us p99 {result['compiled_warm']['p99_us']:>7.1f}us  "
+            f"f() p99 {result['end_to_end']['p99_us']:>7.1f}us  "
+            f"linear p99 {result['reference_linear']['p99_us']:>9.1f}us  "
+            f"encode p50 {result['encode_default']['p50_us']:>6.1f}us -> {result['encode_fast']['p50_us']:>5.1f}us  "
+            f"load {result['policy_load']['validate_ms']:>8.1f} -> {result['policy_load']['snapshot_ms']:>7.1f} ms"
+        )
+
+    thresholds = json.loads(args.thresholds.read_text()) if args.thresholds.exists() else {}
+    failures = [] if args.no_check else check_thresholds(results, thresholds)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps({
+        "benchmark": "enforcement",
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": sys.version.split()[0],
+        "seed": args.seed,
+        "results": results,
+        "regressions": failures,
+    }, indent=2))
+    print(f"Results written to {args.output}")
+
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
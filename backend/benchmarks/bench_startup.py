@@ -0,0 +1,202 @@
+"""
+Cold-start benchmark for the API process.
+
+Workers are autoscaled during exam windows, so the time from spawning a worker to
+its first answered request matters as much as steady-state throughput. Each run
+starts a fresh interpreter and measures:
+- import_main_ms: importing main (python -X importtime, summed self time)
+- first_request_ms: spawn of `uvicorn main:app` until GET /health answers
+- first_api_request_ms: spawn until the first governance route answers
+and records which lazily loaded subsystems (copilot, replay, ingest, Redis client,
+the heavy optional packages) were imported at startup; any of them counts as a regression.
+
+Usage:
+    python backend/benchmarks/bench_startup.py [--runs N] [--output PATH] [--no-check]
+
+Limits live under "startup" in thresholds.json; the script exits with status 1
+when a median crosses its limit.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+REPO_ROOT = BACKEND_DIR.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from backend.scripts.import_report import profile_import  # noqa: E402
+
+THRESHOLDS_FILE = Path(__file__).with_name("thresholds.json")
+DEFAULT_OUTPUT = Path(__file__).with_name("results") / "startup.json"
+
+# Loaded on first use only; importing main must not pull these in
+DEFERRED_MODULES = [
+    "rag_copilot",
+    "governance_middleware.replay",
+    "transparency_ledger.ingest",
+    "redis",
+    "openai",
+    "langchain",
+    "pandas",
+    "numpy",
+]
+FIRST_API_PATH = "/api/v1/policy/decision-cache"
+STARTUP_TIMEOUT_S = 60.0
+
+
+def _env(database_url: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({"DATABASE_URL": database_url, "DEBUG": "false", "SHARED_CACHE_ENABLED": "false"})
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url: str, deadline: float, proc: subprocess.Popen) -> None:
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {proc.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=1.0) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.005)
+    raise RuntimeError(f"no answer from {url} within {STARTUP_TIMEOUT_S}s")
+
+
+def time_to_first_request(env: Dict[str, str]) -> Dict[str, float]:
+    """Spawn one uvicorn worker the way entrypoint.sh does and time its first answers."""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.monotonic()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    try:
+        deadline = started + STARTUP_TIMEOUT_S
+        _wait_for(f"{base}/health", deadline, proc)
+        first = time.monotonic()
+        _wait_for(f"{base}{FIRST_API_PATH}", deadline, proc)
+        api = time.monotonic()
+    except RuntimeError:
+        proc.kill()
+        raise RuntimeError(proc.communicate()[1].decode("utf-8", "replace")[-2000:])
+    finally:
+        if proc.poll() is None:
+            proc.terminate()
+            proc.wait(timeout=10)
+    return {
+        "first_request_ms": (first - started) * 1000,
+        "first_api_request_ms": (api - started) * 1000,
+    }
+
+
+def deferred_modules_loaded(env: Dict[str, str]) -> List[str]:
+    probe = "import json, sys, main; print(json.dumps(sorted(sys.modules)))"
+    out = subprocess.run(
+        [sys.executable, "-c", probe], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    loaded = json.loads(out.splitlines()[-1])
+    return sorted({
+        deferred for deferred in DEFERRED_MODULES for name in loaded
+        if name == deferred or name.startswith(deferred + ".") or name.endswith("." + deferred)
+    })
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(statistics.median(samples), 1),
+        "min_ms": round(min(samples), 1),
+        "max_ms": round(max(samples), 1),
+    }
+
+
+def run(runs: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env(f"sqlite:///{Path(tmp) / 'bench_startup.db'}")
+        time_to_first_request(env)  # warm-up: bytecode caches, page cache
+        imports, first, api = [], [], []
+        for _ in range(runs):
+            rows = profile_import("main")
+            imports.append(sum(row["self_us"] for row in rows) / 1000)
+            timings = time_to_first_request(env)
+            first.append(timings["first_request_ms"])
+            api.append(timings["first_api_request_ms"])
+        return {
+            "name": "startup",
+            "runs": runs,
+            "import_main": _summary(imports),
+            "first_request": _summary(first),
+            "first_api_request": _summary(api),
+            "deferred_loaded": deferred_modules_loaded(env),
+        }
+
+
+def check_thresholds(result: Dict[str, Any], thresholds: Dict[str, Dict[str, float]]) -> List[str]:
+    """Return human-readable regressions; empty when every limit holds."""
+    failures = [f"startup: {name} imported at startup" for name in result["deferred_loaded"]]
+    for metric, limit in thresholds.get(result["name"], {}).items():
+        section, _, field = metric.rpartition(".")
+        value = result[section][field]
+        if value > limit:
+            failures.append(f"{result['name']}: {metric}={value} (limit {limit})")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="cold starts measured (after one warm-up)")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--thresholds", type=Path, default=THRESHOLDS_FILE)
+    parser.add_argument("--no-check", action="store_true", help="record results without enforcing thresholds")
+    args = parser.parse_args(argv)
+
+    result = run(args.runs)
+    print(
+        f"import main p50 {result['import_main']['p50_ms']:>7.1f} ms  "
+        f"first request p50 {result['first_request']['p50_ms']:>7.1f} ms "
+        f"(max {result['first_request']['max_ms']:.1f})  "
+        f"first API request p50 {result['first_api_request']['p50_ms']:>7.1f} ms  "
+        f"deferred loaded: {', '.join(result['deferred_loaded']) or 'none'}"
+    )
+
+    thresholds = json.loads(args.thresholds.read_text()) if args.thresholds.exists() else {}
+    failures = [] if args.no_check else check_thresholds(result, thresholds)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps({
+        "benchmark": "startup",
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": sys.version.split()[0],
+        "results": [result],
+        "regressions": failures,
+    }, indent=2))
+    print(f"Results written to {args.output}")
+
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
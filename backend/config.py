@@ -71,11 +71,64 @@ class Settings(BaseSettings):
 
     # Governance Settings
     log_retention_days: int = Field(default=90, description="Log retention period in days")
+    retention_sweep_chunk_size: int = Field(default=5000, description="Rows per chunk when sweeping expired logs")
+    retention_sweep_pause_seconds: float = Field(default=0.05, description="Pause between retention sweep chunks")
     pseudonym_rotation_days: int = Field(default=30, description="Pseudonym rotation period")
     enable_detailed_traces: bool = Field(
         default=True,
         description="Enable detailed governance decision traces"
     )
+    decision_cache_size: int = Field(default=10000, description="Max cached decisions (0 disables)")
+    decision_cache_ttl_seconds: float = Field(default=300.0, description="Decision cache entry lifetime")
+    database_async: bool = Field(
+        default=False,
+        description="Serve evaluate/transparency/analytics/compile routes on an async engine (asyncpg / aiosqlite)"
+    )
+    sqlite_profile: str = Field(
+        default="default",
+        description="SQLite tuning: default, or throughput (WAL + tuned pragmas, one batched ledger writer, read-only reader pool)"
+    )
+    sqlite_mmap_size: int = Field(default=268435456, description="SQLite mmap_size in bytes (throughput profile)")
+    sqlite_cache_size_kib: int = Field(default=65536, description="SQLite page cache per connection in KiB (throughput profile)")
+    sqlite_busy_timeout_ms: int = Field(default=5000, description="Wait for the write lock before 'database is locked'")
+    sqlite_reader_pool_size: int = Field(default=8, description="Read-only SQLite connections (throughput profile)")
+    shared_cache_enabled: bool = Field(
+        default=False,
+        description="Back the policy and analytics caches with a Redis L2 shared by all workers (uses redis_url)"
+    )
+    shared_cache_timeout_seconds: float = Field(default=0.05, description="Redis socket timeout for shared caches")
+    analytics_cache_ttl_seconds: float = Field(default=60.0, description="Course analytics response lifetime")
+    accommodation_cache_ttl_seconds: float = Field(
+        default=60.0, description="How long a worker reuses a pseudonym's resolved accommodations"
+    )
+    ledger_write_behind: bool = Field(
+        default=False,
+        description="Queue ledger records and write them in background batches"
+    )
+    ledger_queue_size: int = Field(default=10000, description="Max queued ledger records (bounds memory)")
+    ledger_flush_batch_size: int = Field(default=500, description="Max ledger records per background insert")
+    ledger_flush_interval_seconds: float = Field(default=0.5, description="Max delay before a queued record is written")
+    ledger_backpressure: str = Field(
+        default="block",
+        description="When the queue is full: block (wait, then write synchronously), sync or drop"
+    )
+    ledger_enqueue_timeout_seconds: float = Field(default=0.05, description="Max wait for queue space in block mode")
+    ledger_seal_interval_seconds: float = Field(
+        default=2.0,
+        description="How often rows written outside the write-behind queue are sealed into a Merkle batch"
+    )
+    profiling_admin_token: Optional[str] = Field(
+        default=None,
+        description="Token (X-Admin-Token header) that allows X-Profile requests when debug is off"
+    )
+    profiling_sample_rate: float = Field(default=0.0, description="Fraction of requests profiled automatically (saved, not returned)")
+    profiling_sample_paths: str = Field(
+        default="/api/v1/policy/evaluate,/api/governance/decide",
+        description="Comma-separated path prefixes eligible for sampling"
+    )
+    profiling_sample_format: str = Field(default="collapsed", description="Format of sampled profiles: collapsed or pstats")
+    profiling_interval_ms: float = Field(default=1.0, description="Stack sampling interval of collapsed profiles")
+    profiling_output_dir: str = Field(default="profiles", description="Directory request profiles are saved to")
 
     # Transparency
     student_visible_logs: bool = Field(default=True, description="Show logs to students")
@@ -88,6 +141,21 @@ class Settings(BaseSettings):
         description="Support email"
     )
 
+    @property
+    def sqlite_throughput(self) -> bool:
+        """Tuned single-node SQLite mode (see db.py)."""
+        return self.sqlite_profile == "throughput" and self.database_url.lower().startswith("sqlite")
+
+    @property
+    def ledger_write_behind_active(self) -> bool:
+        """Ledger writes go through the batching write-behind queue (always, for tuned SQLite)."""
+        return self.ledger_write_behind or self.sqlite_throughput
+
+    @property
+    def profiling_enabled(self) -> bool:
+        """Request profiling is installed at all (see profiling.py); otherwise it costs nothing."""
+        return self.debug or bool(self.profiling_admin_token) or self.profiling_sample_rate > 0
+
     model_config = {
         "env_file": ".env.local",
         "case_sensitive": False,
@@ -1,12 +1,35 @@
 """
 Database setup: SQLAlchemy engine and session management.
 Supports both SQLite (local development) and PostgreSQL (production).
+With Settings.database_async, an async engine (aiosqlite / asyncpg) also serves the
+evaluate, transparency and analytics routes: their queries are awaited on the event
+loop and evaluation runs in worker threads (see run_in_session).
+
+Settings.sqlite_profile = "throughput" tunes a file-backed SQLite database for
+single-node deployments:
+- WAL journaling, synchronous=NORMAL, mmap_size, cache_size and busy_timeout are
+  set on every connection, so readers never block the writer and commits skip
+  most fsyncs (still durable across application crashes)
+- ledger inserts go through the single write-behind thread, which batches them
+  into one transaction (Settings.ledger_write_behind_active)
+- read-only routes use a separate read-only connection pool (get_read_session)
+
+Pool size and checkouts of every engine are reported on /metrics (db_pool_*).
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from typing import Awaitable, Callable, List, Optional, TypeVar, Union
+
+import anyio
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
 
 from .config import settings
+from metrics import registry as metrics
+from profiling import run_profiled
+
+T = TypeVar("T")
 
 # Auto-detect SQLite vs PostgreSQL and set appropriate options
 engine_kwargs = {}
@@ -28,6 +51,84 @@ engine = create_engine(settings.database_url, **engine_kwargs)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def sqlite_pragmas(read_only: bool = False) -> List[str]:
+    """Per-connection pragmas of the SQLite throughput profile."""
+    pragmas = [
+        f"PRAGMA busy_timeout = {settings.sqlite_busy_timeout_ms}",
+        f"PRAGMA mmap_size = {settings.sqlite_mmap_size}",
+        f"PRAGMA cache_size = -{settings.sqlite_cache_size_kib}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if read_only:
+        return pragmas + ["PRAGMA query_only = ON"]
+    # WAL is persistent in the database file; NORMAL only fsyncs at checkpoints
+    return ["PRAGMA journal_mode = WAL", "PRAGMA synchronous = NORMAL"] + pragmas
+
+
+def apply_pragmas(target_engine, pragmas: List[str]) -> None:
+    """Run pragmas on every new DBAPI connection of an engine."""
+    @event.listens_for(target_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def read_only_url(database_url: str) -> Optional[str]:
+    """Read-only URI form of a file-backed SQLite URL (None for in-memory databases)."""
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        return None
+    return url.set(database=f"file:{url.database}", query={"mode": "ro", "uri": "true"}).render_as_string()
+
+
+read_engine = None
+ReadSessionLocal = None
+if settings.sqlite_throughput:
+    apply_pragmas(engine, sqlite_pragmas())
+    reader_url = read_only_url(settings.database_url)
+    if reader_url is not None:
+        # Open (and switch to WAL) through the writer first: a read-only connection cannot create the file
+        engine.connect().close()
+        read_engine = create_engine(
+            reader_url,
+            connect_args={"check_same_thread": False},
+            pool_size=settings.sqlite_reader_pool_size,
+            max_overflow=0
+        )
+        apply_pragmas(read_engine, sqlite_pragmas(read_only=True))
+        ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(database_url: str) -> str:
+    """The same database behind its async driver (sqlite -> aiosqlite, postgresql -> asyncpg)."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.database_async:
+    # Imported here: the async drivers are only needed in async mode
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine_kwargs = {} if "sqlite" in settings.database_url.lower() else {
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_pre_ping": True,
+    }
+    async_engine = create_async_engine(async_database_url(settings.database_url), **async_engine_kwargs)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
+
 def get_db():
     """FastAPI dependency yielding a DB session."""
     db = SessionLocal()
@@ -35,3 +136,69 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """FastAPI dependency yielding a session on the read-only SQLite pool."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """FastAPI dependency yielding an async DB session (Settings.database_async)."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Session dependency of the routes that can run on the event loop
+get_session = get_async_db if settings.database_async else get_db
+# ... and of those that only read (transparency, analytics)
+get_read_session = get_read_db if ReadSessionLocal is not None and not settings.database_async else get_session
+
+
+def expose_pool_metrics(target_engine, name: str) -> None:
+    """Report a queue pool's size, checkouts and overflow on /metrics, labelled engine="<name>"."""
+    pool = target_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return  # SingletonThreadPool / NullPool (in-memory SQLite, tests) keep no counts
+    for field, documentation, read in (
+        ("size", "Connections the pool keeps open", pool.size),
+        ("checked_out", "Connections currently lent to sessions", pool.checkedout),
+        ("overflow", "Connections opened beyond size (negative: size not reached yet)", pool.overflow),
+    ):
+        metrics.gauge(f"db_pool_{field}", documentation, ("engine",)).set_function(read, engine=name)
+    if pool._max_overflow >= 0:
+        metrics.gauge(
+            "db_pool_capacity", "Most connections the pool will lend (size + max_overflow)", ("engine",)
+        ).set_function(lambda: pool.size() + pool._max_overflow, engine=name)
+
+
+expose_pool_metrics(engine, "primary")
+if read_engine is not None:
+    expose_pool_metrics(read_engine, "read")
+if async_engine is not None:
+    expose_pool_metrics(async_engine.sync_engine, "async")
+
+DBSession = Union[Session, AsyncSession]
+
+
+async def run_in_session(
+    db: DBSession,
+    fn: Callable[[Session], T],
+    async_fn: Optional[Callable[[AsyncSession], Awaitable[T]]] = None
+) -> T:
+    """
+    Run a route's database work without blocking the event loop: fn(session) in a
+    worker thread for a sync session (a profiled request keeps profiling in that
+    thread); async_fn(session) for an AsyncSession, which awaits its queries on the
+    async driver and leaves CPU-bound work to worker threads. AsyncSession.run_sync
+    is not used: it runs the whole of fn, queries and evaluation, on the event loop.
+    """
+    if isinstance(db, AsyncSession):
+        if async_fn is None:
+            raise TypeError("run_in_session() needs async_fn for an AsyncSession")
+        return await async_fn(db)
+    return await anyio.to_thread.run_sync(run_profiled, fn, db)
@@ -0,0 +1,129 @@
+"""
+Implements: Server-side resolution of approved accommodations
+
+How it satisfies constraints:
+- Accommodation kinds (never details) are granted to a pseudonym, in one course or
+  all of them, in the approved_accommodations table
+- The evaluation routes replace GovernanceContext.approved_accommodations with the
+  kinds resolved here, so has_approved_accommodation() conditions cannot be
+  satisfied by what a client puts in its request
+- A pseudonym's grants are cached per worker (DecisionCache, short TTL); grant()
+  and revoke() drop the entry here, other workers pick changes up within the TTL
+- resolve() answers every uncached pseudonym of a batch with one query
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import ApprovedAccommodationORM, GovernanceContext
+from .decision_cache import DecisionCache
+
+# A pseudonym's grants: (course_id or None for every course, kind, expires_at)
+Grants = Tuple[Tuple[Optional[str], str, Optional[datetime]], ...]
+
+_GRANTS = "grants"
+
+
+def _grants_statement(pseudonyms: Sequence[str]):
+    table = ApprovedAccommodationORM
+    return select(table.actor_id_pseudonym, table.course_id, table.kind, table.expires_at).where(
+        table.actor_id_pseudonym.in_(pseudonyms)
+    )
+
+
+class AccommodationStore:
+    """Resolves the accommodations of request contexts from approved_accommodations."""
+
+    def __init__(self, cache: DecisionCache):
+        self.cache = cache
+
+    def resolve(self, contexts: Sequence[GovernanceContext], db: Session) -> List[GovernanceContext]:
+        """The contexts, in order, with approved_accommodations replaced by the stored grants."""
+        grants, missing = self._cached(contexts)
+        if missing:
+            grants.update(self._keep(missing, db.execute(_grants_statement(missing))))
+        return self._apply(contexts, grants)
+
+    async def resolve_async(
+        self, contexts: Sequence[GovernanceContext], db: AsyncSession
+    ) -> List[GovernanceContext]:
+        """resolve() for an AsyncSession."""
+        grants, missing = self._cached(contexts)
+        if missing:
+            grants.update(self._keep(missing, await db.execute(_grants_statement(missing))))
+        return self._apply(contexts, grants)
+
+    def _cached(self, contexts: Sequence[GovernanceContext]) -> Tuple[Dict[str, Grants], List[str]]:
+        grants: Dict[str, Grants] = {}
+        missing: List[str] = []
+        for pseudonym in dict.fromkeys(ctx.actor_id_pseudonym for ctx in contexts):
+            cached = self.cache.get(pseudonym, _GRANTS)
+            if cached is None:
+                missing.append(pseudonym)
+            else:
+                grants[pseudonym] = cached
+        return grants, missing
+
+    def _keep(self, pseudonyms: List[str], rows) -> Dict[str, Grants]:
+        loaded: Dict[str, list] = {pseudonym: [] for pseudonym in pseudonyms}
+        for row in rows:
+            loaded[row.actor_id_pseudonym].append((row.course_id, row.kind, row.expires_at))
+        grants = {pseudonym: tuple(found) for pseudonym, found in loaded.items()}
+        for pseudonym, found in grants.items():
+            self.cache.put(pseudonym, _GRANTS, found)
+        return grants
+
+    @staticmethod
+    def _apply(contexts: Sequence[GovernanceContext], grants: Dict[str, Grants]) -> List[GovernanceContext]:
+        now = datetime.utcnow()
+        resolved = []
+        for ctx in contexts:
+            kinds = sorted({
+                kind for course_id, kind, expires_at in grants[ctx.actor_id_pseudonym]
+                if course_id in (None, ctx.course_id) and (expires_at is None or expires_at > now)
+            })
+            if kinds != ctx.approved_accommodations:
+                ctx = ctx.model_copy(update={"approved_accommodations": kinds})
+            resolved.append(ctx)
+        return resolved
+
+    def grant(
+        self,
+        db: Session,
+        pseudonym: str,
+        kind: str,
+        course_id: Optional[str] = None,
+        expires_at: Optional[datetime] = None
+    ) -> None:
+        """Approve an accommodation kind for a pseudonym (in one course, or every course)."""
+        db.add(ApprovedAccommodationORM(
+            actor_id_pseudonym=pseudonym,
+            course_id=course_id,
+            kind=kind,
+            approved_at=datetime.utcnow(),
+            expires_at=expires_at,
+        ))
+        db.commit()
+        self.cache.invalidate(pseudonym)
+
+    def revoke(self, db: Session, pseudonym: str, kind: str, course_id: Optional[str] = None) -> int:
+        """Withdraw a pseudonym's grants of a kind (for one course, or all); returns grants removed."""
+        table = ApprovedAccommodationORM
+        statement = delete(table).where(table.actor_id_pseudonym == pseudonym, table.kind == kind)
+        if course_id is not None:
+            statement = statement.where(table.course_id == course_id)
+        removed = db.execute(statement).rowcount
+        db.commit()
+        self.cache.invalidate(pseudonym)
+        return removed
+
+
+# Global store instance
+accommodation_cache = DecisionCache(maxsize=50000, ttl_seconds=settings.accommodation_cache_ttl_seconds)
+accommodation_cache.expose_metrics("accommodations")
+accommodation_store = AccommodationStore(accommodation_cache)
@@ -8,87 +8,503 @@ How it satisfies constraints:
 - Logs decisions to transparency ledger
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+import io
+import tempfile
+import uuid
+import anyio
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..models import (
     GovernanceContext, GovernanceDecision, PolicyJSON,
-    PolicyFormInput, CompileResult, StudentTransparencyView, CourseAnalytics
+    PolicyFormInput, CompileResult, StudentTransparencyView, CourseAnalytics,
+    BatchEvaluationItem, BatchEvaluationResult, TraceLevel, ReplayReport,
+    ConflictReport, IngestReport, StudentLogPage, InclusionProof
 )
-from .enforcement import f
-from ..db import get_db
-from ..transparency_ledger import log_to_transparency_ledger, get_student_transparency_logs, get_course_analytics
+from .enforcement import CompiledPolicySet, compile_policies, f
+from .expressions import ExpressionError
+from .registry import policy_registry
+from .accommodations import accommodation_store
+from .decision_cache import DecisionCache, decision_cache
+from .serialization import RESPONSE_FORMATS, FastJSONResponse, ndjson_response
+from .shared_cache import shared_tier
+from ..auth import require_role
+from ..config import settings
+from ..db import DBSession, SessionLocal, get_db, get_read_session, get_session, run_in_session
+from ..transparency_ledger import (
+    log_to_transparency_ledger, log_batch_to_transparency_ledger,
+    get_student_transparency_logs, get_course_analytics, get_student_log_page
+)
+from ..transparency_ledger.aio import (
+    get_course_analytics_async, get_student_log_page_async, get_student_transparency_logs_async,
+    log_batch_to_transparency_ledger_async, log_to_transparency_ledger_async
+)
+from ..transparency_ledger.write_behind import LedgerWriteBehind
+from ..transparency_ledger.merkle import LedgerSealer, get_chain_head, get_inclusion_proof, verify_chain
+from ..transparency_ledger.pseudonyms import derive, epoch_for, pseudonym_history
 from ..policy_compiler import compile_policy_from_form
+from ..policy_compiler.overlap_index import overlap_index
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry as metrics
+from profiling import PROFILE_NAME, authorized as profiling_authorized, profile_dir
 
 router = APIRouter()
 
+# Background ledger writer, used when settings.ledger_write_behind_active (always for tuned SQLite)
+ledger_writer = LedgerWriteBehind(
+    SessionLocal,
+    maxsize=settings.ledger_queue_size,
+    batch_size=settings.ledger_flush_batch_size,
+    flush_interval=settings.ledger_flush_interval_seconds,
+    backpressure=settings.ledger_backpressure,
+    enqueue_timeout=settings.ledger_enqueue_timeout_seconds
+)
+ledger_writer.expose_metrics()
 
-@router.post("/api/v1/policy/evaluate", response_model=GovernanceDecision)
-def evaluate_policy(
-    policies: List[PolicyJSON],
-    context: GovernanceContext,
-    db: Session = Depends(get_db)
-):
-    if not policies:
+# Seals rows written outside the queue into Merkle batches; started and stopped with the app (main.py)
+ledger_sealer = LedgerSealer(SessionLocal, interval=settings.ledger_seal_interval_seconds)
+
+# Course analytics responses; rollups move continuously, so entries only live briefly
+analytics_cache = DecisionCache(
+    maxsize=1024,
+    ttl_seconds=settings.analytics_cache_ttl_seconds,
+    l2=shared_tier("analytics", settings.analytics_cache_ttl_seconds)
+)
+analytics_cache.expose_metrics("analytics")
+
+
+def _check_evaluation(policies: Optional[List[PolicyJSON]], context: GovernanceContext) -> None:
+    if policies is not None and not policies:
         raise HTTPException(status_code=400, detail="No policies provided")
     if not context.action:
         raise HTTPException(status_code=400, detail="No action provided in context")
-    
-    decision = f(policies, context, context.action)
-    
+
+
+def _decide(
+    policies: Optional[List[PolicyJSON]],
+    compiled: Optional[CompiledPolicySet],
+    context: GovernanceContext,
+    trace_level: Optional[TraceLevel]
+) -> GovernanceDecision:
+    """Evaluate against the course's compiled active policies, or else the request's own."""
+    try:
+        if compiled is not None:
+            return compiled.decide(context, trace_level)
+        return f(policies, context, context.action, trace_level)
+    except ExpressionError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid policy condition: {e}")
+
+
+def _active_policies(compiled: Optional[CompiledPolicySet], course_id: str) -> CompiledPolicySet:
+    if compiled is None:
+        raise HTTPException(status_code=404, detail=f"No active policy for course {course_id}")
+    return compiled
+
+
+def _ledger_entry(context: GovernanceContext, decision: GovernanceDecision) -> Dict[str, str]:
+    return {
+        "actor_id_pseudonym": context.actor_id_pseudonym,
+        "action": context.action,
+        "assessment_type": context.assessment_type,
+        "policy_id": decision.policy_id or "unknown",
+        "decision": decision.decision.value,
+        "course_id": context.course_id,
+    }
+
+
+def _evaluate(
+    policies: Optional[List[PolicyJSON]],
+    context: GovernanceContext,
+    trace_level: Optional[TraceLevel],
+    db: Session
+) -> GovernanceDecision:
+    _check_evaluation(policies, context)
+    # Accommodations come from the server's records, never from the request
+    context = accommodation_store.resolve([context], db)[0]
+    compiled = None
+    if policies is None:
+        # Server-side mode: resolve the course's active policies from the registry
+        try:
+            compiled = _active_policies(policy_registry.get(context.course_id, db), context.course_id)
+        except ExpressionError as e:
+            raise HTTPException(status_code=422, detail=f"Invalid policy condition: {e}")
+    decision = _decide(policies, compiled, context, trace_level)
+
     # Log decision to transparency ledger
     try:
-        log_to_transparency_ledger(
-            actor_id_pseudonym=context.actor_id_pseudonym,
-            action=context.action,
-            assessment_type=context.assessment_type,
-            policy_id=decision.policy_id or "unknown",
-            decision=decision.decision.value,
-            course_id=context.course_id,
-            db=db
-        )
+        entry = _ledger_entry(context, decision)
+        if settings.ledger_write_behind_active:
+            ledger_writer.submit(entry)
+        else:
+            log_to_transparency_ledger(db=db, **entry)
     except Exception as e:
         # Log but don't fail the request
         print(f"Warning: Failed to log decision: {e}")
-    
+
     return decision
 
 
+async def _evaluate_async(
+    policies: Optional[List[PolicyJSON]],
+    context: GovernanceContext,
+    trace_level: Optional[TraceLevel],
+    db: AsyncSession
+) -> GovernanceDecision:
+    """_evaluate() on an AsyncSession: queries are awaited, evaluation runs in a worker thread."""
+    _check_evaluation(policies, context)
+    context = (await accommodation_store.resolve_async([context], db))[0]
+    compiled = None
+    if policies is None:
+        try:
+            compiled = _active_policies(await policy_registry.get_async(context.course_id, db), context.course_id)
+        except ExpressionError as e:
+            raise HTTPException(status_code=422, detail=f"Invalid policy condition: {e}")
+    decision = await anyio.to_thread.run_sync(_decide, policies, compiled, context, trace_level)
+
+    try:
+        entry = _ledger_entry(context, decision)
+        if settings.ledger_write_behind_active:
+            # submit() may wait for queue space (backpressure="block")
+            await anyio.to_thread.run_sync(ledger_writer.submit, entry)
+        else:
+            await log_to_transparency_ledger_async(db, **entry)
+    except Exception as e:
+        print(f"Warning: Failed to log decision: {e}")
+
+    return decision
+
+
+@router.post("/api/v1/policy/evaluate", response_model=GovernanceDecision, response_class=FastJSONResponse)
+async def evaluate_policy(
+    context: GovernanceContext,
+    policies: Optional[List[PolicyJSON]] = None,
+    trace_level: Optional[TraceLevel] = None,
+    db: DBSession = Depends(get_session)
+):
+    """
+    Evaluate a context against the given policies.
+    Omit `policies` to evaluate against the course's active policies stored server-side.
+    `trace_level` (none/summary/full) defaults from Settings.enable_detailed_traces.
+    """
+    return FastJSONResponse(await run_in_session(
+        db,
+        lambda session: _evaluate(policies, context, trace_level, session),
+        lambda session: _evaluate_async(policies, context, trace_level, session)
+    ))
+
+
 # Alias route to match documented API path
-@router.post("/api/governance/decide", response_model=GovernanceDecision)
-def decide_alias(
-    policies: List[PolicyJSON],
+@router.post("/api/governance/decide", response_model=GovernanceDecision, response_class=FastJSONResponse)
+async def decide_alias(
     context: GovernanceContext,
-    db: Session = Depends(get_db)
+    policies: Optional[List[PolicyJSON]] = None,
+    trace_level: Optional[TraceLevel] = None,
+    db: DBSession = Depends(get_session)
+):
+    return await evaluate_policy(context, policies, trace_level, db)
+
+
+@router.post("/api/v1/policy/evaluate/batch", response_model=BatchEvaluationResult, response_class=FastJSONResponse)
+async def evaluate_policy_batch(
+    contexts: List[Dict[str, Any]],
+    policies: Optional[List[PolicyJSON]] = None,
+    trace_level: Optional[TraceLevel] = None,
+    db: DBSession = Depends(get_session)
 ):
-    if not policies:
+    """
+    Evaluate many contexts against one policy set (or each course's active policies
+    when `policies` is omitted). Results keep input order; a bad item gets an error
+    instead of failing the batch. All decisions are logged in one transaction.
+    """
+    return FastJSONResponse(await run_in_session(
+        db,
+        lambda session: _evaluate_batch(contexts, policies, trace_level, session),
+        lambda session: _evaluate_batch_async(contexts, policies, trace_level, session)
+    ))
+
+
+# A batch item: its validated context, or why it has none
+BatchItem = Union[GovernanceContext, str]
+# Each course's active policies, or the error compiling them
+CourseSets = Dict[str, Union[Optional[CompiledPolicySet], ExpressionError]]
+
+
+def _prepare_batch(
+    contexts: List[Dict[str, Any]],
+    policies: Optional[List[PolicyJSON]]
+) -> Tuple[List[BatchItem], Optional[CompiledPolicySet]]:
+    """Validate the contexts and compile the request's policy set, if any."""
+    if policies is not None and not policies:
         raise HTTPException(status_code=400, detail="No policies provided")
-    if not context.action:
-        raise HTTPException(status_code=400, detail="No action provided in context")
-    
-    decision = f(policies, context, context.action)
-    
-    # Log decision to transparency ledger
     try:
-        log_to_transparency_ledger(
-            actor_id_pseudonym=context.actor_id_pseudonym,
-            action=context.action,
-            assessment_type=context.assessment_type,
-            policy_id=decision.policy_id or "unknown",
-            decision=decision.decision.value,
-            course_id=context.course_id,
-            db=db
-        )
+        shared = compile_policies(policies) if policies else None
+    except ExpressionError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid policy condition: {e}")
+
+    items: List[BatchItem] = []
+    for raw in contexts:
+        try:
+            context = GovernanceContext.model_validate(raw)
+        except ValidationError as e:
+            items.append(f"Invalid context: {e.error_count()} validation error(s)")
+            continue
+        items.append(context if context.action else "No action provided in context")
+    return items, shared
+
+
+def _with_accommodations(items: List[BatchItem], resolved: List[GovernanceContext]) -> List[BatchItem]:
+    """Put the contexts resolved by accommodation_store back in their items' places."""
+    contexts = iter(resolved)
+    return [next(contexts) if isinstance(item, GovernanceContext) else item for item in items]
+
+
+def _contexts(items: List[BatchItem]) -> List[GovernanceContext]:
+    return [item for item in items if isinstance(item, GovernanceContext)]
+
+
+def _courses_to_resolve(items: List[BatchItem], shared: Optional[CompiledPolicySet]) -> List[str]:
+    if shared is not None:
+        return []
+    return list(dict.fromkeys(context.course_id for context in _contexts(items)))
+
+
+def _decide_batch(
+    items: List[BatchItem],
+    shared: Optional[CompiledPolicySet],
+    by_course: CourseSets,
+    trace_level: Optional[TraceLevel]
+) -> Tuple[BatchEvaluationResult, List[Dict[str, str]]]:
+    results: List[BatchEvaluationItem] = []
+    ledger_entries: List[Dict[str, str]] = []
+    for index, item in enumerate(items):
+        if isinstance(item, str):
+            results.append(BatchEvaluationItem(index=index, error=item))
+            continue
+        compiled = shared if shared is not None else by_course[item.course_id]
+        if isinstance(compiled, ExpressionError):
+            results.append(BatchEvaluationItem(index=index, error=f"Invalid policy condition: {compiled}"))
+            continue
+        if compiled is None:
+            results.append(BatchEvaluationItem(index=index, error=f"No active policy for course {item.course_id}"))
+            continue
+
+        decision = compiled.decide(item, trace_level)
+        results.append(BatchEvaluationItem(index=index, decision=decision))
+        ledger_entries.append(_ledger_entry(item, decision))
+
+    result = BatchEvaluationResult(
+        results=results,
+        total=len(results),
+        succeeded=len(ledger_entries),
+        failed=len(results) - len(ledger_entries)
+    )
+    return result, ledger_entries
+
+
+def _evaluate_batch(
+    contexts: List[Dict[str, Any]],
+    policies: Optional[List[PolicyJSON]],
+    trace_level: Optional[TraceLevel],
+    db: Session
+) -> BatchEvaluationResult:
+    items, shared = _prepare_batch(contexts, policies)
+    items = _with_accommodations(items, accommodation_store.resolve(_contexts(items), db))
+    by_course: CourseSets = {}
+    for course_id in _courses_to_resolve(items, shared):
+        try:
+            by_course[course_id] = policy_registry.get(course_id, db)
+        except ExpressionError as e:
+            by_course[course_id] = e
+    result, ledger_entries = _decide_batch(items, shared, by_course, trace_level)
+
+    # Log all decisions to transparency ledger at once
+    try:
+        if settings.ledger_write_behind_active:
+            ledger_writer.submit_many(ledger_entries)
+        else:
+            log_batch_to_transparency_ledger(ledger_entries, db)
     except Exception as e:
         # Log but don't fail the request
-        print(f"Warning: Failed to log decision: {e}")
-    
-    return decision
+        print(f"Warning: Failed to log batch decisions: {e}")
+
+    return result
+
+
+async def _evaluate_batch_async(
+    contexts: List[Dict[str, Any]],
+    policies: Optional[List[PolicyJSON]],
+    trace_level: Optional[TraceLevel],
+    db: AsyncSession
+) -> BatchEvaluationResult:
+    """_evaluate_batch() on an AsyncSession: validation and evaluation run in worker threads."""
+    items, shared = await anyio.to_thread.run_sync(_prepare_batch, contexts, policies)
+    items = _with_accommodations(items, await accommodation_store.resolve_async(_contexts(items), db))
+    by_course: CourseSets = {}
+    for course_id in _courses_to_resolve(items, shared):
+        try:
+            by_course[course_id] = await policy_registry.get_async(course_id, db)
+        except ExpressionError as e:
+            by_course[course_id] = e
+    result, ledger_entries = await anyio.to_thread.run_sync(_decide_batch, items, shared, by_course, trace_level)
+
+    try:
+        if settings.ledger_write_behind_active:
+            await anyio.to_thread.run_sync(ledger_writer.submit_many, ledger_entries)
+        else:
+            await log_batch_to_transparency_ledger_async(ledger_entries, db)
+    except Exception as e:
+        print(f"Warning: Failed to log batch decisions: {e}")
+
+    return result
+
+
+@router.post("/api/v1/policy/replay", response_model=ReplayReport, dependencies=[Depends(require_role("admin"))])
+def replay_draft_policy(
+    draft: PolicyJSON,
+    course_id: Optional[str] = None,
+    institution_id: Optional[str] = None,
+    actor_role: str = "student",
+    assessment_phase: str = "submission",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    What-if replay: which past ledger events would change decision under a draft
+    policy (e.g. ALLOW -> DENY), counted per action and assessment type.
+    Admins only: a replay fans out over every core.
+    """
+    if not course_id and not institution_id:
+        raise HTTPException(status_code=400, detail="course_id or institution_id is required")
+    # Loaded on first use, like the copilot: workers that never replay skip the process-pool machinery
+    from .replay import replay_policy
+
+    try:
+        return replay_policy(
+            draft, db,
+            course_id=course_id,
+            institution_id=institution_id,
+            actor_role=actor_role,
+            assessment_phase=assessment_phase,
+            since=since,
+            until=until
+        )
+    except ExpressionError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid policy condition: {e}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/api/v1/policy/decision-cache")
+def decision_cache_stats():
+    """Hit/miss/eviction counters of the decision cache."""
+    return decision_cache.stats()
+
+
+@router.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Every worker-local metric in the Prometheus text format; scrape each worker."""
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@router.get("/api/v1/debug/profiles/{name}", include_in_schema=False)
+def download_profile(name: str, request: Request):
+    """A saved request profile (name from X-Profile-File); same gate as taking one."""
+    if not settings.profiling_enabled or not profiling_authorized(request.headers) or not PROFILE_NAME.match(name):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    path = profile_dir() / name
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "text/plain" if name.endswith(".collapsed") else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=name)
+
+
+@router.post("/api/v1/ledger/ingest", response_model=IngestReport, dependencies=[Depends(require_role("admin"))])
+async def ingest_ledger_events(
+    request: Request,
+    format: str = "ndjson",
+    validate_policies: bool = True,
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk-load AI-use events from a raw NDJSON or CSV request body
+    (e.g. curl --data-binary @export.ndjson). Invalid rows are reported, not stored.
+    Admins only: ingested rows are sealed into the ledger's Merkle batches.
+    """
+    from ..transparency_ledger.ingest import INGEST_FORMATS, ingest_ledger
+
+    if format not in INGEST_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(INGEST_FORMATS)}")
+
+    # Spool the body (to disk past 16 MB) so validation and inserts can stream from it
+    body = tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+    try:
+        async for chunk in request.stream():
+            body.write(chunk)
+        body.seek(0)
+        stream = io.TextIOWrapper(body, encoding="utf-8", newline="")
+        try:
+            report = await run_in_threadpool(ingest_ledger, stream, format, db, validate_policies=validate_policies)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Request body must be UTF-8")
+    finally:
+        body.close()
+    if report.inserted:
+        analytics_cache.bump()
+    return report
+
+
+@router.get("/api/v1/ledger/proof/{log_id}", response_model=InclusionProof)
+def ledger_inclusion_proof(
+    log_id: uuid.UUID,
+    pseudonym: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Merkle inclusion proof for one ledger row: fold `proof` into `leaf_hash` to get
+    `merkle_root`; `batch_hash` chains the root to the previous batch.
+    `row_matches` is false if the stored row was edited after sealing; for a row whose
+    pseudonym has been rotated it is only checked given the logged `pseudonym`.
+    """
+    proof = get_inclusion_proof(
+        db, log_id, pseudonym=pseudonym,
+        derive=lambda raw, epoch: derive(raw, 0, epoch, settings.secret_key)
+    )
+    if proof is None:
+        raise HTTPException(status_code=404, detail=f"No sealed ledger entry {log_id}")
+    return proof
+
+
+@router.get("/api/v1/ledger/head")
+def ledger_chain_head(db: Session = Depends(get_db)):
+    """Latest batch id and hash of the ledger hash chain (publish to pin history)."""
+    return get_chain_head(db)
+
+
+@router.get("/api/v1/ledger/verify")
+def ledger_verify_chain(
+    from_batch_id: int = 1,
+    to_batch_id: Optional[int] = None,
+    check_trees: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Check the hash chain over a batch range (batch headers only, no ledger rows)."""
+    return verify_chain(db, from_batch_id=from_batch_id, to_batch_id=to_batch_id, check_trees=check_trees)
+
+
+@router.get("/api/v1/ledger/write-behind")
+def ledger_write_behind_stats():
+    """Queue depth, throughput and flush latency of the background ledger writer."""
+    return {"enabled": settings.ledger_write_behind_active, **ledger_writer.stats()}
 
 
 @router.post("/api/policies/compile", response_model=CompileResult)
-def compile_policy(
+async def compile_policy(
     form_data: PolicyFormInput,
     institution_id: str = "default_institution",
     author_id: str = "default_author",
@@ -96,38 +512,129 @@ def compile_policy(
 ):
     """
     Compile faculty form input to PolicyJSON.
-    Validates, detects conflicts, and stores in DB.
+    Validates, detects conflicts, and stores in DB (on a worker thread: compiling and
+    the overlap check are CPU-bound, so this route always uses a sync session).
     """
-    result = compile_policy_from_form(
+    result = await run_in_session(db, lambda session: compile_policy_from_form(
         form=form_data,
         institution_id=institution_id,
         author_id=author_id,
-        db=db
-    )
+        db=session
+    ))
+    if result.success:
+        policy_registry.invalidate(form_data.course_id)
     return result
 
 
-@router.get("/api/transparency/my-logs/{pseudonym}", response_model=StudentTransparencyView)
-def get_my_logs(
-    pseudonym: str,
+@router.get("/api/v1/policy/conflicts", response_model=ConflictReport)
+def list_policy_conflicts(
+    institution_id: Optional[str] = None,
     course_id: Optional[str] = None,
     db: Session = Depends(get_db)
+):
+    """
+    Rule-level conflicts across stored policies: the same (role, assessment_type,
+    phase, action) allowed by one rule and prohibited by another.
+    """
+    overlap_index.ensure_loaded(db)
+    conflicts = overlap_index.conflicts(institution_id=institution_id, course_id=course_id)
+    return ConflictReport(non_blocking=conflicts)
+
+
+def _pseudonym_forms(pseudonym: str) -> List[str]:
+    """The student's pseudonym and its rotated forms, so rotated history stays visible."""
+    current_epoch = epoch_for(datetime.utcnow(), settings.pseudonym_rotation_days)
+    return pseudonym_history(pseudonym, current_epoch, settings.secret_key)
+
+
+@router.get("/api/transparency/my-logs/{pseudonym}", response_model=StudentTransparencyView, response_class=FastJSONResponse)
+async def get_my_logs(
+    pseudonym: str,
+    course_id: Optional[str] = None,
+    db: DBSession = Depends(get_read_session)
 ):
     """
     Fetch aggregated AI-use logs for a student (by pseudonym).
     """
-    return get_student_transparency_logs(pseudonym, course_id, db)
+    pseudonyms = _pseudonym_forms(pseudonym)
+    return FastJSONResponse(
+        await run_in_session(
+            db,
+            lambda session: get_student_transparency_logs(pseudonyms, course_id, session),
+            lambda session: get_student_transparency_logs_async(pseudonyms, course_id, session)
+        )
+    )
+
 
+@router.get("/api/transparency/my-logs/{pseudonym}/events", response_model=StudentLogPage, response_class=FastJSONResponse)
+async def get_my_log_events(
+    pseudonym: str,
+    course_id: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    format: str = "json",
+    db: DBSession = Depends(get_read_session)
+):
+    """
+    Raw AI-use event history for a student, newest first, keyset-paginated:
+    pass `next_cursor` from one page as `cursor` to fetch the next.
+    format=ndjson streams the whole history from `cursor` instead, one event per
+    line, reading `limit` rows per query.
+    """
+    if format not in RESPONSE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(RESPONSE_FORMATS)}")
+    pseudonyms = _pseudonym_forms(pseudonym)
 
-@router.get("/api/transparency/course-analytics/{course_id}", response_model=CourseAnalytics)
-def get_analytics(
+    async def page(after: Optional[str]) -> StudentLogPage:
+        return await run_in_session(
+            db,
+            lambda session: get_student_log_page(pseudonyms, course_id, session, limit=limit, cursor=after),
+            lambda session: get_student_log_page_async(pseudonyms, course_id, session, limit=limit, cursor=after)
+        )
+
+    try:
+        first = await page(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if format == "json":
+        return FastJSONResponse(first)
+
+    async def events():
+        current = first
+        while True:
+            for item in current.items:
+                yield item
+            if not current.next_cursor:
+                return
+            current = await page(current.next_cursor)
+
+    return ndjson_response(events())
+
+
+@router.get("/api/transparency/course-analytics/{course_id}", response_model=CourseAnalytics, response_class=FastJSONResponse)
+async def get_analytics(
     course_id: str,
-    db: Session = Depends(get_db)
+    format: str = "json",
+    db: DBSession = Depends(get_read_session)
 ):
     """
     Fetch aggregated, anonymized analytics for a course (instructors).
+    Cached for analytics_cache_ttl_seconds, shared across workers when Redis is enabled.
+    format=ndjson streams the `by_action` rows, one per line.
     """
-    return get_course_analytics(course_id, db)
+    if format not in RESPONSE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(RESPONSE_FORMATS)}")
+    analytics = analytics_cache.get(course_id, "last_7_days")
+    if analytics is None:
+        analytics = await run_in_session(
+            db,
+            lambda session: get_course_analytics(course_id, session),
+            lambda session: get_course_analytics_async(course_id, session)
+        )
+        analytics_cache.put(course_id, "last_7_days", analytics)
+    if format == "ndjson":
+        return ndjson_response(analytics.by_action)
+    return FastJSONResponse(analytics)
 
 
 @router.post("/api/copilot/ask")
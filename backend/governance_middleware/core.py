@@ -0,0 +1,117 @@
+"""
+Implements: Pydantic-free data structures for the decision core
+
+How it satisfies constraints:
+- Contexts and decisions are __slots__ classes; obligations and conflicts are
+  named tuples, so evaluating a decision allocates no Pydantic models and shared
+  obligation records never need copying
+- Pydantic (GovernanceContext / GovernanceDecision) stays at the HTTP boundary
+- Offline jobs can call the engine directly:
+
+    from backend.governance_middleware.core import DecisionContext
+    from backend.governance_middleware.enforcement import compile_policies
+
+    engine = compile_policies(policies)
+    decision = engine.evaluate(DecisionContext(
+        "CS101", "student", "use_genai_brainstorm", "project", "drafting", "stu_1"
+    ))
+    decision.decision, decision.obligations
+"""
+
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from ..models import DecisionEnum
+
+# Same order as GovernanceContext fields, so traces look identical
+CONTEXT_FIELDS = (
+    "course_id",
+    "actor_role",
+    "action",
+    "assessment_type",
+    "assessment_phase",
+    "actor_id_pseudonym",
+    "approved_accommodations",
+)
+
+
+class DecisionContext:
+    """Compact evaluation context; any object with the same attributes also works."""
+
+    __slots__ = CONTEXT_FIELDS
+
+    def __init__(
+        self,
+        course_id: str,
+        actor_role: str,
+        action: str,
+        assessment_type: str,
+        assessment_phase: str,
+        actor_id_pseudonym: str = "",
+        approved_accommodations: Iterable[str] = ()
+    ):
+        self.course_id = course_id
+        self.actor_role = actor_role
+        self.action = action
+        self.assessment_type = assessment_type
+        self.assessment_phase = assessment_phase
+        self.actor_id_pseudonym = actor_id_pseudonym
+        self.approved_accommodations = tuple(approved_accommodations)
+
+    @classmethod
+    def from_context(cls, ctx: Any, action: Optional[str] = None) -> "DecisionContext":
+        """Copy a GovernanceContext (or similar), optionally replacing the action."""
+        return cls(
+            ctx.course_id,
+            ctx.actor_role,
+            ctx.action if action is None else action,
+            ctx.assessment_type,
+            ctx.assessment_phase,
+            ctx.actor_id_pseudonym,
+            ctx.approved_accommodations,
+        )
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in CONTEXT_FIELDS)
+        return f"DecisionContext({fields})"
+
+
+def context_as_dict(ctx: Any) -> Dict[str, Any]:
+    """Plain-dict view of a context, shaped like GovernanceContext.model_dump()."""
+    data = {name: getattr(ctx, name) for name in CONTEXT_FIELDS}
+    data["approved_accommodations"] = list(data["approved_accommodations"])
+    return data
+
+
+class ObligationRecord(NamedTuple):
+    type: str  # "disclosure_required", "justification_required"
+    format: Optional[str] = None
+    template: Optional[str] = None
+    requirement_id: Optional[str] = None
+
+
+class ConflictRecord(NamedTuple):
+    type: str  # "allowed_vs_prohibited" | "override_applies"
+    details: Dict[str, Any]
+
+
+class Decision:
+    """Engine output; converted to GovernanceDecision only at the HTTP boundary."""
+
+    __slots__ = ("decision", "obligations", "trace", "policy_id", "applied_rules")
+
+    def __init__(
+        self,
+        decision: DecisionEnum,
+        obligations: Tuple[ObligationRecord, ...],
+        trace: Dict[str, Any],
+        policy_id: Optional[str],
+        applied_rules: Tuple[str, ...]
+    ):
+        self.decision = decision
+        self.obligations = obligations
+        self.trace = trace
+        self.policy_id = policy_id
+        self.applied_rules = applied_rules
+
+    def __repr__(self) -> str:
+        return f"Decision({self.decision.value}, policy_id={self.policy_id!r}, applied_rules={self.applied_rules!r})"
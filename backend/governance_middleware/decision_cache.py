@@ -0,0 +1,155 @@
+"""
+Implements: Bounded decision cache for the enforcement engine
+
+How it satisfies constraints:
+- For a fixed policy set, a decision depends only on (course_id, actor_role,
+  assessment_type, assessment_phase, action); pseudonyms and timestamps are
+  never part of a key, so cached entries hold no PII
+- Keys start with the policy-set content hash, so editing any participating
+  policy moves lookups to fresh keys; stale entries can be purged by hash
+- LRU eviction with a TTL bounds memory; hit/miss/eviction counters are kept
+- With an optional Redis L2 (shared_cache.RedisTier), local misses are served from
+  entries other workers computed; bump() retires a key prefix on every worker. Only
+  expensive values use it (analytics): a decision costs less than a Redis round trip
+- expose_metrics() publishes the counters on /metrics as cache_*{cache="<name>"}
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from ..config import settings
+from .shared_cache import RedisTier
+from metrics import registry as metrics
+
+CACHE_COUNTERS = {
+    "hits": "Cache lookups answered from this worker",
+    "misses": "Cache lookups not found in this worker",
+}
+CACHE_GAUGES = {
+    "hit_rate": "Share of lookups answered from this worker since start",
+}
+
+
+class DecisionCache:
+    """
+    Thread-safe LRU cache with per-entry TTL, keyed by (policy_set_hash, context_key).
+    The same structure caches other scoped values (e.g. analytics keyed by course).
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl_seconds: float = 300.0, l2: Optional[RedisTier] = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.l2 = l2
+        if l2 is not None:
+            l2.subscribe(self._drop_local)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, policy_set_hash: str, context_key: Hashable) -> Optional[Any]:
+        key = (policy_set_hash, context_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        if self.l2 is None:
+            return None
+        value = self.l2.get(policy_set_hash, context_key)
+        if value is not None:
+            self._store(key, value)
+        return value
+
+    def put(self, policy_set_hash: str, context_key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._store((policy_set_hash, context_key), value)
+        if self.l2 is not None:
+            self.l2.put(policy_set_hash, context_key, value)
+
+    def _store(self, key: Tuple[str, Hashable], value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, policy_set_hash: Optional[str] = None) -> int:
+        """Drop local entries of one policy set, or all entries when no hash is given."""
+        with self._lock:
+            if policy_set_hash is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+            else:
+                stale = [key for key in self._entries if key[0] == policy_set_hash]
+                for key in stale:
+                    del self._entries[key]
+                dropped = len(stale)
+            self.evictions += dropped
+            return dropped
+
+    def bump(self, scope: Optional[str] = None) -> None:
+        """Retire a scope (or everything) here and, through the L2, on every other worker."""
+        self.invalidate(scope)
+        if self.l2 is not None:
+            self.l2.bump(scope)
+
+    def _drop_local(self, scope: Optional[str]) -> None:
+        self.invalidate(scope)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "l2": self.l2.stats() if self.l2 is not None else None,
+        }
+
+    def expose_metrics(self, name: str) -> None:
+        """Report this cache (and its L2) on /metrics under cache="<name>"."""
+        metrics.expose_stats(
+            "cache", self.stats,
+            counters={**CACHE_COUNTERS, "evictions": "Entries dropped by LRU, TTL or invalidation"},
+            gauges={**CACHE_GAUGES, "size": "Entries held by this worker"},
+            cache=name
+        )
+        if self.l2 is not None:
+            metrics.expose_stats(
+                "cache_l2", self.l2.stats,
+                counters={
+                    **CACHE_COUNTERS,
+                    "errors": "Redis errors, counted as misses",
+                    "skipped": "Redis calls skipped while backing off after errors",
+                },
+                gauges=CACHE_GAUGES,
+                cache=name
+            )
+
+
+# Global cache instance
+decision_cache = DecisionCache(
+    maxsize=settings.decision_cache_size,
+    ttl_seconds=settings.decision_cache_ttl_seconds
+)
+decision_cache.expose_metrics("decision")
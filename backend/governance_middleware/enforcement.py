@@ -7,9 +7,18 @@ How it satisfies constraints:
 - Performs minimal conflict detection (allowed vs prohibited overlap and overrides)
 - Returns a detailed evaluation trace for explainability
 - Avoids PII; uses actor_id_pseudonym only in traces/log hooks
+- Compiles policy sets into a hash index so the hot path avoids linear scans;
+  f() evaluates a caller's one-off set linearly, which is cheaper than hashing it
+- Builds traces only to the requested TraceLevel (none / summary / full)
+- Evaluates override and role conditions with the compiled expression engine
+- Runs on the slotted types in core.py; Pydantic models are only built by
+  decide()/f() for the HTTP layer (offline jobs can use evaluate() directly)
+- Records compiled-set evaluation latency per decision (governance_decide_seconds)
 """
 
-from typing import List, Dict, Any, Tuple
+import hashlib
+import time
+from typing import List, Dict, Any, Iterable, Iterator, Sequence, Tuple, Optional
 from datetime import datetime
 
 from pydantic import BaseModel
@@ -20,11 +29,26 @@ from ..models import (
     DecisionEnum,
     Obligation,
     PolicyJSON,
+    TraceLevel,
 )
+from ..config import settings
+from .core import ConflictRecord, Decision, ObligationRecord, context_as_dict
+from .decision_cache import DecisionCache, decision_cache
+from .expressions import Expression, compile_expression
+from ..policy_compiler.snapshots import (
+    OVERRIDE_EFFECTS, SNAPSHOT_FORMAT, build_snapshot, content_hash, pack_snapshot, paused_gc,
+    read_row_snapshots, read_snapshot,
+)
+from metrics import registry as metrics
 
 # Simple precedence: override > prohibited > allowed
 PRECEDENCE = ["override", "prohibited", "allowed"]
 
+DECIDE_SECONDS = metrics.histogram(
+    "governance_decide_seconds", "Evaluation of one context against a compiled policy set", ("decision",)
+)
+_DECIDE_SECONDS = {d: DECIDE_SECONDS.labels(decision=d.value) for d in DecisionEnum}
+
 
 class Conflict(BaseModel):
     type: str  # "allowed_vs_prohibited" | "override_applies"
@@ -42,27 +66,28 @@ def _matches_context(policy: PolicyJSON, ctx: GovernanceContext) -> bool:
     # Phase
     if ctx.assessment_phase not in [p.value if hasattr(p, "value") else p for p in scope.assessment_phases]:
         return False
-    # Role
-    if ctx.actor_role not in [r.role for r in scope.roles]:
-        return False
-    return True
+    # Role (a role definition with a condition only matches when the condition holds)
+    for r in scope.roles:
+        if r.role == ctx.actor_role and (not r.condition or compile_expression(r.condition).evaluate(ctx)):
+            return True
+    return False
 
 
-def _policy_effect(policy: PolicyJSON, ctx: GovernanceContext) -> Tuple[str, List[Obligation], Dict[str, Any]]:
+def _policy_effect(policy: PolicyJSON, ctx: GovernanceContext) -> Tuple[str, List[ObligationRecord], Dict[str, Any]]:
     """Return one of "allowed" | "prohibited" | "override" with obligations and rule trace."""
     trace: Dict[str, Any] = {"policy_id": policy.policy_id, "version": policy.version}
-    obligations: List[Obligation] = []
+    obligations: List[ObligationRecord] = []
 
     # Overrides
     for orule in (policy.override_rules or []):
-        # naive condition check placeholder; replace with real expr engine later
-        if orule.condition and orule.effect in ("allow_all_actions", "deny_all_actions"):
+        if orule.condition and orule.effect in OVERRIDE_EFFECTS:
             trace.setdefault("overrides_checked", []).append(orule.override_id)
-            # Assume overrides apply when condition is present; in production evaluate condition
+            if not compile_expression(orule.condition).evaluate(ctx):
+                continue
             trace["override_applied"] = orule.override_id
             if orule.effect == "allow_all_actions":
                 if orule.requires_disclosure:
-                    obligations.append(Obligation(type="disclosure_required", format=orule.requires_disclosure))
+                    obligations.append(ObligationRecord("disclosure_required", orule.requires_disclosure))
                 return "override", obligations, {**trace, "override_effect": "allow_all_actions"}
             else:
                 return "override", obligations, {**trace, "override_effect": "deny_all_actions"}
@@ -78,48 +103,42 @@ def _policy_effect(policy: PolicyJSON, ctx: GovernanceContext) -> Tuple[str, Lis
         if aa.action == ctx.action and ctx.actor_role in aa.applies_to_roles and ctx.assessment_type in aa.applies_to_assessment_types:
             trace.setdefault("allowed_rules_matched", []).append(aa.action)
             if aa.disclosure_required:
-                obligations.append(Obligation(type="disclosure_required", format=aa.disclosure_format))
+                obligations.append(ObligationRecord("disclosure_required", aa.disclosure_format))
             return "allowed", obligations, trace
 
     # No rule matched
     return "none", obligations, {**trace, "no_rule": True}
 
 
-def detect_conflicts(effects: List[str]) -> List[Conflict]:
-    conflicts: List[Conflict] = []
+def _detect_conflicts(effects: List[str]) -> List[ConflictRecord]:
+    conflicts: List[ConflictRecord] = []
     if "allowed" in effects and "prohibited" in effects:
-        conflicts.append(Conflict(type="allowed_vs_prohibited", details={"message": "Same action both allowed and prohibited"}))
+        conflicts.append(ConflictRecord("allowed_vs_prohibited", {"message": "Same action both allowed and prohibited"}))
     if effects.count("override") > 1:
-        conflicts.append(Conflict(type="override_applies", details={"message": "Multiple overrides detected"}))
+        conflicts.append(ConflictRecord("override_applies", {"message": "Multiple overrides detected"}))
     return conflicts
 
 
-def decide(policies: List[PolicyJSON], ctx: GovernanceContext) -> GovernanceDecision:
-    matched: List[Dict[str, Any]] = []
-    for p in policies:
-        if _matches_context(p, ctx):
-            eff, obligations, ptrace = _policy_effect(p, ctx)
-            matched.append({
-                "policy": p,
-                "effect": eff,
-                "obligations": obligations,
-                "trace": ptrace,
-            })
+def detect_conflicts(effects: List[str]) -> List[Conflict]:
+    return [Conflict(type=c.type, details=c.details) for c in _detect_conflicts(effects)]
 
+
+def _resolve(matched: List[Dict[str, Any]]) -> Tuple[DecisionEnum, str, Optional[str], List[str], List[ObligationRecord], List[ConflictRecord]]:
+    """Apply conflict detection and precedence to the per-policy effects of one context."""
     effects = [m["effect"] for m in matched if m["effect"] != "none"]
-    conflicts = detect_conflicts(effects)
+    conflicts = _detect_conflicts(effects)
 
     # Precedence resolution
     resolved_effect: str = "none"
     applied_policy_id: str | None = None
     applied_rules: List[str] = []
-    obligations: List[Obligation] = []
+    obligations: List[ObligationRecord] = []
 
     for tier in PRECEDENCE:
         for m in matched:
             if m["effect"] == tier:
                 resolved_effect = tier
-                applied_policy_id = m["policy"].policy_id
+                applied_policy_id = m["policy_id"]
                 obligations = m["obligations"]
                 applied_rules.extend(m["trace"].get("allowed_rules_matched", []))
                 applied_rules.extend(m["trace"].get("prohibited_rules_matched", []))
@@ -149,34 +168,404 @@ def decide(policies: List[PolicyJSON], ctx: GovernanceContext) -> GovernanceDeci
     # If conflicts present and effect is ALLOW, escalate to REQUIRE_JUSTIFICATION
     if conflicts and decision == DecisionEnum.ALLOW:
         decision = DecisionEnum.REQUIRE_JUSTIFICATION
-        obligations.append(Obligation(type="justification_required"))
+        obligations.append(ObligationRecord("justification_required"))
+
+    return decision, resolved_effect, applied_policy_id, applied_rules, obligations, conflicts
+
 
-    trace: Dict[str, Any] = {
+def default_trace_level() -> TraceLevel:
+    return TraceLevel.FULL if settings.enable_detailed_traces else TraceLevel.SUMMARY
+
+
+def _build_trace(ctx: Any, matched: List[Dict[str, Any]], conflicts: List[Dict[str, Any]], resolved_effect: str, trace_level: TraceLevel) -> Dict[str, Any]:
+    if trace_level == TraceLevel.NONE:
+        return {}
+    if trace_level == TraceLevel.SUMMARY:
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "matched_policies": [
+                {"policy_id": m["policy_id"], "version": m["version"], "effect": m["effect"]}
+                for m in matched
+            ],
+            "conflicts": [c["type"] for c in conflicts],
+            "resolved_effect": resolved_effect,
+        }
+    return {
         "timestamp": datetime.utcnow().isoformat(),
-        "context": ctx.model_dump(),
+        "context": context_as_dict(ctx),
         "matched_policies": [
             {
-                "policy_id": m["policy"].policy_id,
-                "version": m["policy"].version,
+                "policy_id": m["policy_id"],
+                "version": m["version"],
                 "effect": m["effect"],
                 "trace": m["trace"],
             }
             for m in matched
         ],
-        "conflicts": [c.model_dump() for c in conflicts],
+        "conflicts": conflicts,
         "resolved_effect": resolved_effect,
     }
 
-    return GovernanceDecision(
-        decision=decision,
-        obligations=obligations,
-        trace=trace,
-        policy_id=applied_policy_id,
-        applied_rules=applied_rules,
+
+def decide(policies: List[PolicyJSON], ctx: GovernanceContext, trace_level: Optional[TraceLevel] = None) -> GovernanceDecision:
+    """Reference evaluator: scans every policy linearly.
+
+    The request path uses CompiledPolicySet.decide(), which must return the same decision.
+    """
+    matched: List[Dict[str, Any]] = []
+    for p in policies:
+        if _matches_context(p, ctx):
+            eff, obligations, ptrace = _policy_effect(p, ctx)
+            matched.append({
+                "policy_id": p.policy_id,
+                "version": p.version,
+                "effect": eff,
+                "obligations": obligations,
+                "trace": ptrace,
+            })
+
+    decision, resolved_effect, applied_policy_id, applied_rules, obligations, conflicts = _resolve(matched)
+    trace = _build_trace(ctx, matched, [c._asdict() for c in conflicts], resolved_effect, trace_level or default_trace_level())
+
+    return to_governance_decision(Decision(decision, tuple(obligations), trace, applied_policy_id, tuple(applied_rules)))
+
+
+def to_governance_decision(decision: Decision) -> GovernanceDecision:
+    """Wrap an engine Decision in the API model without re-validating it."""
+    return GovernanceDecision.model_construct(
+        decision=decision.decision,
+        obligations=[Obligation.model_construct(**o._asdict()) for o in decision.obligations],
+        trace=decision.trace,
+        policy_id=decision.policy_id,
+        applied_rules=list(decision.applied_rules),
     )
 
 
-def f(policies: List[PolicyJSON], context: GovernanceContext, action: str) -> GovernanceDecision:
+# ============================================================================
+# COMPILED POLICY INDEX
+# ============================================================================
+
+# Placeholder key for context values that no policy in the set mentions
+_OTHER = None
+
+# Compiled sets kept for compile_policies(), keyed by policy-set content hash
+_COMPILED_CACHE_SIZE = 128
+_compiled_cache: Dict[str, "CompiledPolicySet"] = {}
+
+
+def _copy_trace(trace: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: list(v) if isinstance(v, list) else v for k, v in trace.items()}
+
+
+class _CompiledPolicy:
+    """One policy with its scope as sets and its rules pre-resolved per (action, role, assessment_type)."""
+
+    __slots__ = ("policy_id", "version", "course_id", "roles", "role_conditions", "assessment_types",
+                 "assessment_phases", "overrides", "rules", "no_rule", "expressions", "snapshot")
+
+    def __init__(self, policy: PolicyJSON):
+        self._load(build_snapshot(policy))
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> "_CompiledPolicy":
+        """Rebuild from a stored snapshot (policy_compiler/snapshots.py), skipping PolicyJSON validation."""
+        compiled = cls.__new__(cls)
+        compiled._load(snapshot)
+        return compiled
+
+    def _load(self, snapshot: Dict[str, Any]) -> None:
+        self.snapshot = snapshot
+        self.policy_id = snapshot["policy_id"]
+        self.version = snapshot["version"]
+        self.course_id = snapshot["course_id"] or _OTHER
+        self.roles = frozenset(snapshot["roles"])
+        self.assessment_types = frozenset(snapshot["assessment_types"])
+        self.assessment_phases = frozenset(snapshot["assessment_phases"])
+        self.expressions: List[Expression] = []
+
+        # Conditions are compiled here, once per policy load, and evaluated per context
+        self.role_conditions: Dict[str, Tuple[Expression, ...]] = {}
+        for role, conditions in snapshot["role_conditions"].items():
+            exprs = tuple(compile_expression(c) for c in conditions)
+            self.expressions.extend(exprs)
+            self.role_conditions[role] = exprs
+
+        self.overrides: List[Tuple[str, Expression, str, Tuple[ObligationRecord, ...]]] = []
+        for override_id, condition, effect, obligations in snapshot["overrides"]:
+            expr = compile_expression(condition)
+            self.expressions.append(expr)
+            self.overrides.append((override_id, expr, effect, tuple(ObligationRecord(*o) for o in obligations)))
+
+        # One shared entry per rule, as every key a rule covers resolves the same way
+        self.rules: Dict[Tuple[str, str, str], Tuple[str, Tuple[ObligationRecord, ...], Dict[str, Any]]] = {}
+        entries: Dict[Tuple[Any, ...], Tuple[str, Tuple[ObligationRecord, ...], Dict[str, Any]]] = {}
+        for action, effect, obligations, keys in snapshot["rules"]:
+            records = tuple(ObligationRecord(*o) for o in obligations)
+            entry = entries.get((action, effect, records))
+            if entry is None:
+                entry = entries[(action, effect, records)] = (effect, records, {f"{effect}_rules_matched": [action]})
+            self.rules.update(dict.fromkeys(keys, entry))
+
+        self.no_rule = ("none", (), {"no_rule": True})
+
+    def role_matches(self, ctx: Any) -> bool:
+        conditions = self.role_conditions.get(ctx.actor_role)
+        return conditions is None or any(c.evaluate(ctx) for c in conditions)
+
+    def effect(self, ctx: Any) -> Tuple[str, Tuple[ObligationRecord, ...], Dict[str, Any]]:
+        trace: Dict[str, Any] = {"policy_id": self.policy_id, "version": self.version}
+        if self.overrides:
+            checked: List[str] = []
+            trace["overrides_checked"] = checked
+            for override_id, condition, effect, obligations in self.overrides:
+                checked.append(override_id)
+                if condition.evaluate(ctx):
+                    trace["override_applied"] = override_id
+                    trace["override_effect"] = effect
+                    return "override", obligations, trace
+        eff, obligations, rule_trace = self.rules.get((ctx.action, ctx.actor_role, ctx.assessment_type), self.no_rule)
+        trace.update(_copy_trace(rule_trace))
+        return eff, obligations, trace
+
+
+class _Resolution:
+    """Pre-resolved outcome for one index key; shared by every Decision for that key."""
+
+    __slots__ = ("decision", "resolved_effect", "policy_id", "applied_rules", "obligations", "matched", "conflicts")
+
+    def __init__(self, matched: List[Dict[str, Any]]):
+        decision, resolved_effect, policy_id, applied_rules, obligations, conflicts = _resolve(matched)
+        self.decision = decision
+        self.resolved_effect = resolved_effect
+        self.policy_id = policy_id
+        self.applied_rules = tuple(applied_rules)
+        self.obligations = tuple(obligations)
+        self.matched = tuple(
+            {"policy_id": m["policy_id"], "version": m["version"], "effect": m["effect"], "trace": m["trace"]}
+            for m in matched
+        )
+        self.conflicts = tuple(c._asdict() for c in conflicts)
+
+
+class CompiledPolicySet:
+    """
+    Hash index over a policy set for O(1) decisions.
+
+    Scope matching is indexed by (actor_role, assessment_type, assessment_phase)
+    and course_id; rules are indexed per policy by (action, role, assessment_type).
+    The resolved outcome for each (course_id, actor_role, assessment_type,
+    assessment_phase, action, accommodations) key is computed on first use and
+    kept in the shared decision cache under the set's content hash (or in the
+    given cache, for sets that must not share it); values no policy or condition
+    mentions collapse to one key.
+    """
+
+    def __init__(
+        self,
+        policies: List[PolicyJSON],
+        content_hash: Optional[str] = None,
+        cache: Optional[DecisionCache] = None
+    ):
+        self._build([_CompiledPolicy(p) for p in policies], content_hash or policy_set_hash(policies), cache)
+
+    @classmethod
+    def from_compiled(
+        cls, compiled: List[_CompiledPolicy], content_hash: str, cache: Optional[DecisionCache] = None
+    ) -> "CompiledPolicySet":
+        policy_set = cls.__new__(cls)
+        policy_set._build(compiled, content_hash, cache)
+        return policy_set
+
+    def _build(self, compiled: List[_CompiledPolicy], content_hash: str, cache: Optional[DecisionCache] = None) -> None:
+        self.version: Tuple[Tuple[str, str], ...] = tuple((cp.policy_id, cp.version) for cp in compiled)
+        self.content_hash: str = content_hash
+        self._cache = cache if cache is not None else decision_cache
+        self._policies = compiled
+
+        # Values that can change an outcome; literals used in conditions count too
+        expressions = [e for cp in self._policies for e in cp.expressions]
+
+        def mentioned(attr: str, values) -> frozenset:
+            return frozenset(values).union(*(e.literals.get(attr, ()) for e in expressions))
+
+        self._courses = mentioned("course_id", (cp.course_id for cp in self._policies if cp.course_id is not _OTHER))
+        self._actions = mentioned("action", (key[0] for cp in self._policies for key in cp.rules))
+        self._roles = mentioned("actor_role", (r for cp in self._policies for r in cp.roles))
+        self._assessment_types = mentioned("assessment_type", (t for cp in self._policies for t in cp.assessment_types))
+        self._assessment_phases = mentioned("assessment_phase", (ph for cp in self._policies for ph in cp.assessment_phases))
+        self._accommodations = frozenset().union(*(e.accommodations for e in expressions))
+
+        # (role, assessment_type, phase) -> course_id (or _OTHER for course-agnostic) -> policy positions
+        self._scope: Dict[Tuple[str, str, str], Dict[Optional[str], List[int]]] = {}
+        for i, cp in enumerate(self._policies):
+            for role in cp.roles:
+                for assessment_type in cp.assessment_types:
+                    for phase in cp.assessment_phases:
+                        by_course = self._scope.setdefault((role, assessment_type, phase), {})
+                        by_course.setdefault(cp.course_id, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self._policies)
+
+    def _key(self, ctx: Any) -> Tuple[Any, ...]:
+        accommodations = frozenset()
+        if self._accommodations and ctx.approved_accommodations:
+            accommodations = self._accommodations.intersection(ctx.approved_accommodations)
+        return (
+            ctx.course_id if ctx.course_id in self._courses else _OTHER,
+            ctx.actor_role if ctx.actor_role in self._roles else _OTHER,
+            ctx.assessment_type if ctx.assessment_type in self._assessment_types else _OTHER,
+            ctx.assessment_phase if ctx.assessment_phase in self._assessment_phases else _OTHER,
+            ctx.action if ctx.action in self._actions else _OTHER,
+            accommodations,
+        )
+
+    def _candidates(self, course_id: Optional[str], role: Optional[str], assessment_type: Optional[str], phase: Optional[str]) -> List[int]:
+        by_course = self._scope.get((role, assessment_type, phase))
+        if not by_course:
+            return []
+        positions = list(by_course.get(_OTHER, ()))
+        if course_id is not _OTHER:
+            positions.extend(by_course.get(course_id, ()))
+            positions.sort()  # keep policy order for precedence ties
+        return positions
+
+    def _lookup(self, ctx: Any) -> _Resolution:
+        key = self._key(ctx)
+        resolution = self._cache.get(self.content_hash, key)
+        if resolution is None:
+            course_id, role, assessment_type, phase = key[:4]
+            matched: List[Dict[str, Any]] = []
+            for i in self._candidates(course_id, role, assessment_type, phase):
+                cp = self._policies[i]
+                if not cp.role_matches(ctx):
+                    continue
+                eff, obligations, ptrace = cp.effect(ctx)
+                matched.append({
+                    "policy_id": cp.policy_id,
+                    "version": cp.version,
+                    "effect": eff,
+                    "obligations": list(obligations),
+                    "trace": ptrace,
+                })
+            resolution = _Resolution(matched)
+            self._cache.put(self.content_hash, key, resolution)
+        return resolution
+
+    def evaluate(self, ctx: Any, trace_level: Optional[TraceLevel] = None) -> Decision:
+        """
+        Decide for a DecisionContext (or any object with the same attributes,
+        including GovernanceContext) without touching Pydantic.
+        """
+        started = time.perf_counter()
+        r = self._lookup(ctx)
+        trace_level = trace_level or default_trace_level()
+        if trace_level == TraceLevel.FULL:
+            matched = [{**m, "trace": _copy_trace(m["trace"])} for m in r.matched]
+            conflicts = [{"type": c["type"], "details": dict(c["details"])} for c in r.conflicts]
+            trace = _build_trace(ctx, matched, conflicts, r.resolved_effect, trace_level)
+        else:
+            trace = _build_trace(ctx, r.matched, r.conflicts, r.resolved_effect, trace_level)
+        _DECIDE_SECONDS[r.decision].observe(time.perf_counter() - started)
+        return Decision(r.decision, r.obligations, trace, r.policy_id, r.applied_rules)
+
+    def evaluate_many(self, contexts: Iterable[Any], trace_level: Optional[TraceLevel] = None) -> Iterator[Decision]:
+        for ctx in contexts:
+            yield self.evaluate(ctx, trace_level)
+
+    def decide(self, ctx: Any, trace_level: Optional[TraceLevel] = None) -> GovernanceDecision:
+        """Same result as decide(policies, ctx, trace_level), via the index."""
+        return to_governance_decision(self.evaluate(ctx, trace_level))
+
+    def pack(self) -> bytes:
+        """
+        The set as msgpack'd policy snapshots, for sharing between workers. Compiled
+        conditions are closures and cannot be pickled; from_packed() recompiles them.
+        """
+        return pack_snapshot({
+            "format": SNAPSHOT_FORMAT,
+            "content_hash": self.content_hash,
+            "policies": [cp.snapshot for cp in self._policies],
+        })
+
+    @classmethod
+    def from_packed(cls, blob: bytes) -> Optional["CompiledPolicySet"]:
+        """Rebuild a pack()ed set; None if the blob is corrupt or of another snapshot format."""
+        packed = read_snapshot(blob)
+        if packed is None:
+            return None
+        try:
+            compiled = [_CompiledPolicy.from_snapshot(s) for s in packed["policies"]]
+        except (KeyError, TypeError, ValueError):  # includes ExpressionError
+            return None
+        return cls.from_compiled(compiled, packed["content_hash"])
+
+
+def policy_set_version(policies: List[PolicyJSON]) -> Tuple[Tuple[str, str], ...]:
+    return tuple((p.policy_id, p.version) for p in policies)
+
+
+def policy_set_hash(policies: List[PolicyJSON]) -> str:
+    """Content hash of a policy set; any edit to a participating policy changes it."""
+    digest = hashlib.sha256()
+    for p in policies:
+        digest.update(p.model_dump_json().encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def compile_policy_rows(
+    rows: Sequence[Any], snapshots: Optional[List[Optional[Dict[str, Any]]]] = None
+) -> CompiledPolicySet:
+    """
+    Compiled set for stored Policy rows, in order: each row is rebuilt from its
+    snapshot when the snapshot was built from the content its content_hash names,
+    else by validating content (the only case that reads it). snapshots, when given,
+    is read_row_snapshots(rows).
+    """
+    if snapshots is None:
+        snapshots = read_row_snapshots(rows)
+    compiled: List[_CompiledPolicy] = []
+    digest = hashlib.sha256()
+    with paused_gc():
+        for row, snapshot in zip(rows, snapshots):
+            if snapshot is not None:
+                compiled.append(_CompiledPolicy.from_snapshot(snapshot))
+                row_hash = row.content_hash
+            else:
+                compiled.append(_CompiledPolicy(PolicyJSON.model_validate(row.content)))
+                row_hash = content_hash(row.content)
+            digest.update(row_hash.encode())
+            digest.update(b"\n")
+        # Stored-content hashes: a distinct key space from policy_set_hash(), equally edit-sensitive
+        return CompiledPolicySet.from_compiled(compiled, "rows:" + digest.hexdigest())
+
+
+def compile_policies(policies: List[PolicyJSON]) -> CompiledPolicySet:
+    """
+    Return the compiled index for a policy set, building it once per policy-set content.
+    The content hash is recomputed on every call: PolicyJSON is mutable, so an edited
+    policy must not be served from the set compiled before the edit.
+    """
+    content_hash = policy_set_hash(policies)
+    compiled = _compiled_cache.get(content_hash)
+    if compiled is None:
+        compiled = CompiledPolicySet(policies, content_hash)
+        if len(_compiled_cache) >= _COMPILED_CACHE_SIZE:
+            evicted = _compiled_cache.pop(next(iter(_compiled_cache)))
+            decision_cache.invalidate(evicted.content_hash)
+        _compiled_cache[content_hash] = compiled
+    return compiled
+
+
+def evaluate(policies: List[PolicyJSON], ctx: Any, trace_level: Optional[TraceLevel] = None) -> Decision:
+    """Public engine entry point for offline jobs: returns a slotted Decision."""
+    return compile_policies(policies).evaluate(ctx, trace_level)
+
+
+def f(policies: List[PolicyJSON], context: GovernanceContext, action: str, trace_level: Optional[TraceLevel] = None) -> GovernanceDecision:
     # Ensure action in context for compatibility with spec signature
-    ctx = GovernanceContext(**{**context.model_dump(), "action": action})
-    return decide(policies, ctx)
+    ctx = context if context.action == action else context.model_copy(update={"action": action})
+    # Linear scan: the policies are the caller's (mutable) objects, and hashing them to find
+    # a compiled set costs more than evaluating them once
+    return decide(policies, ctx, trace_level)
@@ -0,0 +1,201 @@
+"""
+Implements: Condition language for OverrideRule.condition and RoleDefinition.condition
+
+How it satisfies constraints:
+- Small, sandboxed grammar: no attribute access, no arbitrary calls, no eval()
+- Conditions are parsed once and compiled to closures, cached by expression text
+- Only context metadata is visible (course_id, actor_role, action, assessment_type,
+  assessment_phase) plus has_approved_accommodation('<kind>'); no PII. The API
+  fills the kinds in from the server's records (accommodations.py), not the request
+
+Grammar (keywords are case-insensitive):
+    expr    := and_expr (("or" | "||") and_expr)*
+    and_expr:= not_expr (("and" | "&&") not_expr)*
+    not_expr:= ("not" | "!") not_expr | atom
+    atom    := "(" expr ")" | "true" | "false" | call | comparison
+    call    := "has_approved_accommodation" "(" STRING ")"
+    comparison := NAME ("==" | "=" | "!=") STRING
+                | NAME ["not"] "in" "[" STRING ("," STRING)* "]"
+
+Examples:
+    has_approved_accommodation('genai_use')
+    role = 'student' and assessment_type in ['project', 'problem_set']
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+# Context attributes visible to conditions (aliases map to the canonical name)
+ATTRIBUTES = {
+    "course_id": "course_id",
+    "actor_role": "actor_role",
+    "role": "actor_role",
+    "action": "action",
+    "assessment_type": "assessment_type",
+    "assessment_phase": "assessment_phase",
+    "phase": "assessment_phase",
+}
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<string>'[^']*'|"[^"]*")
+      | (?P<op>==|!=|&&|\|\||=|!|\(|\)|\[|\]|,)
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    )""", re.VERBOSE)
+
+
+class ExpressionError(ValueError):
+    """Raised when a condition cannot be parsed."""
+
+
+class Expression:
+    """A compiled condition: evaluate(ctx) -> bool, plus the literals it mentions."""
+
+    __slots__ = ("source", "evaluate", "literals", "accommodations")
+
+    def __init__(self, source: str, evaluate: Callable[[Any], bool],
+                 literals: Dict[str, FrozenSet[str]], accommodations: FrozenSet[str]):
+        self.source = source
+        self.evaluate = evaluate
+        # attribute -> string literals it is compared with; lets callers tell
+        # which context values can change the outcome
+        self.literals = literals
+        self.accommodations = accommodations
+
+    def __repr__(self) -> str:
+        return f"Expression({self.source!r})"
+
+
+def _tokenize(source: str) -> List[Tuple[str, str]]:
+    tokens: List[Tuple[str, str]] = []
+    pos = 0
+    source = source.rstrip()
+    while pos < len(source):
+        m = _TOKEN.match(source, pos)
+        if not m:
+            raise ExpressionError(f"Unexpected character at {pos} in condition {source!r}")
+        pos = m.end()
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == "string":
+            value = value[1:-1]
+        elif kind == "name" and value.lower() in ("and", "or", "not", "in", "true", "false"):
+            kind, value = "op", value.lower()
+        tokens.append((kind, value))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens = _tokenize(source)
+        self.pos = 0
+        self.literals: Dict[str, set] = {}
+        self.accommodations: set = set()
+
+    def _peek(self) -> Tuple[str, str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else ("end", "")
+
+    def _take(self, kind: str, value: Optional[str] = None) -> str:
+        tok_kind, tok_value = self._peek()
+        if tok_kind != kind or (value is not None and tok_value != value):
+            expected = value or kind
+            raise ExpressionError(f"Expected {expected!r} but found {tok_value or 'end'!r} in condition {self.source!r}")
+        self.pos += 1
+        return tok_value
+
+    def _accept(self, *values: str) -> bool:
+        kind, value = self._peek()
+        if kind == "op" and value in values:
+            self.pos += 1
+            return True
+        return False
+
+    def parse(self) -> Callable[[Any], bool]:
+        if not self.tokens:
+            raise ExpressionError("Empty condition")
+        fn = self._or()
+        if self.pos != len(self.tokens):
+            raise ExpressionError(f"Unexpected {self._peek()[1]!r} in condition {self.source!r}")
+        return fn
+
+    def _or(self) -> Callable[[Any], bool]:
+        terms = [self._and()]
+        while self._accept("or", "||"):
+            terms.append(self._and())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda ctx: any(t(ctx) for t in terms)
+
+    def _and(self) -> Callable[[Any], bool]:
+        terms = [self._not()]
+        while self._accept("and", "&&"):
+            terms.append(self._not())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda ctx: all(t(ctx) for t in terms)
+
+    def _not(self) -> Callable[[Any], bool]:
+        if self._accept("not", "!"):
+            inner = self._not()
+            return lambda ctx: not inner(ctx)
+        return self._atom()
+
+    def _atom(self) -> Callable[[Any], bool]:
+        if self._accept("("):
+            fn = self._or()
+            self._take("op", ")")
+            return fn
+        if self._accept("true"):
+            return lambda ctx: True
+        if self._accept("false"):
+            return lambda ctx: False
+
+        name = self._take("name")
+        if name == "has_approved_accommodation":
+            self._take("op", "(")
+            kind = self._take("string")
+            self._take("op", ")")
+            self.accommodations.add(kind)
+            return lambda ctx: kind in ctx.approved_accommodations
+        if name not in ATTRIBUTES:
+            raise ExpressionError(f"Unknown name {name!r} in condition {self.source!r}")
+        attr = ATTRIBUTES[name]
+
+        if self._accept("==", "="):
+            value = self._take("string")
+            self.literals.setdefault(attr, set()).add(value)
+            return lambda ctx: getattr(ctx, attr) == value
+        if self._accept("!="):
+            value = self._take("string")
+            self.literals.setdefault(attr, set()).add(value)
+            return lambda ctx: getattr(ctx, attr) != value
+        negate = self._accept("not")
+        self._take("op", "in")
+        values = frozenset(self._string_list())
+        self.literals.setdefault(attr, set()).update(values)
+        if negate:
+            return lambda ctx: getattr(ctx, attr) not in values
+        return lambda ctx: getattr(ctx, attr) in values
+
+    def _string_list(self) -> List[str]:
+        self._take("op", "[")
+        values = [self._take("string")]
+        while self._accept(","):
+            values.append(self._take("string"))
+        self._take("op", "]")
+        return values
+
+
+@lru_cache(maxsize=4096)
+def compile_expression(source: str) -> Expression:
+    """Parse and compile a condition once; repeated texts share the compiled closure."""
+    parser = _Parser(source)
+    evaluate = parser.parse()
+    return Expression(
+        source=source,
+        evaluate=evaluate,
+        literals={attr: frozenset(values) for attr, values in parser.literals.items()},
+        accommodations=frozenset(parser.accommodations),
+    )
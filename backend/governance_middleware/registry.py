@@ -0,0 +1,180 @@
+"""
+Implements: Active-policy registry for server-side evaluation
+
+How it satisfies constraints:
+- Resolves a course's active policies from the policies table (deprecated_at IS NULL)
+- Builds them from their stored compiled snapshots when valid (no PolicyJSON validation),
+  loading rows without `content` and fetching it only for rows that need validation
+- Keeps parsed and compiled policies in-process, keyed by course_id
+- Revalidates each entry with a cheap (policy_id, version) query, so publishing or
+  deprecating a policy version invalidates the cached compilation and its cached decisions
+- With a shared L2 (shared_cache.RedisTier), a compilation is keyed by the active
+  (policy_id, version) pairs and stored as its msgpack snapshots (compiled
+  conditions are closures), so one worker loads from the database and the others
+  rebuild from the snapshots; invalidate() is broadcast so every worker drops its copy
+- Counts lookups by where they were answered and times loads from the database
+- get_async() awaits its queries on the async driver and runs Redis lookups and
+  compilation in a worker thread, so neither blocks the event loop
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import anyio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, defer, undefer
+
+from ..config import settings
+from ..models import Policy
+from .enforcement import CompiledPolicySet, compile_policy_rows
+from ..policy_compiler.snapshots import read_row_snapshots
+from .decision_cache import decision_cache
+from .shared_cache import RedisTier, shared_tier
+from metrics import registry as metrics
+
+LOOKUPS = metrics.counter(
+    "governance_policy_registry_lookups_total",
+    "Compiled policy set lookups by where they were answered (local, shared, database, none)",
+    ("source",)
+)
+_LOOKUPS = {source: LOOKUPS.labels(source=source) for source in ("local", "shared", "database", "none")}
+LOAD_SECONDS = metrics.histogram(
+    "governance_policy_load_seconds", "Loading and compiling a course's active policies from the database"
+)
+
+
+def _active(query, course_id: str):
+    return query.filter(
+        Policy.course_id == course_id,
+        Policy.deprecated_at.is_(None)
+    ).order_by(Policy.effective_from, Policy.policy_id)
+
+
+def _active_rows(course_id: str):
+    """The course's active Policy rows, without `content` (see _content)."""
+    return _active(select(Policy), course_id).options(defer(Policy.content))
+
+
+def _content(rows: Sequence[Policy], snapshots: List[Optional[Dict[str, Any]]]):
+    """Statement filling in `content` of the rows without a usable snapshot, or None if there are none."""
+    policy_ids = [row.policy_id for row, snapshot in zip(rows, snapshots) if snapshot is None]
+    if not policy_ids:
+        return None
+    return select(Policy).where(Policy.policy_id.in_(policy_ids)).options(undefer(Policy.content))
+
+
+class PolicyRegistry:
+    """In-process cache of compiled active policies per course."""
+
+    def __init__(self, l2: Optional[RedisTier] = None):
+        self._compiled: Dict[str, CompiledPolicySet] = {}
+        self._lock = threading.Lock()
+        self.l2 = l2
+        if l2 is not None:
+            l2.subscribe(self._drop_local)
+
+    def active_version(self, course_id: str, db: Session) -> Tuple[Tuple[str, str], ...]:
+        """(policy_id, version) pairs of the course's active policies, in precedence order."""
+        rows = _active(db.query(Policy.policy_id, Policy.version), course_id).all()
+        return tuple((row.policy_id, row.version) for row in rows)
+
+    def get(self, course_id: str, db: Session) -> Optional[CompiledPolicySet]:
+        """Return the compiled active policy set for a course, or None if it has none."""
+        version = self.active_version(course_id, db)
+        if not version:
+            return self._none(course_id)
+        compiled = self._local(course_id, version)
+        if compiled is None:
+            compiled = self._shared(course_id, version)
+        if compiled is None:
+            started = time.perf_counter()
+            rows = db.execute(_active_rows(course_id)).scalars().all()
+            snapshots = read_row_snapshots(rows)
+            statement = _content(rows, snapshots)
+            if statement is not None:
+                db.execute(statement).scalars().all()
+            compiled = self._load(course_id, version, rows, snapshots, started)
+        return compiled
+
+    async def get_async(self, course_id: str, db: AsyncSession) -> Optional[CompiledPolicySet]:
+        """get() for an AsyncSession."""
+        rows = await db.execute(_active(select(Policy.policy_id, Policy.version), course_id))
+        version = tuple((row.policy_id, row.version) for row in rows)
+        if not version:
+            return self._none(course_id)
+        compiled = self._local(course_id, version)
+        if compiled is None and self.l2 is not None:
+            compiled = await anyio.to_thread.run_sync(self._shared, course_id, version)
+        if compiled is None:
+            started = time.perf_counter()
+            rows = (await db.execute(_active_rows(course_id))).scalars().all()
+            snapshots = await anyio.to_thread.run_sync(read_row_snapshots, rows)
+            statement = _content(rows, snapshots)
+            if statement is not None:
+                (await db.execute(statement)).scalars().all()
+            compiled = await anyio.to_thread.run_sync(self._load, course_id, version, rows, snapshots, started)
+        return compiled
+
+    def _none(self, course_id: str) -> None:
+        self._drop_local(course_id)
+        _LOOKUPS["none"].inc()
+
+    def _local(self, course_id: str, version: Tuple[Tuple[str, str], ...]) -> Optional[CompiledPolicySet]:
+        cached = self._compiled.get(course_id)
+        if cached is not None and cached.version == version:
+            _LOOKUPS["local"].inc()
+            return cached
+        return None
+
+    def _shared(self, course_id: str, version: Tuple[Tuple[str, str], ...]) -> Optional[CompiledPolicySet]:
+        packed = self.l2.get(course_id, version) if self.l2 is not None else None
+        compiled = CompiledPolicySet.from_packed(packed) if packed is not None else None
+        if compiled is not None:
+            _LOOKUPS["shared"].inc()
+            self._keep(course_id, compiled)
+        return compiled
+
+    def _load(
+        self, course_id: str, version: Tuple[Tuple[str, str], ...], rows: Sequence[Policy],
+        snapshots: List[Optional[Dict[str, Any]]], started: float
+    ) -> CompiledPolicySet:
+        compiled = compile_policy_rows(rows, snapshots)
+        LOAD_SECONDS.observe(time.perf_counter() - started)
+        _LOOKUPS["database"].inc()
+        if self.l2 is not None:
+            self.l2.put(course_id, version, compiled.pack())
+        self._keep(course_id, compiled)
+        return compiled
+
+    def _keep(self, course_id: str, compiled: CompiledPolicySet) -> None:
+        with self._lock:
+            cached = self._compiled.get(course_id)
+            self._compiled[course_id] = compiled
+        if cached is not None and cached.content_hash != compiled.content_hash:
+            decision_cache.invalidate(cached.content_hash)
+
+    def invalidate(self, course_id: Optional[str] = None) -> None:
+        """Drop one course's entry, or every entry when course_id is None, on every worker."""
+        self._drop_local(course_id)
+        if self.l2 is not None:
+            self.l2.bump(course_id)
+
+    def _drop_local(self, course_id: Optional[str]) -> None:
+        with self._lock:
+            if course_id is None:
+                dropped = list(self._compiled.values())
+                self._compiled.clear()
+            else:
+                entry = self._compiled.pop(course_id, None)
+                dropped = [entry] if entry is not None else []
+        for compiled in dropped:
+            decision_cache.invalidate(compiled.content_hash)
+
+
+# Global registry instance
+policy_registry = PolicyRegistry(l2=shared_tier("policies", settings.decision_cache_ttl_seconds))
+metrics.gauge(
+    "governance_policy_registry_courses", "Courses with a compiled policy set held by this worker"
+).set_function(lambda: len(policy_registry._compiled))
@@ -0,0 +1,177 @@
+"""
+Implements: What-if replay of the transparency ledger against a draft policy
+
+How it satisfies constraints:
+- Streams ai_use_logs for a course or institution with the grouping done in SQL,
+  so memory depends on distinct (course, action, assessment_type, decision) keys,
+  not on ledger size
+- Re-evaluates each group against the compiled draft, fanned out over a process
+  pool in bounded chunks; draft outcomes are cached per replay, never in the
+  shared decision cache that live enforcement reads
+- Reports counts per (action, assessment_type, old -> new decision); no pseudonyms
+  leave the database
+
+The ledger does not record actor_role or assessment_phase, so both are replay
+parameters (default: student during submission). It does not record accommodations
+either: has_approved_accommodation() conditions are false during replay, so events
+of accommodation holders can show up as flips (e.g. ALLOW -> DENY) that would not
+happen to them.
+"""
+
+import os
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..models import AIUseLogORM, Policy, PolicyJSON, ReplayReport, ReplayTransition, TraceLevel
+from .core import DecisionContext
+from .decision_cache import DecisionCache
+from .enforcement import CompiledPolicySet
+
+REPLAY_CHUNK_SIZE = 5000
+
+# (course_id, action, assessment_type, old_decision, events)
+GroupedRow = Tuple[str, str, str, str, int]
+
+# Per-process engine, set by _init_worker()
+_worker_engine: Optional[Tuple[CompiledPolicySet, str, str]] = None
+
+
+def _init_worker(draft: Dict[str, Any], actor_role: str, assessment_phase: str) -> None:
+    global _worker_engine
+    compiled = CompiledPolicySet([PolicyJSON.model_validate(draft)], cache=DecisionCache())
+    _worker_engine = (compiled, actor_role, assessment_phase)
+
+
+def _evaluate_chunk(rows: List[GroupedRow], engine: Optional[Tuple[CompiledPolicySet, str, str]] = None) -> Counter:
+    compiled, actor_role, assessment_phase = engine or _worker_engine
+    counts: Counter = Counter()
+    for course_id, action, assessment_type, old_decision, events in rows:
+        ctx = DecisionContext(course_id, actor_role, action, assessment_type, assessment_phase)
+        new_decision = compiled.evaluate(ctx, TraceLevel.NONE).decision.value
+        counts[(action, assessment_type, old_decision, new_decision)] += events
+    return counts
+
+
+def _grouped_rows(
+    db: Session,
+    course_id: Optional[str],
+    institution_id: Optional[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    chunk_size: int
+) -> Iterator[GroupedRow]:
+    query = db.query(
+        AIUseLogORM.course_id,
+        AIUseLogORM.action,
+        AIUseLogORM.assessment_type,
+        AIUseLogORM.decision,
+        func.count().label("events")
+    )
+    if course_id:
+        query = query.filter(AIUseLogORM.course_id == course_id)
+    if institution_id:
+        courses = select(Policy.course_id).where(Policy.institution_id == institution_id)
+        query = query.filter(AIUseLogORM.course_id.in_(courses))
+    if since:
+        query = query.filter(AIUseLogORM.timestamp >= since)
+    if until:
+        query = query.filter(AIUseLogORM.timestamp < until)
+    query = query.group_by(
+        AIUseLogORM.course_id, AIUseLogORM.action, AIUseLogORM.assessment_type, AIUseLogORM.decision
+    )
+    for row in query.yield_per(chunk_size):
+        yield tuple(row)
+
+
+def _chunks(rows: Iterable[GroupedRow], size: int) -> Iterator[List[GroupedRow]]:
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def replay_policy(
+    draft: PolicyJSON,
+    db: Session,
+    course_id: Optional[str] = None,
+    institution_id: Optional[str] = None,
+    actor_role: str = "student",
+    assessment_phase: str = "submission",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = REPLAY_CHUNK_SIZE
+) -> ReplayReport:
+    """
+    Re-evaluate historical ledger events against a draft policy and report which
+    decisions would change. workers=None uses every core; workers=1 stays in-process.
+
+    A course-scoped draft only replays its own course's events, also when asked
+    for a whole institution; other courses' events would match no policy in it.
+    """
+    if not course_id and not institution_id:
+        raise ValueError("course_id or institution_id is required")
+    draft_course = draft.scope.course_id
+    if draft_course:
+        if course_id and course_id != draft_course:
+            raise ValueError(f"draft is scoped to course {draft_course}, not {course_id}")
+        course_id = draft_course
+
+    counts: Counter = Counter()
+    chunks = _chunks(_grouped_rows(db, course_id, institution_id, since, until, chunk_size), chunk_size)
+    first = next(chunks, None)
+    second = next(chunks, None) if first is not None else None
+    workers = workers or os.cpu_count() or 1
+
+    if first is not None and (workers == 1 or second is None):
+        # Small replays are not worth a process pool
+        engine = (CompiledPolicySet([draft], cache=DecisionCache()), actor_role, assessment_phase)
+        for chunk in chain([first], [second] if second else [], chunks):
+            counts.update(_evaluate_chunk(chunk, engine))
+    elif first is not None:
+        initargs = (draft.model_dump(mode="json"), actor_role, assessment_phase)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            pending = set()
+            for chunk in chain([first, second], chunks):
+                pending.add(pool.submit(_evaluate_chunk, chunk))
+                # Bound in-flight chunks so memory stays flat on large ledgers
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        counts.update(future.result())
+            for future in pending:
+                counts.update(future.result())
+
+    transitions = [
+        ReplayTransition(action=action, assessment_type=assessment_type,
+                         old_decision=old, new_decision=new, count=count)
+        for (action, assessment_type, old, new), count in counts.items()
+    ]
+    transitions.sort(key=lambda t: (t.old_decision == t.new_decision, -t.count, t.action, t.assessment_type))
+
+    summary: Dict[str, int] = {}
+    for t in transitions:
+        if t.old_decision != t.new_decision:
+            key = f"{t.old_decision}->{t.new_decision}"
+            summary[key] = summary.get(key, 0) + t.count
+
+    return ReplayReport(
+        draft_policy_id=draft.policy_id,
+        draft_version=draft.version,
+        course_id=course_id,
+        institution_id=institution_id,
+        actor_role=actor_role,
+        assessment_phase=assessment_phase,
+        total_events=sum(t.count for t in transitions),
+        changed_events=sum(summary.values()),
+        summary=summary,
+        transitions=transitions
+    )
@@ -0,0 +1,59 @@
+"""
+Implements: Fast JSON and NDJSON responses for the governance API
+
+How it satisfies constraints:
+- Encodes model_dump() output with orjson (datetimes, enums and UUIDs natively)
+  instead of FastAPI's recursive jsonable_encoder walk
+- Routes return FastJSONResponse themselves, so FastAPI does not re-validate the
+  value against response_model (still declared, for the OpenAPI schema)
+- ndjson_response() streams large lists one JSON document per line, from a sync
+  or async iterable, without building the whole body
+"""
+
+from decimal import Decimal
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Union
+
+import orjson
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+RESPONSE_FORMATS = ("json", "ndjson")
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _default(obj: Any) -> Any:
+    """Types orjson does not encode natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    if isinstance(content, BaseModel):
+        content = content.model_dump()
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson; accepts Pydantic models directly."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+async def _ndjson_lines(items: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[bytes]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield dumps(item) + b"\n"
+    else:
+        for item in items:
+            yield dumps(item) + b"\n"
+
+
+def ndjson_response(items: Union[Iterable[Any], AsyncIterable[Any]]) -> StreamingResponse:
+    """Stream items as newline-delimited JSON."""
+    return StreamingResponse(_ndjson_lines(items), media_type=NDJSON_MEDIA_TYPE)
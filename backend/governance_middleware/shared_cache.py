@@ -0,0 +1,235 @@
+"""
+Implements: Redis second-level cache shared across uvicorn workers
+
+How it satisfies constraints:
+- Each worker keeps its in-process L1 (DecisionCache, PolicyRegistry); RedisTier is
+  the L2 behind it, so a value computed by one worker is reused by the others
+- L2 keys embed a per-scope version; bump() increments it in Redis and publishes it,
+  so every worker stops reading older entries and drops its L1 copies (old L2
+  entries expire by TTL)
+- Values are pickled (Redis is an internal, trusted service); callers share plain
+  data (e.g. msgpack snapshots), not live objects. Any Redis or (un)pickling error
+  is counted and treated as a miss, so workers keep serving from L1 and the database
+"""
+
+import hashlib
+import logging
+import pickle
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from ..config import settings
+
+if TYPE_CHECKING:
+    import redis
+
+logger = logging.getLogger(__name__)
+
+ALL_SCOPES = "*"
+
+
+class RedisTier:
+    """Versioned L2 cache namespace in Redis, with pub/sub invalidation."""
+
+    def __init__(
+        self,
+        namespace: str,
+        client: "redis.Redis",
+        ttl_seconds: float = 300.0,
+        version_check_seconds: float = 5.0,
+        failure_threshold: int = 3,
+        backoff_seconds: float = 30.0
+    ):
+        import redis  # deferred: workers without shared caches never load the client
+        self.namespace = namespace
+        self._errors: Tuple[type, ...] = (redis.RedisError, OSError)
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        # Upper bound on staleness if an invalidation message is missed
+        self.version_check_seconds = version_check_seconds
+        # After failure_threshold Redis errors in a row, skip Redis for backoff_seconds
+        self.failure_threshold = failure_threshold
+        self.backoff_seconds = backoff_seconds
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.skipped = 0
+        self._consecutive_failures = 0
+        self._retry_at = 0.0
+        self._versions: Dict[str, Tuple[float, int]] = {}  # scope -> (checked_at, version)
+        self._listeners: List[Callable[[Optional[str]], None]] = []
+        self._listener_thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def channel(self) -> str:
+        return f"cache:{self.namespace}:invalidate"
+
+    def _version_key(self, scope: str) -> str:
+        return f"cache:{self.namespace}:version:{scope}"
+
+    def _available(self) -> bool:
+        """False while backing off from a failing Redis (the call is skipped, not attempted)."""
+        if self._retry_at and time.monotonic() < self._retry_at:
+            self.skipped += 1
+            return False
+        return True
+
+    def _succeeded(self) -> None:
+        self._consecutive_failures = 0
+        self._retry_at = 0.0
+
+    def _failed(self, op: str, error: Exception, transport: bool = True) -> None:
+        self.errors += 1
+        if self.errors == 1:
+            logger.warning("Shared cache %s %s failed, serving without L2: %s", self.namespace, op, error)
+        if not transport:
+            return  # a value that does not (un)pickle says nothing about Redis' health
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.failure_threshold:
+            if not self._retry_at:
+                logger.warning("Shared cache %s: %d Redis errors in a row, skipping Redis for %.0fs",
+                               self.namespace, self._consecutive_failures, self.backoff_seconds)
+            self._retry_at = time.monotonic() + self.backoff_seconds
+
+    def _versions_for(self, scope: str) -> Tuple[int, int]:
+        """(namespace-wide version, scope version), refreshed from Redis at most every version_check_seconds."""
+        now = time.monotonic()
+        known = [self._versions.get(ALL_SCOPES), self._versions.get(scope)]
+        if all(v is not None and now - v[0] < self.version_check_seconds for v in known):
+            return known[0][1], known[1][1]
+        values = self.client.mget([self._version_key(ALL_SCOPES), self._version_key(scope)])
+        versions = tuple(int(v) if v is not None else 0 for v in values)
+        with self._lock:
+            self._versions[ALL_SCOPES] = (now, versions[0])
+            self._versions[scope] = (now, versions[1])
+        return versions
+
+    def _key(self, scope: str, key: Hashable) -> str:
+        generation, version = self._versions_for(scope)
+        digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).hexdigest()
+        return f"cache:{self.namespace}:{generation}.{version}:{scope}:{digest}"
+
+    def get(self, scope: str, key: Hashable) -> Optional[Any]:
+        if not self._available():
+            self.misses += 1
+            return None
+        try:
+            raw = self.client.get(self._key(scope, key))
+        except self._errors as e:
+            self._failed("get", e)
+            return None
+        self._succeeded()
+        if raw is None:
+            self.misses += 1
+            return None
+        try:
+            value = pickle.loads(raw)
+        except Exception as e:  # truncated value, class renamed since it was stored, ...
+            self._failed("get", e, transport=False)
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, scope: str, key: Hashable, value: Any) -> None:
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:  # unpicklable values (closures, locks) are simply not shared
+            self._failed("put", e, transport=False)
+            return
+        if not self._available():
+            return
+        try:
+            self.client.set(self._key(scope, key), payload, px=int(self.ttl_seconds * 1000))
+        except self._errors as e:
+            self._failed("put", e)
+            return
+        self._succeeded()
+
+    def bump(self, scope: Optional[str] = None) -> Optional[int]:
+        """Retire every entry of a scope (or of the whole namespace) on all workers."""
+        scope = scope or ALL_SCOPES
+        if not self._available():
+            return None  # other workers fall back to their TTLs
+        try:
+            version = self.client.incr(self._version_key(scope))
+            self.client.publish(self.channel, f"{scope}\n{version}")
+        except self._errors as e:
+            self._failed("bump", e)
+            return None
+        self._succeeded()
+        self._apply(scope, version)
+        return version
+
+    def _apply(self, scope: str, version: int) -> None:
+        with self._lock:
+            known = self._versions.get(scope)
+            if known is not None and known[1] >= version:
+                return
+            self._versions[scope] = (time.monotonic(), version)
+        for listener in list(self._listeners):
+            listener(None if scope == ALL_SCOPES else scope)
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        data = message["data"]
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        scope, _, version = data.partition("\n")
+        if version.isdigit():
+            self._apply(scope, int(version))
+
+    def subscribe(self, listener: Callable[[Optional[str]], None]) -> None:
+        """
+        Call listener(scope) when a scope's version moves (scope None: whole namespace),
+        whether bumped here or by another worker.
+        """
+        self._listeners.append(listener)
+        with self._lock:
+            if self._listener_thread is not None:
+                return
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{self.channel: self._on_message})
+                self._listener_thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+            except self._errors as e:
+                self._failed("subscribe", e)
+
+    def close(self) -> None:
+        with self._lock:
+            thread, self._listener_thread = self._listener_thread, None
+        if thread is not None:
+            thread.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_client: Optional["redis.Redis"] = None
+
+
+def shared_redis() -> Optional["redis.Redis"]:
+    """Process-wide Redis client for shared caches, or None when they are disabled."""
+    global _client
+    if not settings.shared_cache_enabled:
+        return None
+    if _client is None:
+        import redis
+        _client = redis.Redis.from_url(
+            settings.redis_url,
+            socket_timeout=settings.shared_cache_timeout_seconds,
+            socket_connect_timeout=settings.shared_cache_timeout_seconds
+        )
+    return _client
+
+
+def shared_tier(namespace: str, ttl_seconds: float) -> Optional[RedisTier]:
+    client = shared_redis()
+    return RedisTier(namespace, client, ttl_seconds) if client is not None else None
@@ -11,4 +11,4 @@ if __name__ == "__main__":
     Base.metadata.create_all(bind=engine)
     print("✓ Database initialized successfully!")
     print("  Database: genai_governance.db")
-    print("  Tables: policies, ai_use_logs")
+    print(f"  Tables: {', '.join(Base.metadata.tables)}")
@@ -2,12 +2,38 @@
 FastAPI application entry point.
 """
 
+import importlib
+import logging
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
 from models import HealthResponse
 from config import settings
 
+logger = logging.getLogger(__name__)
+
+# The routers use package-relative imports (..models, ..db), so they are loaded as
+# <backend dir>.governance_middleware: "backend" from the repository root, "app" in
+# the container, where uvicorn runs main:app from /app.
+BACKEND_DIR = Path(__file__).resolve().parent
+BACKEND_PACKAGE = __package__ or BACKEND_DIR.name
+if not __package__ and str(BACKEND_DIR.parent) not in sys.path:
+    sys.path.append(str(BACKEND_DIR.parent))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Background ledger work runs for the lifetime of the app and drains on shutdown."""
+    governance_api.ledger_sealer.start()
+    yield
+    # Queued decisions first, then a last sealing pass over everything written unsealed
+    governance_api.ledger_writer.stop(timeout=30.0)
+    governance_api.ledger_sealer.stop(timeout=30.0)
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
@@ -15,9 +41,15 @@ app = FastAPI(
     version=settings.version,
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan
 )
 
+# Opt-in request profiling; not installed at all unless configured
+if settings.profiling_enabled:
+    from profiling import ProfilingMiddleware
+    app.add_middleware(ProfilingMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -50,13 +82,14 @@ async def root():
     }
 
 
-# Routers
+# Routers. A router that fails to import stops startup: a worker serving only /health
+# would pass health checks while every API call returns 404.
 try:
-    from governance_middleware.api import router as governance_router
-    app.include_router(governance_router, tags=["Governance"])
+    governance_api = importlib.import_module(f"{BACKEND_PACKAGE}.governance_middleware.api")
 except Exception:
-    # In case module not ready; app still serves health
-    pass
+    logger.exception("Failed to import the governance router")
+    raise
+app.include_router(governance_api.router, tags=["Governance"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,272 @@
+"""
+Implements: In-process metrics registry, scraped at /metrics (Prometheus text format)
+
+How it satisfies constraints:
+- Counters, gauges and fixed-bucket histograms; labelled series are created once and
+  reused, so recording a value is a lock and an add (plus a bisect for histograms)
+- Values already kept elsewhere (cache hit counters, write-behind queue depth, pool
+  checkouts) are read by callbacks at scrape time rather than counted twice
+- Labels carry decisions, cache names and query kinds only; never pseudonyms or
+  course ids, which keeps both PII and series cardinality out
+- Every package imports it as the top-level module `metrics` (like `models`), so the
+  API, ledger, compiler and copilot all record into the one `registry`
+"""
+
+import bisect
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans sub-millisecond decisions up to slow analytics queries and copilot calls
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape(value: str) -> str:
+    return _escape_help(value).replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _label_string(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Value:
+    """One counter or gauge series."""
+
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def samples(self) -> Iterator[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        yield "", (), self.value
+
+
+class _Timer:
+    __slots__ = ("_series", "_started")
+
+    def __init__(self, series: "_HistogramValue"):
+        self._series = series
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._series.observe(time.perf_counter() - self._started)
+
+
+class _HistogramValue:
+    """One histogram series: per-bucket counts (cumulated at scrape time), sum and count."""
+
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self) -> _Timer:
+        """Context manager observing the seconds spent inside it."""
+        return _Timer(self)
+
+    def samples(self) -> Iterator[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        cumulative = 0
+        for bound, count in zip(self.bounds + (math.inf,), counts):
+            cumulative += count
+            yield "_bucket", (("le", _format_value(float(bound))),), cumulative
+        yield "_sum", (), total
+        yield "_count", (), cumulative
+
+
+class Metric:
+    """A named metric family; labelled series come from labels(), unlabelled calls go to the default series."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], Any] = {}
+        self._callbacks: Dict[Tuple[str, ...], Callable[[], float]] = {}
+        self._lock = threading.Lock()
+        self._default = None if self.labelnames else self.labels()
+
+    def _new_series(self) -> Any:
+        return _Value()
+
+    def _key(self, labels: Mapping[str, Any]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames) or set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {list(self.labelnames)}, got {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def labels(self, **labels: Any) -> Any:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, self._new_series())
+        return series
+
+    def set_function(self, fn: Callable[[], float], **labels: Any) -> None:
+        """Read this series from fn() at scrape time, for values maintained elsewhere (replaces set()/inc())."""
+        self._callbacks[self._key(labels)] = fn
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {_escape_help(self.documentation)}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for key, series in list(self._series.items()):
+            if key in self._callbacks:
+                continue  # the callback reports this series
+            base = tuple(zip(self.labelnames, key))
+            for suffix, extra, value in series.samples():
+                lines.append(f"{self.name}{suffix}{_label_string(base + extra)} {_format_value(float(value))}")
+        for key, fn in list(self._callbacks.items()):
+            try:
+                value = float(fn())
+            except Exception:
+                continue  # a failing source must not break the scrape
+            lines.append(f"{self.name}{_label_string(tuple(zip(self.labelnames, key)))} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.inc(-amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        bounds = tuple(float(b) for b in buckets if not math.isinf(b))
+        if not bounds or list(bounds) != sorted(set(bounds)):
+            raise ValueError(f"{name}: buckets must be increasing")
+        self.bounds = bounds
+        super().__init__(name, documentation, labelnames)
+
+    def _new_series(self) -> _HistogramValue:
+        return _HistogramValue(self.bounds)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def time(self) -> _Timer:
+        return self._default.time()
+
+    def set_function(self, fn: Callable[[], float], **labels: Any) -> None:
+        raise TypeError("histograms cannot be read from a callback")
+
+
+class MetricsRegistry:
+    """Metric families by name; asking again for a registered name returns the same metric."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls: type, name: str, documentation: str, labelnames: Sequence[str], **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"{name} is already registered as a {metric.kind} with labels {list(metric.labelnames)}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def expose_stats(
+        self,
+        prefix: str,
+        stats: Callable[[], Mapping[str, Any]],
+        counters: Optional[Mapping[str, str]] = None,
+        gauges: Optional[Mapping[str, str]] = None,
+        **labels: str
+    ) -> None:
+        """
+        Publish fields of an existing stats() dict at scrape time: each counters field as
+        {prefix}_{field}_total, each gauges field as {prefix}_{field}, with the given labels.
+        """
+        for fields, factory, suffix in ((counters, self.counter, "_total"), (gauges, self.gauge, "")):
+            for field, documentation in (fields or {}).items():
+                metric = factory(f"{prefix}_{field}{suffix}", documentation, tuple(labels))
+                metric.set_function(lambda field=field: stats()[field], **labels)
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        return "".join(line + "\n" for metric in metrics for line in metric.render())
+
+
+# Process-wide registry behind /metrics
+registry = MetricsRegistry()
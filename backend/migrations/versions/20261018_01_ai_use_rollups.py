@@ -0,0 +1,33 @@
+"""ai_use_rollups analytics table
+
+Revision ID: 20261018_01
+Revises: 20260126_01
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_01'
+down_revision = '20260126_01'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'ai_use_rollups',
+        sa.Column('course_id', sa.String(), primary_key=True),
+        sa.Column('action', sa.String(), primary_key=True),
+        sa.Column('assessment_type', sa.String(), primary_key=True),
+        sa.Column('bucket_start', sa.DateTime(), primary_key=True),
+        sa.Column('event_count', sa.Integer(), nullable=False),
+        sa.Column('last_event', sa.DateTime(), nullable=False),
+        sa.Column('student_sketch', sa.LargeBinary(), nullable=False),
+    )
+    # Existing logs are folded in by backend/scripts/rebuild_rollups.py
+
+
+def downgrade():
+    op.drop_table('ai_use_rollups')
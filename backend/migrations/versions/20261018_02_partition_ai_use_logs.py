@@ -0,0 +1,96 @@
+"""partition ai_use_logs by month (Postgres)
+
+Revision ID: 20261018_02
+Revises: 20261018_01
+Create Date: 2026-10-18
+
+Postgres only: ai_use_logs becomes a RANGE(timestamp) partitioned table with one
+partition per month plus a default partition, so retention can drop partitions
+(see transparency_ledger/retention.py). Partitioned tables need the partition key
+in the primary key, which becomes (log_id, timestamp). Other databases are left as is.
+"""
+
+from datetime import datetime
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261018_02'
+down_revision = '20261018_01'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    "log_id, course_id, actor_id_pseudonym, action, assessment_type, "
+    "policy_id, decision, timestamp, retention_until"
+)
+
+
+def _next_month(start):
+    return start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER TABLE ai_use_logs RENAME TO ai_use_logs_unpartitioned")
+    op.execute("ALTER INDEX idx_student_time RENAME TO idx_student_time_unpartitioned")
+    op.execute("""
+        CREATE TABLE ai_use_logs (
+            log_id UUID NOT NULL,
+            course_id VARCHAR NOT NULL,
+            actor_id_pseudonym VARCHAR NOT NULL,
+            action VARCHAR NOT NULL,
+            assessment_type VARCHAR NOT NULL,
+            policy_id VARCHAR NOT NULL REFERENCES policies (policy_id),
+            decision VARCHAR NOT NULL,
+            timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            retention_until TIMESTAMP WITHOUT TIME ZONE,
+            PRIMARY KEY (log_id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+    op.execute("CREATE INDEX idx_student_time ON ai_use_logs (actor_id_pseudonym, timestamp)")
+
+    # Monthly partitions from the oldest existing row to two months ahead
+    oldest = bind.exec_driver_sql("SELECT MIN(timestamp) FROM ai_use_logs_unpartitioned").scalar()
+    now = datetime.utcnow()
+    start = (oldest or now).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    last = _next_month(_next_month(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)))
+    while start <= last:
+        end = _next_month(start)
+        op.execute(
+            f"CREATE TABLE ai_use_logs_{start.year:04d}_{start.month:02d} PARTITION OF ai_use_logs "
+            f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+        )
+        start = end
+    op.execute("CREATE TABLE ai_use_logs_default PARTITION OF ai_use_logs DEFAULT")
+
+    op.execute(f"INSERT INTO ai_use_logs ({COLUMNS}) SELECT {COLUMNS} FROM ai_use_logs_unpartitioned")
+    op.execute("DROP TABLE ai_use_logs_unpartitioned")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER TABLE ai_use_logs RENAME TO ai_use_logs_partitioned")
+    op.execute("ALTER INDEX idx_student_time RENAME TO idx_student_time_partitioned")
+    op.execute("""
+        CREATE TABLE ai_use_logs (
+            log_id UUID PRIMARY KEY,
+            course_id VARCHAR NOT NULL,
+            actor_id_pseudonym VARCHAR NOT NULL,
+            action VARCHAR NOT NULL,
+            assessment_type VARCHAR NOT NULL,
+            policy_id VARCHAR NOT NULL REFERENCES policies (policy_id),
+            decision VARCHAR NOT NULL,
+            timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            retention_until TIMESTAMP WITHOUT TIME ZONE
+        )
+    """)
+    op.execute("CREATE INDEX idx_student_time ON ai_use_logs (actor_id_pseudonym, timestamp)")
+    op.execute(f"INSERT INTO ai_use_logs ({COLUMNS}) SELECT {COLUMNS} FROM ai_use_logs_partitioned")
+    op.execute("DROP TABLE ai_use_logs_partitioned")
@@ -0,0 +1,47 @@
+"""ledger tamper evidence: Merkle batches and hash chain
+
+Revision ID: 20261018_03
+Revises: 20261018_02
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_03'
+down_revision = '20261018_02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'ledger_batches',
+        sa.Column('batch_id', sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column('merkle_root', sa.String(64), nullable=False),
+        sa.Column('prev_hash', sa.String(64), nullable=False),
+        sa.Column('batch_hash', sa.String(64), nullable=False),
+        sa.Column('leaf_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('tree', sa.LargeBinary(), nullable=False),
+    )
+    ledger_head = op.create_table(
+        'ledger_head',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column('batch_id', sa.Integer(), nullable=False),
+        sa.Column('batch_hash', sa.String(64), nullable=False),
+    )
+    # Genesis head, so sealing only ever locks and updates this row
+    op.bulk_insert(ledger_head, [{'id': 1, 'batch_id': 0, 'batch_hash': '0' * 64}])
+
+    # Rows logged before this migration stay unsealed (batch_id NULL)
+    op.add_column('ai_use_logs', sa.Column('batch_id', sa.Integer(), nullable=True))
+    op.add_column('ai_use_logs', sa.Column('leaf_index', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('ai_use_logs', 'leaf_index')
+    op.drop_column('ai_use_logs', 'batch_id')
+    op.drop_table('ledger_head')
+    op.drop_table('ledger_batches')
@@ -0,0 +1,26 @@
+"""ai_use_logs.pseudonym_epoch for pseudonym rotation
+
+Revision ID: 20261018_04
+Revises: 20261018_03
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_04'
+down_revision = '20261018_03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'ai_use_logs',
+        sa.Column('pseudonym_epoch', sa.Integer(), nullable=False, server_default='0')
+    )
+
+
+def downgrade():
+    op.drop_column('ai_use_logs', 'pseudonym_epoch')
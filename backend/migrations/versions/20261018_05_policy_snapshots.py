@@ -0,0 +1,27 @@
+"""policies.content_hash and policies.compiled_snapshot
+
+Revision ID: 20261018_05
+Revises: 20261018_04
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_05'
+down_revision = '20261018_04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('policies', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('policies', sa.Column('compiled_snapshot', sa.LargeBinary(), nullable=True))
+    # Existing policies keep loading by validation until
+    # backend/scripts/build_policy_snapshots.py fills these in
+
+
+def downgrade():
+    op.drop_column('policies', 'compiled_snapshot')
+    op.drop_column('policies', 'content_hash')
@@ -0,0 +1,29 @@
+"""ai_use_logs.idx_unsealed: rows awaiting a Merkle batch
+
+Revision ID: 20261018_06
+Revises: 20261018_05
+Create Date: 2026-10-18
+
+Decisions are now written unsealed and sealed in bulk by merkle.seal_pending(),
+which finds them through this partial index.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_06'
+down_revision = '20261018_05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'idx_unsealed', 'ai_use_logs', ['timestamp'],
+        postgresql_where=sa.text('batch_id IS NULL'), sqlite_where=sa.text('batch_id IS NULL')
+    )
+
+
+def downgrade():
+    op.drop_index('idx_unsealed', table_name='ai_use_logs')
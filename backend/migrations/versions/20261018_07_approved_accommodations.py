@@ -0,0 +1,38 @@
+"""approved_accommodations: accommodation kinds resolved server-side
+
+Revision ID: 20261018_07
+Revises: 20261018_06
+Create Date: 2026-10-18
+
+has_approved_accommodation() conditions are evaluated against this table, keyed by
+pseudonym, instead of the accommodations a client puts in its request.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_07'
+down_revision = '20261018_06'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'approved_accommodations',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('actor_id_pseudonym', sa.String(), nullable=False),
+        sa.Column('course_id', sa.String(), nullable=True),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('approved_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        'ix_approved_accommodations_actor_id_pseudonym', 'approved_accommodations', ['actor_id_pseudonym']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_approved_accommodations_actor_id_pseudonym', table_name='approved_accommodations')
+    op.drop_table('approved_accommodations')
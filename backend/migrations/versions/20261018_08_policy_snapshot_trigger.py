@@ -0,0 +1,58 @@
+"""policies: clear content_hash / compiled_snapshot when content changes alone
+
+Revision ID: 20261018_08
+Revises: 20261018_07
+Create Date: 2026-10-18
+
+Loaders use a compiled snapshot only while its recorded hash equals content_hash.
+This trigger clears both columns when content is updated without content_hash
+(admin SQL, a restore, a data migration), so the new content is validated instead
+of the old snapshot being served; backend/scripts/build_policy_snapshots.py
+rebuilds them. Snapshots written before this revision are of format 2 and are
+rebuilt by the same script.
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261018_08'
+down_revision = '20261018_07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("""
+            CREATE OR REPLACE FUNCTION policies_clear_stale_snapshot() RETURNS trigger AS $$
+            BEGIN
+                IF NEW.content IS DISTINCT FROM OLD.content AND NEW.content_hash IS NOT DISTINCT FROM OLD.content_hash THEN
+                    NEW.content_hash := NULL;
+                    NEW.compiled_snapshot := NULL;
+                END IF;
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER policies_clear_stale_snapshot BEFORE UPDATE OF content ON policies
+            FOR EACH ROW EXECUTE FUNCTION policies_clear_stale_snapshot()
+        """)
+    elif dialect == 'sqlite':
+        op.execute("""
+            CREATE TRIGGER policies_clear_stale_snapshot AFTER UPDATE OF content ON policies
+            FOR EACH ROW WHEN NEW.content IS NOT OLD.content AND NEW.content_hash IS OLD.content_hash
+            BEGIN
+                UPDATE policies SET content_hash = NULL, compiled_snapshot = NULL WHERE policy_id = NEW.policy_id;
+            END
+        """)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS policies_clear_stale_snapshot ON policies")
+        op.execute("DROP FUNCTION IF EXISTS policies_clear_stale_snapshot()")
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS policies_clear_stale_snapshot")
@@ -187,6 +187,13 @@ class ConflictReport(BaseModel):
 # GOVERNANCE & ENFORCEMENT MODELS (Section 2.2.3)
 # ============================================================================
 
+class TraceLevel(str, Enum):
+    """How much of the evaluation trace a decision carries."""
+    NONE = "none"  # no trace at all
+    SUMMARY = "summary"  # matched policy ids/effects, conflict types, resolved effect
+    FULL = "full"  # context, per-policy rule traces and conflict details
+
+
 class GovernanceContext(BaseModel):
     """Request context for policy decision endpoint."""
     course_id: str
@@ -195,6 +202,13 @@ class GovernanceContext(BaseModel):
     assessment_type: str
     assessment_phase: str
     actor_id_pseudonym: str  # Pseudonym, NOT real student ID
+    approved_accommodations: List[str] = Field(
+        default_factory=list,
+        description=(
+            "Approved accommodation kinds (e.g. 'genai_use'), no details. Ignored by the API, "
+            "which resolves them server-side from approved_accommodations"
+        )
+    )
 
 
 class Obligation(BaseModel):
@@ -214,6 +228,44 @@ class GovernanceDecision(BaseModel):
     applied_rules: List[str] = Field(default_factory=list)
 
 
+class BatchEvaluationItem(BaseModel):
+    """Outcome for one context of a batch evaluation (decision or error)."""
+    index: int
+    decision: Optional[GovernanceDecision] = None
+    error: Optional[str] = None
+
+
+class BatchEvaluationResult(BaseModel):
+    """Output of batch decision endpoint, in input order."""
+    results: List[BatchEvaluationItem]
+    total: int
+    succeeded: int
+    failed: int
+
+
+class ReplayTransition(BaseModel):
+    """Ledger events of one (action, assessment_type) moving from old to new decision."""
+    action: str
+    assessment_type: str
+    old_decision: str
+    new_decision: str
+    count: int
+
+
+class ReplayReport(BaseModel):
+    """What-if replay of historical ledger events against a draft policy."""
+    draft_policy_id: str
+    draft_version: str
+    course_id: Optional[str] = None
+    institution_id: Optional[str] = None
+    actor_role: str
+    assessment_phase: str
+    total_events: int
+    changed_events: int
+    summary: Dict[str, int] = Field(default_factory=dict)  # "ALLOW->DENY": count
+    transitions: List[ReplayTransition] = Field(default_factory=list)
+
+
 class ExplainResult(BaseModel):
     """Explanation of policy rule for UI."""
     action: str
@@ -242,6 +294,18 @@ class AIUseLog(BaseModel):
     retention_until: Optional[datetime] = None
 
 
+class IngestReport(BaseModel):
+    """Outcome of a bulk ledger ingestion."""
+    format: str
+    backend: str  # "copy" (Postgres) or "executemany"
+    total_rows: int = 0
+    inserted: int = 0
+    rejected: int = 0
+    errors: List[Dict[str, Any]] = Field(default_factory=list)  # first rejected rows: line, error
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+
 class AggregatedMetrics(BaseModel):
     """Aggregated AI-use metrics for display."""
     action: Optional[str] = None
@@ -260,6 +324,43 @@ class StudentTransparencyView(BaseModel):
     privacy_commitment: str
 
 
+class ProofStep(BaseModel):
+    """Sibling hash on the path from a leaf to the Merkle root."""
+    position: str  # "left" or "right" of the running hash
+    hash: str
+
+
+class InclusionProof(BaseModel):
+    """Merkle inclusion proof for one ledger row, plus its batch's chain link."""
+    log_id: str
+    batch_id: int
+    leaf_index: int
+    leaf_hash: str
+    proof: List[ProofStep]
+    merkle_root: str
+    batch_hash: str
+    prev_batch_hash: str
+    leaf_count: int
+    row_matches: Optional[bool] = None  # stored row still hashes to the sealed leaf (None: rotated, not checkable)
+
+
+class RotationReport(BaseModel):
+    """Progress of a pseudonym rotation run (re-run to resume)."""
+    target_epoch: int
+    rows_rotated: int = 0
+    chunks: int = 0
+    completed: bool = False  # False when stopped by max_chunks / max_seconds
+    last_log_id: Optional[str] = None
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+
+class StudentLogPage(BaseModel):
+    """One keyset-paginated page of a student's raw AI-use events (newest first)."""
+    items: List[AIUseLog]
+    next_cursor: Optional[str] = None
+
+
 class CourseAnalytics(BaseModel):
     """Instructor-facing anonymized analytics."""
     course_id: str
@@ -335,8 +436,10 @@ class ErrorResponse(BaseModel):
 # ============================================================================
 
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import Column, String, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy import (
+    Column, String, DateTime, ForeignKey, JSON, Uuid, Integer, LargeBinary, Index, text, DDL, event
+)
+from sqlalchemy.dialects.postgresql import JSONB
 import uuid
 
 Base = declarative_base()
@@ -348,7 +451,12 @@ class Policy(Base):
     policy_id = Column(String, primary_key=True)
     institution_id = Column(String, nullable=False)
     course_id = Column(String, nullable=False)
-    content = Column(JSONB, nullable=False)  # Full PolicyJSON
+    content = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)  # Full PolicyJSON
+    # sha256 of content's canonical JSON, and the compiled rule tables built from it
+    # (msgpack, see policy_compiler/snapshots.py); used only while the snapshot's
+    # recorded hash equals content_hash
+    content_hash = Column(String(64), nullable=True)
+    compiled_snapshot = Column(LargeBinary, nullable=True)
     version = Column(String, nullable=False)
     previous_version_id = Column(String, ForeignKey("policies.policy_id"), nullable=True)
     created_at = Column(DateTime, nullable=False)
@@ -356,15 +464,114 @@ class Policy(Base):
     deprecated_at = Column(DateTime, nullable=True)
 
 
+# An update of content that leaves content_hash as it was (admin SQL, a restore, a data
+# migration) clears content_hash and compiled_snapshot, so loaders validate the new
+# content instead of serving the old snapshot (same trigger as migration 20261018_08)
+POLICY_SNAPSHOT_TRIGGER = {
+    "postgresql": (
+        """
+        CREATE OR REPLACE FUNCTION policies_clear_stale_snapshot() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.content IS DISTINCT FROM OLD.content AND NEW.content_hash IS NOT DISTINCT FROM OLD.content_hash THEN
+                NEW.content_hash := NULL;
+                NEW.compiled_snapshot := NULL;
+            END IF;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER policies_clear_stale_snapshot BEFORE UPDATE OF content ON policies
+        FOR EACH ROW EXECUTE FUNCTION policies_clear_stale_snapshot()
+        """,
+    ),
+    "sqlite": (
+        """
+        CREATE TRIGGER policies_clear_stale_snapshot AFTER UPDATE OF content ON policies
+        FOR EACH ROW WHEN NEW.content IS NOT OLD.content AND NEW.content_hash IS OLD.content_hash
+        BEGIN
+            UPDATE policies SET content_hash = NULL, compiled_snapshot = NULL WHERE policy_id = NEW.policy_id;
+        END
+        """,
+    ),
+}
+for _dialect, _statements in POLICY_SNAPSHOT_TRIGGER.items():
+    for _statement in _statements:
+        event.listen(Policy.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+
+
 class AIUseLogORM(Base):
     __tablename__ = "ai_use_logs"
 
-    log_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # (log_id, timestamp): partitioned Postgres tables need the partition key in the
+    # primary key (migration 20261018_02)
+    log_id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     course_id = Column(String, nullable=False)
     actor_id_pseudonym = Column(String, nullable=False)
     action = Column(String, nullable=False)
     assessment_type = Column(String, nullable=False)
     policy_id = Column(String, ForeignKey("policies.policy_id"), nullable=False)
     decision = Column(String, nullable=False)
-    timestamp = Column(DateTime, nullable=False)
+    timestamp = Column(DateTime, primary_key=True)
     retention_until = Column(DateTime, nullable=True)
+    # Tamper evidence: the Merkle batch this row was sealed into, and its leaf position
+    batch_id = Column(Integer, nullable=True)
+    leaf_index = Column(Integer, nullable=True)
+    # Pseudonym rotation epoch of actor_id_pseudonym (0 = as logged)
+    pseudonym_epoch = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index("idx_student_time", "actor_id_pseudonym", "timestamp"),
+        # Rows awaiting merkle.seal_pending()
+        Index(
+            "idx_unsealed", "timestamp",
+            postgresql_where=text("batch_id IS NULL"), sqlite_where=text("batch_id IS NULL")
+        ),
+    )
+
+
+class AIUseRollupORM(Base):
+    """Per-hour rollup of ai_use_logs; student_sketch is a HyperLogLog (no pseudonyms)."""
+    __tablename__ = "ai_use_rollups"
+
+    course_id = Column(String, primary_key=True)
+    action = Column(String, primary_key=True)
+    assessment_type = Column(String, primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    event_count = Column(Integer, nullable=False, default=0)
+    last_event = Column(DateTime, nullable=False)
+    student_sketch = Column(LargeBinary, nullable=False)
+
+
+class ApprovedAccommodationORM(Base):
+    """An accommodation kind approved for a pseudonym, in one course or (course_id NULL) all."""
+    __tablename__ = "approved_accommodations"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    actor_id_pseudonym = Column(String, nullable=False, index=True)
+    course_id = Column(String, nullable=True)
+    kind = Column(String, nullable=False)  # e.g. "genai_use"; no details
+    approved_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=True)
+
+
+class LedgerBatchORM(Base):
+    """A sealed batch of ledger rows: Merkle root chained to the previous batch."""
+    __tablename__ = "ledger_batches"
+
+    batch_id = Column(Integer, primary_key=True, autoincrement=False)
+    merkle_root = Column(String(64), nullable=False)
+    prev_hash = Column(String(64), nullable=False)
+    batch_hash = Column(String(64), nullable=False)
+    leaf_count = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    tree = Column(LargeBinary, nullable=False)  # every tree level, 32-byte nodes, leaves first
+
+
+class LedgerHeadORM(Base):
+    """Single row (id=1) holding the chain head; locked while a batch is sealed."""
+    __tablename__ = "ledger_head"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    batch_id = Column(Integer, nullable=False)
+    batch_hash = Column(String(64), nullable=False)
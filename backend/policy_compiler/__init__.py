@@ -1,7 +1,8 @@
 """
 Policy Compiler Module
 Converts faculty form input → machine-executable policy JSON
-Detects conflicts with existing policies
+Detects conflicts with existing policies (course overlap, and rule-level
+allowed/prohibited contradictions via the institution-wide overlap index)
 """
 
 from models import (
@@ -10,10 +11,19 @@ from models import (
     AssessmentPhase, DisclosureRequirement, LoggingConfig, RoleDefinition,
     Policy
 )
-from typing import List
+from typing import List, Optional
 from datetime import datetime
+import time
 from sqlalchemy.orm import Session
 
+from .overlap_index import OverlapIndex, overlap_index
+from .snapshots import snapshot_columns
+from metrics import registry as metrics
+
+COMPILE_SECONDS = metrics.histogram(
+    "policy_compile_seconds", "Compiling, conflict-checking and storing one policy form", ("result",)
+)
+
 
 def compile_policy_from_form(
     form: PolicyFormInput,
@@ -25,6 +35,18 @@ def compile_policy_from_form(
     Compile faculty form input to PolicyJSON.
     Validate schema, detect conflicts, and store in DB.
     """
+    started = time.perf_counter()
+    result = _compile_policy_from_form(form, institution_id, author_id, db)
+    COMPILE_SECONDS.labels(result="success" if result.success else "failure").observe(time.perf_counter() - started)
+    return result
+
+
+def _compile_policy_from_form(
+    form: PolicyFormInput,
+    institution_id: str,
+    author_id: str,
+    db: Session
+) -> CompileResult:
     try:
         # 1. Generate policy ID and version
         policy_id = f"course_{form.course_id}_genai_v1.0"
@@ -125,25 +147,37 @@ def compile_policy_from_form(
                 conflicts={"blocking": conflicts}
             )
 
+        # Semantic conflicts (same role/type/phase/action allowed and prohibited),
+        # including against institution-level policies; resolved by precedence
+        overlap_index.ensure_loaded(db)
+        semantic = overlap_index.conflicts_for(policy)
+
         # 4. Store in DB
         db_policy = Policy(
             policy_id=policy.policy_id,
             institution_id=policy.institution_id,
             course_id=policy.course_id,
-            content=policy.model_dump(),
             version=policy.version,
+            previous_version_id=policy.previous_version_id,
             created_at=policy.created_at,
-            effective_from=policy.effective_from
+            effective_from=policy.effective_from,
+            **snapshot_columns(policy)
         )
         db.add(db_policy)
         db.commit()
         db.refresh(db_policy)
+        overlap_index.add(policy)
 
         return CompileResult(
             success=True,
             policy=policy,
             errors=[],
-            warnings=[]
+            warnings=[
+                f"{c['action']} is both allowed and prohibited for {c['role']} "
+                f"({c['assessment_type']}, {c['assessment_phase']}); prohibition takes precedence"
+                for c in semantic
+            ],
+            conflicts={"non_blocking": semantic} if semantic else None
         )
 
     except Exception as e:
@@ -154,6 +188,20 @@ def compile_policy_from_form(
         )
 
 
+def deprecate_policy(policy_id: str, db: Session, when: Optional[datetime] = None) -> bool:
+    """
+    Deprecate a stored policy and drop it from the overlap index; False if there is
+    no such active policy. The policy registry notices on its next version check.
+    """
+    updated = db.query(Policy).filter(
+        Policy.policy_id == policy_id,
+        Policy.deprecated_at.is_(None)
+    ).update({"deprecated_at": when or datetime.utcnow()})
+    db.commit()
+    overlap_index.remove(policy_id)
+    return bool(updated)
+
+
 def detect_conflicts(
     new_policy: PolicyJSON,
     existing_policies: List[PolicyJSON],
@@ -163,7 +211,7 @@ def detect_conflicts(
     Detect overlaps, contradictions, and version conflicts.
     """
     blocking = []
-    non_blocking = []
+    non_blocking = OverlapIndex(existing_policies).conflicts_for(new_policy)
     suggestions = []
 
     for existing in existing_policies:
@@ -177,9 +225,12 @@ def detect_conflicts(
 
     if blocking:
         suggestions.append("Deprecate existing policy before creating new one")
+    if non_blocking:
+        suggestions.append("Remove actions that are both allowed and prohibited for the same role, assessment type and phase")
 
     return ConflictReport(
         blocking=blocking,
         non_blocking=non_blocking,
         suggestions=suggestions
     )
+
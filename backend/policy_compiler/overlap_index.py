@@ -0,0 +1,216 @@
+"""
+Institution-wide overlap index for rule conflict detection
+
+An inverted index from (institution_id, role, assessment_type, phase, action) to
+the policies that allow or prohibit it, split by course (None = institution-level,
+i.e. scope.course_id unset). Cells mirror enforcement matching: rule roles and
+assessment types intersected with the policy scope, for every scope phase.
+
+Indexing or removing one policy touches only its own cells, and conflicts are read
+per cell, so a full scan is linear in the number of indexed cells. Only active
+policies are indexed: a version drops the one it replaces (previous_version_id),
+deprecate_policy() removes a policy, and ensure_loaded() reconciles the index with
+the policies table, so policies deprecated there are removed too.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import Policy, PolicyJSON
+
+# (institution_id, role, assessment_type, assessment_phase, action)
+Cell = Tuple[str, str, str, str, str]
+# course_id (None for institution-level) -> policy ids
+Buckets = Dict[Optional[str], Set[str]]
+
+_EMPTY: Set[str] = set()
+
+
+def rule_cells(policy: PolicyJSON) -> Iterator[Tuple[str, Cell]]:
+    """Yield ("allowed" | "prohibited", cell) for every context the policy's rules decide."""
+    scope = policy.scope
+    roles = {r.role for r in scope.roles}
+    assessment_types = set(scope.assessment_types)
+    phases = [p.value if hasattr(p, "value") else p for p in scope.assessment_phases]
+    for effect, rules in (("prohibited", policy.actions.prohibited_actions),
+                          ("allowed", policy.actions.allowed_actions)):
+        for rule in rules:
+            for role in roles.intersection(rule.applies_to_roles):
+                for assessment_type in assessment_types.intersection(rule.applies_to_assessment_types):
+                    for phase in phases:
+                        yield effect, (policy.institution_id, role, assessment_type, phase, rule.action)
+
+
+def _cell_conflicts(cell: Cell, allowed: Buckets, prohibited: Buckets) -> List[Dict[str, Any]]:
+    """Conflicts in one cell: per course, its own rules plus the institution-level ones."""
+    inst_allowed = allowed.get(None, _EMPTY)
+    inst_prohibited = prohibited.get(None, _EMPTY)
+    conflicts = []
+    if inst_allowed and inst_prohibited:
+        conflicts.append(_conflict(cell, None, inst_allowed, inst_prohibited))
+    for course_id in (set(allowed) | set(prohibited)) - {None}:
+        course_allowed = allowed.get(course_id, _EMPTY)
+        course_prohibited = prohibited.get(course_id, _EMPTY)
+        if (course_allowed and (course_prohibited or inst_prohibited)) or (course_prohibited and inst_allowed):
+            conflicts.append(_conflict(cell, course_id, course_allowed | inst_allowed,
+                                       course_prohibited | inst_prohibited))
+    return conflicts
+
+
+def _conflict(cell: Cell, course_id: Optional[str], allowed_by: Set[str], prohibited_by: Set[str]) -> Dict[str, Any]:
+    institution_id, role, assessment_type, phase, action = cell
+    return {
+        "institution_id": institution_id,
+        "course_id": course_id,
+        "role": role,
+        "assessment_type": assessment_type,
+        "assessment_phase": phase,
+        "action": action,
+        "allowed_by": sorted(allowed_by),
+        "prohibited_by": sorted(prohibited_by),
+        "reason": "Action both allowed and prohibited",
+    }
+
+
+class OverlapIndex:
+    """Inverted index of rule scopes across an institution's course and institution-level policies."""
+
+    def __init__(self, policies: Iterable[PolicyJSON] = ()):
+        self._allowed: Dict[Cell, Buckets] = {}
+        self._prohibited: Dict[Cell, Buckets] = {}
+        # policy_id -> (course_id, [(effect, cell), ...]) so re-indexing only touches its own cells
+        self._postings: Dict[str, Tuple[Optional[str], List[Tuple[str, Cell]]]] = {}
+        self._versions: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        for policy in policies:
+            self._index(policy)
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def _table(self, effect: str) -> Dict[Cell, Buckets]:
+        return self._allowed if effect == "allowed" else self._prohibited
+
+    def _index(self, policy: PolicyJSON) -> None:
+        self._unindex(policy.policy_id)
+        if policy.previous_version_id:
+            self._unindex(policy.previous_version_id)  # replaced by this version
+        course_id = policy.scope.course_id or None
+        posted = list(set(rule_cells(policy)))
+        for effect, cell in posted:
+            self._table(effect).setdefault(cell, {}).setdefault(course_id, set()).add(policy.policy_id)
+        self._postings[policy.policy_id] = (course_id, posted)
+        self._versions[policy.policy_id] = policy.version
+
+    def _unindex(self, policy_id: str) -> None:
+        entry = self._postings.pop(policy_id, None)
+        self._versions.pop(policy_id, None)
+        if entry is None:
+            return
+        course_id, posted = entry
+        for effect, cell in posted:
+            table = self._table(effect)
+            buckets = table[cell]
+            buckets[course_id].discard(policy_id)
+            if not buckets[course_id]:
+                del buckets[course_id]
+            if not buckets:
+                del table[cell]
+
+    def add(self, policy: PolicyJSON) -> List[Dict[str, Any]]:
+        """
+        Index (or re-index) one policy, dropping the version it replaces, and return
+        the conflicts it takes part in.
+        """
+        with self._lock:
+            self._index(policy)
+            return self._involving(policy.policy_id, {cell for _, cell in self._postings[policy.policy_id][1]})
+
+    def remove(self, policy_id: str) -> None:
+        """Drop a policy (when it is deprecated; see deprecate_policy())."""
+        with self._lock:
+            self._unindex(policy_id)
+
+    def conflicts_for(self, policy: PolicyJSON) -> List[Dict[str, Any]]:
+        """Conflicts the policy would take part in if indexed, without indexing it."""
+        course_id = policy.scope.course_id or None
+        replaced = {policy.policy_id, policy.previous_version_id}
+        own: Dict[Cell, Dict[str, Set[str]]] = {}
+        for effect, cell in rule_cells(policy):
+            own.setdefault(cell, {"allowed": set(), "prohibited": set()})[effect].add(policy.policy_id)
+
+        conflicts = []
+        with self._lock:
+            for cell, effects in own.items():
+                merged = []
+                for effect in ("allowed", "prohibited"):
+                    # Copy the touched cell only; an indexed older version of the policy is replaced
+                    buckets = {c: ids - replaced for c, ids in self._table(effect).get(cell, {}).items()}
+                    if effects[effect]:
+                        buckets[course_id] = buckets.get(course_id, set()) | effects[effect]
+                    merged.append(buckets)
+                conflicts.extend(c for c in _cell_conflicts(cell, *merged) if _involves(c, policy.policy_id))
+        return conflicts
+
+    def conflicts(self, institution_id: Optional[str] = None, course_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Every indexed conflict, optionally restricted to one institution and/or course."""
+        with self._lock:
+            conflicts = []
+            for cell, allowed in self._allowed.items():
+                if institution_id is not None and cell[0] != institution_id:
+                    continue
+                prohibited = self._prohibited.get(cell)
+                if not prohibited:
+                    continue
+                conflicts.extend(_cell_conflicts(cell, allowed, prohibited))
+        if course_id is not None:
+            conflicts = [c for c in conflicts if c["course_id"] == course_id]
+        return conflicts
+
+    def _involving(self, policy_id: str, cells: Set[Cell]) -> List[Dict[str, Any]]:
+        conflicts = []
+        for cell in cells:
+            allowed, prohibited = self._allowed.get(cell), self._prohibited.get(cell)
+            if allowed and prohibited:
+                conflicts.extend(c for c in _cell_conflicts(cell, allowed, prohibited) if _involves(c, policy_id))
+        return conflicts
+
+    def ensure_loaded(self, db: Session) -> None:
+        """
+        Reconcile the index with the active stored policies (not deprecated, and not
+        replaced by an active version): drop the ones no longer active and (re)index
+        new or changed versions. A cheap (policy_id, version) query when nothing changed.
+        """
+        replaced = select(Policy.previous_version_id).where(
+            Policy.deprecated_at.is_(None), Policy.previous_version_id.is_not(None)
+        )
+        active = dict(db.query(Policy.policy_id, Policy.version).filter(
+            Policy.deprecated_at.is_(None), Policy.policy_id.not_in(replaced)
+        ).all())
+        with self._lock:
+            for policy_id in set(self._postings) - set(active):
+                self._unindex(policy_id)
+            changed = [policy_id for policy_id, version in active.items() if self._versions.get(policy_id) != version]
+            if not changed:
+                return
+            for row in db.query(Policy).filter(Policy.policy_id.in_(changed)):
+                self._index(PolicyJSON.model_validate(row.content))
+
+    def invalidate(self) -> None:
+        """Forget everything; the next ensure_loaded() rebuilds from the policies table."""
+        with self._lock:
+            self._allowed.clear()
+            self._prohibited.clear()
+            self._postings.clear()
+            self._versions.clear()
+
+
+def _involves(conflict: Dict[str, Any], policy_id: str) -> bool:
+    return policy_id in conflict["allowed_by"] or policy_id in conflict["prohibited_by"]
+
+
+# Global index of stored policies, loaded lazily and updated as policies are compiled
+overlap_index = OverlapIndex()
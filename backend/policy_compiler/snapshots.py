@@ -0,0 +1,185 @@
+"""
+Compiled policy snapshots
+
+A Policy row stores, next to the full PolicyJSON `content`, the content's hash and
+a compact msgpack snapshot of the policy's compiled rule tables (scope sets, rule
+keys, condition sources), which records the content hash it was built from. Both
+are computed when the row is written (snapshot_columns) and re-checked by
+refresh_snapshots(), not on every load: loaders (enforcement.compile_policy_rows)
+use a snapshot when its format is current and its recorded hash equals the row's
+content_hash, and need `content` (for full PolicyJSON validation) only otherwise.
+An edit to `content` that leaves content_hash alone (admin SQL, a restore) clears
+both columns in the database (see models.py), so it is never served from a stale
+snapshot. build_snapshot() is also how the engine compiles a validated policy, so
+both paths yield the same tables.
+"""
+
+import gc
+import hashlib
+import json
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import msgpack
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from models import Policy, PolicyJSON
+
+# Bump when the snapshot layout or its meaning changes; older snapshots are then ignored
+SNAPSHOT_FORMAT = 3
+
+OVERRIDE_EFFECTS = ("allow_all_actions", "deny_all_actions")
+
+
+def content_hash(content: Dict[str, Any]) -> str:
+    """sha256 of the canonical JSON of a policy's stored content."""
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def build_snapshot(policy: PolicyJSON) -> Dict[str, Any]:
+    """Compiled rule tables of one policy, as plain msgpack-able data."""
+    scope = policy.scope
+
+    # role -> conditions, one of which must hold; roles with an unconditional definition are absent
+    unconditional = {r.role for r in scope.roles if not r.condition}
+    role_conditions: Dict[str, List[str]] = {}
+    for r in scope.roles:
+        if r.condition and r.role not in unconditional:
+            role_conditions.setdefault(r.role, []).append(r.condition)
+
+    overrides = []
+    for orule in (policy.override_rules or []):
+        if orule.condition and orule.effect in OVERRIDE_EFFECTS:
+            obligations = []
+            if orule.effect == "allow_all_actions" and orule.requires_disclosure:
+                obligations = [["disclosure_required", orule.requires_disclosure]]
+            overrides.append([orule.override_id, orule.condition, orule.effect, obligations])
+
+    # Prohibited rules are listed before allowed ones, so they claim their keys first; each
+    # rule carries the (action, role, assessment_type) keys it claimed, so a loader fills its
+    # table with one dict.fromkeys() per rule
+    rules = []
+    claimed: Set[Tuple[str, str, str]] = set()
+    for effect, actions in (("prohibited", policy.actions.prohibited_actions),
+                            ("allowed", policy.actions.allowed_actions)):
+        for rule in actions:
+            obligations = []
+            if effect == "allowed" and rule.disclosure_required:
+                obligations = [["disclosure_required", rule.disclosure_format]]
+            keys = []
+            for role in rule.applies_to_roles:
+                for assessment_type in rule.applies_to_assessment_types:
+                    key = (rule.action, role, assessment_type)
+                    if key not in claimed:
+                        claimed.add(key)
+                        keys.append(key)
+            if keys:
+                rules.append([rule.action, effect, obligations, keys])
+
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "policy_id": policy.policy_id,
+        "version": policy.version,
+        "course_id": scope.course_id,
+        "roles": sorted({r.role for r in scope.roles}),
+        "assessment_types": sorted(set(scope.assessment_types)),
+        "assessment_phases": sorted({p.value if hasattr(p, "value") else p for p in scope.assessment_phases}),
+        "role_conditions": role_conditions,
+        "overrides": overrides,
+        "rules": rules,
+    }
+
+
+def pack_snapshot(snapshot: Dict[str, Any]) -> bytes:
+    return msgpack.packb(snapshot, use_bin_type=True)
+
+
+def read_snapshot(blob: Optional[bytes]) -> Optional[Dict[str, Any]]:
+    """Decode a stored snapshot (arrays as tuples); None if missing, corrupt or of another format."""
+    if not blob:
+        return None
+    try:
+        snapshot = msgpack.unpackb(blob, raw=False, use_list=False)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT:
+        return None
+    return snapshot
+
+
+@contextmanager
+def paused_gc() -> Iterator[None]:
+    """
+    Pause the cyclic collector while a policy set is decoded or compiled: that
+    allocates hundreds of thousands of small acyclic containers, each batch of
+    which would otherwise trigger another collection over the whole heap.
+    """
+    if not gc.isenabled():
+        yield
+        return
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
+def _row_snapshot(row: Any) -> Optional[Dict[str, Any]]:
+    if not row.content_hash:
+        return None
+    snapshot = read_snapshot(row.compiled_snapshot)
+    if snapshot is None or snapshot.get("content_hash") != row.content_hash:
+        return None  # built from other content than the row's hash describes
+    return snapshot
+
+
+def read_row_snapshots(rows: Sequence[Any]) -> List[Optional[Dict[str, Any]]]:
+    """Snapshot of each stored Policy row; None where the row must be validated from its content."""
+    with paused_gc():
+        return [_row_snapshot(row) for row in rows]
+
+
+def _row_blob(policy: PolicyJSON, digest: str) -> bytes:
+    return pack_snapshot({**build_snapshot(policy), "content_hash": digest})
+
+
+def snapshot_columns(policy: PolicyJSON) -> Dict[str, Any]:
+    """content, content_hash and compiled_snapshot values for a Policy row."""
+    content = policy.model_dump(mode="json")
+    digest = content_hash(content)
+    return {
+        "content": content,
+        "content_hash": digest,
+        "compiled_snapshot": _row_blob(policy, digest),
+    }
+
+
+def refresh_snapshots(db: Session, chunk_size: int = 500) -> int:
+    """
+    Rebuild missing or stale snapshots (e.g. after a format bump, or content edited
+    outside snapshot_columns()); returns rows updated.
+    """
+    updated = 0
+    last_policy_id = None
+    while True:
+        query = db.query(Policy).order_by(Policy.policy_id)
+        if last_policy_id is not None:
+            query = query.filter(Policy.policy_id > last_policy_id)
+        rows = query.limit(chunk_size).all()
+        if not rows:
+            return updated
+        for row in rows:
+            digest = content_hash(row.content)
+            if row.content_hash == digest and _row_snapshot(row) is not None:
+                continue
+            try:
+                policy = PolicyJSON.model_validate(row.content)
+            except ValidationError:
+                continue  # left to the loaders' validation fallback, which reports it
+            row.content_hash = digest
+            row.compiled_snapshot = _row_blob(policy, digest)
+            updated += 1
+        db.commit()
+        last_policy_id = rows[-1].policy_id
@@ -0,0 +1,286 @@
+"""
+Implements: Opt-in per-request profiling (ProfilingMiddleware)
+
+How it satisfies constraints:
+- Only installed when Settings.profiling_enabled (debug, an admin token or a sample
+  rate is configured); otherwise no middleware runs and requests pay nothing
+- A request asks for a profile with "X-Profile: pstats" (deterministic, cProfile) or
+  "X-Profile: collapsed" (statistical stack sampling, flamegraph-ready); honoured in
+  debug mode or with a matching X-Admin-Token, ignored otherwise
+- Settings.profiling_sample_rate profiles a fraction of requests to the
+  profiling_sample_paths prefixes, in profiling_sample_format
+- Profiles are saved under profiling_output_dir; the response names the file in
+  X-Profile-File and GET /api/v1/debug/profiles/{name} returns it
+- Work a request hands to worker threads through db.run_in_session is followed via a
+  context variable; sync routes that Starlette runs in its thread pool are not
+- One profile at a time per worker (others get X-Profile-Status: busy); the event loop
+  thread is shared, so concurrent requests show up in a profile too
+- From Python 3.12 cProfile is built on sys.monitoring, which admits one profiler per
+  process and sees every thread: the request's profiler then covers its worker
+  threads by itself, and a pstats request falls back to stack sampling when another
+  profiling tool already holds the slot
+"""
+
+import abc
+import contextvars
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, TypeVar
+
+from config import Settings, settings
+
+T = TypeVar("T")
+
+PROFILE_FORMATS = ("pstats", "collapsed")
+PROFILE_NAME = re.compile(r"^[\w.-]+\.(pstats|collapsed)$")
+
+# One cProfile profiler per process, observing all threads (sys.monitoring, 3.12+)
+_SHARED_PROFILER = sys.version_info >= (3, 12)
+
+_active: contextvars.ContextVar[Optional["_Profile"]] = contextvars.ContextVar("request_profile", default=None)
+_busy = threading.Lock()
+
+
+def authorized(headers: Mapping[str, str], config: Settings = settings) -> bool:
+    """May this request ask for (or download) a profile?"""
+    if config.debug:
+        return True
+    token = config.profiling_admin_token
+    return bool(token) and hmac.compare_digest(headers.get("x-admin-token", ""), token)
+
+
+def profile_dir(config: Settings = settings) -> Path:
+    return Path(config.profiling_output_dir)
+
+
+def run_profiled(fn: Callable[..., T], *args: Any) -> T:
+    """Call fn(*args) in this (worker) thread, profiled if the calling request is."""
+    profile = _active.get()
+    if profile is None:
+        return fn(*args)
+    return profile.run(fn, *args)
+
+
+class _Profile(abc.ABC):
+    suffix = ""
+
+    @abc.abstractmethod
+    def start(self) -> None:
+        """Begin profiling the calling (event-loop) thread."""
+
+    @abc.abstractmethod
+    def stop(self) -> None:
+        """End profiling; the profile can then be saved."""
+
+    @abc.abstractmethod
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Call fn(*args) in a worker thread, covered by this profile."""
+
+    @abc.abstractmethod
+    def save(self, path: Path) -> None:
+        """Write the profile to path."""
+
+
+class DeterministicProfile(_Profile):
+    """cProfile of the request's event-loop thread plus every run_in_session call it makes."""
+
+    suffix = ".pstats"
+
+    def __init__(self):
+        import cProfile  # only profiled requests load the profiler
+
+        self._new = cProfile.Profile
+        self._main = cProfile.Profile()
+        self._threads: List[Any] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self._main.enable()
+
+    def stop(self) -> None:
+        self._main.disable()
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if _SHARED_PROFILER:
+            return fn(*args)  # self._main sees this thread; a second profiler could not start
+        profile = self._new()
+        profile.enable()
+        try:
+            return fn(*args)
+        finally:
+            profile.disable()
+            with self._lock:
+                self._threads.append(profile)
+
+    def save(self, path: Path) -> None:
+        import pstats
+
+        stats = pstats.Stats(self._main)
+        with self._lock:
+            if self._threads:
+                stats.add(*self._threads)
+        stats.dump_stats(str(path))
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler(_Profile):
+    """
+    Statistical profile: samples the stacks of the request's threads every interval and
+    writes them in collapsed ("folded") form, one "thread;outer;...;inner count" per line.
+    """
+
+    suffix = ".collapsed"
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._threads: Dict[int, int] = {threading.get_ident(): 1}  # ident -> active runs
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._sampler = threading.Thread(target=self._sample, name="request-profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._threads[ident] -= 1
+                if not self._threads[ident]:
+                    del self._threads[ident]
+
+    def _sample(self) -> None:
+        while not self._stopping.wait(self.interval):
+            with self._lock:
+                idents = list(self._threads)
+            frames = sys._current_frames()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident in idents:
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if stack:
+                    stack.append(names.get(ident, f"thread-{ident}"))
+                    self._stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def save(self, path: Path) -> None:
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in sorted(self._stacks.items())))
+
+
+def new_profile(fmt: str, config: Settings = settings) -> _Profile:
+    if fmt == "pstats":
+        return DeterministicProfile()
+    if fmt == "collapsed":
+        return StackSampler(config.profiling_interval_ms / 1000)
+    raise ValueError(f"profile format must be one of {PROFILE_FORMATS}")
+
+
+def start_profile(fmt: str, config: Settings = settings) -> _Profile:
+    """A started profile of format fmt; stack sampling when cProfile is taken by another tool."""
+    profile = new_profile(fmt, config)
+    try:
+        profile.start()
+    except ValueError:  # "Another profiling tool is already active" (3.12+)
+        if not isinstance(profile, DeterministicProfile):
+            raise
+        profile = new_profile("collapsed", config)
+        profile.start()
+    return profile
+
+
+def _slug(path: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_")[:60] or "root"
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests that ask for it (X-Profile) or are sampled."""
+
+    def __init__(self, app: Any, config: Settings = settings):
+        self.app = app
+        self.config = config
+        self.sample_paths = tuple(p.strip() for p in config.profiling_sample_paths.split(",") if p.strip())
+        if config.profiling_sample_format not in PROFILE_FORMATS:
+            raise ValueError(f"profiling_sample_format must be one of {PROFILE_FORMATS}")
+
+    def _requested(self, scope: Dict[str, Any]) -> Optional[str]:
+        """Profile format for this request, "" when it asked without being allowed, None for no profile."""
+        requested = None
+        for key, value in scope["headers"]:
+            if key == b"x-profile":
+                requested = value.decode("latin-1").strip().lower()
+                break
+        if requested is not None:
+            headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+            if not authorized(headers, self.config) or requested not in PROFILE_FORMATS:
+                return ""
+            return requested
+        rate = self.config.profiling_sample_rate
+        if rate > 0 and scope["path"].startswith(self.sample_paths) and random.random() < rate:
+            return self.config.profiling_sample_format
+        return None
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        fmt = self._requested(scope)
+        if fmt is None:
+            await self.app(scope, receive, send)
+            return
+        if not fmt or not _busy.acquire(blocking=False):
+            status = b"unauthorized" if not fmt else b"busy"
+            await self.app(scope, receive, _with_headers(send, [(b"x-profile-status", status)]))
+            return
+
+        try:
+            profile = start_profile(fmt, self.config)
+            name = (
+                f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method'].lower()}-{_slug(scope['path'])}"
+                f"-{uuid.uuid4().hex[:8]}{profile.suffix}"
+            )
+            token = _active.set(profile)
+            try:
+                await self.app(scope, receive, _with_headers(send, [(b"x-profile-file", name.encode())]))
+            finally:
+                profile.stop()
+                _active.reset(token)
+            directory = profile_dir(self.config)
+            directory.mkdir(parents=True, exist_ok=True)
+            profile.save(directory / name)
+        finally:
+            _busy.release()
+
+
+def _with_headers(send: Callable, headers: List[tuple]) -> Callable:
+    async def send_with_headers(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            message = {**message, "headers": [*message.get("headers", []), *headers]}
+        await send(message)
+    return send_with_headers
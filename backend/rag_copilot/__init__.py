@@ -4,8 +4,19 @@ Policy Q&A with verification pipeline
 """
 from __future__ import annotations
 
+import time
 from typing import Any, Optional
 
+from metrics import registry as metrics
+
+# Answers below this confidence are flagged "ask admin"
+CONFIDENCE_THRESHOLD = 0.7
+
+ASK_SECONDS = metrics.histogram("copilot_ask_seconds", "Answering one copilot question, retrieval included")
+ANSWERS = metrics.counter(
+    "copilot_answers_total", "Copilot answers by confidence (low: below CONFIDENCE_THRESHOLD)", ("confidence",)
+)
+
 
 class CopilotResult:
     """Copilot answer with citations and verification."""
@@ -34,7 +45,7 @@ class CopilotResult:
             "confidence": self.confidence,
             "policy_ids": self.policy_ids,
             "has_contradiction": self.has_contradiction,
-            "flag": "⚠️ Low confidence — ask admin" if self.confidence < 0.7 else "✅ High confidence"
+            "flag": "⚠️ Low confidence — ask admin" if self.confidence < CONFIDENCE_THRESHOLD else "✅ High confidence"
         }
 
 
@@ -91,6 +102,18 @@ async def ask_policy_question(
     policies: Optional[list[dict[str, Any]]] = None
 ) -> CopilotResult:
     """Answer policy question with citations."""
+    started = time.perf_counter()
+    result = await _answer_policy_question(question, course_id, policies)
+    ASK_SECONDS.observe(time.perf_counter() - started)
+    ANSWERS.labels(confidence="low" if result.confidence < CONFIDENCE_THRESHOLD else "high").inc()
+    return result
+
+
+async def _answer_policy_question(
+    question: str,
+    course_id: Optional[str],
+    policies: Optional[list[dict[str, Any]]]
+) -> CopilotResult:
     if not policies:
         policies = []
     
@@ -117,5 +140,9 @@ async def ask_policy_question(
     answer, citations, confidence = generate_answer(question, policy)
     
     return CopilotResult(
-        human_contact="ai-governance@institution.edu"
+        question=question,
+        answer=answer,
+        citations=citations,
+        confidence=confidence,
+        policy_ids=[policy["policy_id"]] if policy.get("policy_id") else []
     )
@@ -0,0 +1,36 @@
+"""Build missing or stale compiled policy snapshots (after upgrading, or a snapshot format bump).
+
+Usage:
+    python backend/scripts/build_policy_snapshots.py
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+for _path in (str(BACKEND_DIR.parent), str(BACKEND_DIR)):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from backend.db import SessionLocal  # noqa: E402
+from policy_compiler.snapshots import refresh_snapshots  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fill policies.content_hash / compiled_snapshot")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        updated = refresh_snapshots(db, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+    print(f"Rebuilt {updated} policy snapshots")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
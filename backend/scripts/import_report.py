@@ -0,0 +1,101 @@
+"""Import-time profile of the API process (python -X importtime, summarised).
+
+Runs the import in a fresh interpreter, the way uvicorn loads the app, and lists
+the modules with the largest cumulative and self import time.
+
+Usage:
+    python backend/scripts/import_report.py
+    python backend/scripts/import_report.py --module backend.governance_middleware.api --top 40
+    python backend/scripts/import_report.py --json > import_profile.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Rows of -X importtime output: module, self/cumulative microseconds and nesting depth."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the column header
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        rows.append({
+            "module": stripped,
+            "self_us": int(fields[0]),
+            "cumulative_us": int(fields[1]),
+            "depth": (len(name) - len(stripped) - 1) // 2,
+        })
+    return rows
+
+
+def profile_import(module: str, cwd: Path = BACKEND_DIR) -> List[Dict[str, Any]]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BACKEND_DIR.parent), env.get("PYTHONPATH")]))
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+
+def summarise(rows: List[Dict[str, Any]], top: int) -> Dict[str, Any]:
+    by_package: Dict[str, int] = defaultdict(int)
+    for row in rows:
+        by_package[row["module"].split(".")[0]] += row["self_us"]
+    return {
+        "total_ms": round(sum(row["self_us"] for row in rows) / 1000, 1),
+        "modules": len(rows),
+        "by_cumulative": sorted(rows, key=lambda r: r["cumulative_us"], reverse=True)[:top],
+        "by_self": sorted(rows, key=lambda r: r["self_us"], reverse=True)[:top],
+        "by_package_ms": {
+            package: round(us / 1000, 1)
+            for package, us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Summarise python -X importtime for the API process")
+    parser.add_argument("--module", default="main", help="module to import (default: main, from backend/)")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        report = summarise(profile_import(args.module), args.top)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"import {args.module}: {report['total_ms']} ms across {report['modules']} modules")
+    print("\ncumulative ms  self ms  module")
+    for row in report["by_cumulative"]:
+        print(f"{row['cumulative_us'] / 1000:>13.1f}  {row['self_us'] / 1000:>7.1f}  {'  ' * row['depth']}{row['module']}")
+    print("\nself ms by top-level package")
+    for package, ms in report["by_package_ms"].items():
+        print(f"{ms:>7.1f}  {package}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Bulk-load AI-use events (NDJSON or CSV) into the transparency ledger.
+
+Usage:
+    python backend/scripts/ingest_ledger.py events.ndjson
+    python backend/scripts/ingest_ledger.py export.csv --chunk-size 20000
+    partner-export | python backend/scripts/ingest_ledger.py - --format ndjson
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+for _path in (str(BACKEND_DIR.parent), str(BACKEND_DIR)):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from backend.db import SessionLocal  # noqa: E402
+from transparency_ledger.ingest import INGEST_CHUNK_SIZE, INGEST_FORMATS, ingest_ledger  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk-load AI-use events into ai_use_logs")
+    parser.add_argument("input", help="NDJSON/CSV file, or - for stdin")
+    parser.add_argument("--format", choices=INGEST_FORMATS, help="default: from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=INGEST_CHUNK_SIZE)
+    parser.add_argument("--skip-policy-check", action="store_true",
+                        help="do not reject rows whose policy_id is not in the policies table")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.input.lower().endswith(".csv") else "ndjson")
+    if args.input == "-":
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    else:
+        stream = open(args.input, encoding="utf-8", newline="")
+
+    def progress(report) -> None:
+        sys.stderr.write(
+            f"\r[ingest] {report.inserted} inserted, {report.rejected} rejected "
+            f"({report.rows_per_second:,.0f} rows/s)"
+        )
+        sys.stderr.flush()
+
+    db = SessionLocal()
+    try:
+        report = ingest_ledger(
+            stream, fmt, db,
+            chunk_size=args.chunk_size,
+            validate_policies=not args.skip_policy_check,
+            progress=progress,
+        )
+    finally:
+        db.close()
+        stream.close()
+
+    sys.stderr.write("\n")
+    print(report.model_dump_json(indent=2))
+    return 1 if report.rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""Recompute ai_use_rollups from raw ai_use_logs (after migrating, or to repair).
+
+Usage:
+    python backend/scripts/rebuild_rollups.py
+    python backend/scripts/rebuild_rollups.py --course-id CS101
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+for _path in (str(BACKEND_DIR.parent), str(BACKEND_DIR)):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from backend.db import SessionLocal  # noqa: E402
+from transparency_ledger.rollups import rebuild_rollups  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild analytics rollups from ai_use_logs")
+    parser.add_argument("--course-id", help="only this course (default: all)")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        total = rebuild_rollups(db, course_id=args.course_id, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+    print(f"[rollups] folded {total} logs in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
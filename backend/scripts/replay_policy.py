@@ -0,0 +1,73 @@
+"""What-if replay of the transparency ledger against a draft policy.
+
+Usage:
+    python backend/scripts/replay_policy.py --draft draft.json --course-id CS101
+    python backend/scripts/replay_policy.py --draft draft.json --institution-id inst-1 --workers 8
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+for _path in (str(BACKEND_DIR.parent), str(BACKEND_DIR)):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from backend.db import SessionLocal  # noqa: E402
+from backend.models import PolicyJSON  # noqa: E402
+from backend.governance_middleware.replay import REPLAY_CHUNK_SIZE, replay_policy  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay ledger events against a draft policy")
+    parser.add_argument("--draft", type=Path, required=True, help="draft PolicyJSON file")
+    scope = parser.add_mutually_exclusive_group(required=True)
+    scope.add_argument("--course-id")
+    scope.add_argument("--institution-id")
+    parser.add_argument("--actor-role", default="student")
+    parser.add_argument("--assessment-phase", default="submission")
+    parser.add_argument("--since", type=datetime.fromisoformat)
+    parser.add_argument("--until", type=datetime.fromisoformat)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=REPLAY_CHUNK_SIZE)
+    parser.add_argument("--output", type=Path, help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    draft = PolicyJSON.model_validate_json(args.draft.read_text(encoding="utf-8"))
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        report = replay_policy(
+            draft, db,
+            course_id=args.course_id,
+            institution_id=args.institution_id,
+            actor_role=args.actor_role,
+            assessment_phase=args.assessment_phase,
+            since=args.since,
+            until=args.until,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+        )
+    finally:
+        db.close()
+
+    payload = report.model_dump_json(indent=2)
+    if args.output:
+        args.output.write_text(payload, encoding="utf-8")
+    else:
+        print(payload)
+    elapsed = time.perf_counter() - started
+    sys.stderr.write(
+        f"[replay] {report.total_events} events, {report.changed_events} would change "
+        f"({json.dumps(report.summary)}) in {elapsed:.1f}s\n"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Rotate ledger pseudonyms of past epochs (resumable; re-run to continue).
+
+Usage:
+    python backend/scripts/rotate_pseudonyms.py
+    python backend/scripts/rotate_pseudonyms.py --max-seconds 600 --pause-seconds 0.1
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+for _path in (str(BACKEND_DIR.parent), str(BACKEND_DIR)):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from backend.config import settings  # noqa: E402
+from backend.db import SessionLocal  # noqa: E402
+from transparency_ledger.pseudonyms import rotate_pseudonyms  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rotate ai_use_logs pseudonyms to the current epoch")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--pause-seconds", type=float, default=0.0, help="sleep between chunks")
+    parser.add_argument("--max-chunks", type=int, help="stop after this many chunks")
+    parser.add_argument("--max-seconds", type=float, help="stop after this long (resume later)")
+    args = parser.parse_args()
+
+    def progress(report) -> None:
+        sys.stderr.write(
+            f"\r[rotate] epoch {report.target_epoch}: {report.rows_rotated} rows "
+            f"({report.rows_per_second:,.0f} rows/s)"
+        )
+        sys.stderr.flush()
+
+    db = SessionLocal()
+    try:
+        report = rotate_pseudonyms(
+            db,
+            settings.secret_key,
+            settings.pseudonym_rotation_days,
+            chunk_size=args.chunk_size,
+            pause_seconds=args.pause_seconds,
+            max_chunks=args.max_chunks,
+            max_seconds=args.max_seconds,
+            progress=progress,
+        )
+    finally:
+        db.close()
+    sys.stderr.write("\n")
+    print(report.model_dump_json(indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
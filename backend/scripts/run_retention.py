@@ -0,0 +1,46 @@
+"""Apply ai_use_logs retention (partition drop on Postgres, chunked delete elsewhere).
+
+Run daily, e.g. from cron:
+    python backend/scripts/run_retention.py
+    python backend/scripts/run_retention.py --retention-days 30 --chunk-size 2000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+for _path in (str(BACKEND_DIR.parent), str(BACKEND_DIR)):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from backend.config import settings  # noqa: E402
+from backend.db import SessionLocal  # noqa: E402
+from transparency_ledger.retention import run_retention  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Apply ai_use_logs retention")
+    parser.add_argument("--retention-days", type=int, default=settings.log_retention_days)
+    parser.add_argument("--chunk-size", type=int, default=settings.retention_sweep_chunk_size)
+    parser.add_argument("--pause-seconds", type=float, default=settings.retention_sweep_pause_seconds)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        report = run_retention(
+            db, args.retention_days, chunk_size=args.chunk_size, pause_seconds=args.pause_seconds
+        )
+    finally:
+        db.close()
+    report["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    print(json.dumps(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
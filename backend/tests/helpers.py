@@ -0,0 +1,124 @@
+"""Plain helpers shared by the backend test modules (fixtures live in conftest.py)."""
+
+from datetime import datetime
+
+from backend.auth import create_access_token
+from backend.models import (
+    ActionsConfig,
+    AllowedAction,
+    DisclosureRequirement,
+    LoggingConfig,
+    OverrideRule,
+    Policy,
+    PolicyJSON,
+    PolicyMetadata,
+    PolicyScope,
+    ProhibitedAction,
+    RoleDefinition,
+)
+
+
+def make_policy(policy_id: str) -> PolicyJSON:
+    return PolicyJSON(
+        policy_id=policy_id,
+        institution_id="inst-1",
+        course_id="CS101",
+        academic_year="2025-2026",
+        created_at=datetime.utcnow(),
+        effective_from=datetime.utcnow(),
+        version="1.0.0",
+        metadata=PolicyMetadata(title="Test", author_id="admin", description="desc"),
+        scope=PolicyScope(
+            applies_to=["students"],
+            assessment_types=["project"],
+            assessment_phases=["submission"],
+            roles=[RoleDefinition(role="student", description="")],
+            course_id="CS101",
+        ),
+        actions=ActionsConfig(
+            allowed_actions=[
+                AllowedAction(
+                    action="use_genai_brainstorm",
+                    description="",
+                    applies_to_roles=["student"],
+                    applies_to_assessment_types=["project"],
+                    applies_to_assessment_phases=["submission"],
+                    disclosure_required=True,
+                    disclosure_format="inline_comment",
+                )
+            ],
+            prohibited_actions=[
+                ProhibitedAction(
+                    action="use_genai_cheat",
+                    description="",
+                    applies_to_roles=["student"],
+                    applies_to_assessment_types=["project"],
+                    applies_to_assessment_phases=["submission"],
+                )
+            ],
+        ),
+        disclosure_requirements=[
+            DisclosureRequirement(
+                req_id="d1",
+                trigger_action="use_genai_brainstorm",
+                required_disclosure={"format": "inline_comment"},
+            )
+        ],
+        logging=LoggingConfig(),
+    )
+
+
+def accommodation_policy():
+    """make_policy("p1") with an override for holders of a 'genai_use' accommodation, as JSON."""
+    policy = make_policy("p1")
+    policy.override_rules = [
+        OverrideRule(
+            override_id="o1",
+            description="",
+            condition="has_approved_accommodation('genai_use')",
+            effect="allow_all_actions",
+        )
+    ]
+    return policy.model_dump(mode="json")
+
+
+def make_ctx(action, **overrides):
+    return {
+        "course_id": "CS101",
+        "actor_role": "student",
+        "action": action,
+        "assessment_type": "project",
+        "assessment_phase": "submission",
+        "actor_id_pseudonym": "stu_x",
+        **overrides,
+    }
+
+
+def store(db, policy):
+    db.add(Policy(
+        policy_id=policy.policy_id,
+        institution_id=policy.institution_id,
+        course_id=policy.course_id,
+        content=policy.model_dump(mode="json"),
+        version=policy.version,
+        previous_version_id=policy.previous_version_id,
+        created_at=policy.created_at,
+        effective_from=policy.effective_from,
+    ))
+    db.commit()
+
+
+def entry(action, timestamp, policy_id="p1", pseudonym="stu_1"):
+    return {
+        "course_id": "CS101",
+        "actor_id_pseudonym": pseudonym,
+        "action": action,
+        "assessment_type": "project",
+        "policy_id": policy_id,
+        "decision": "ALLOW",
+        "timestamp": timestamp,
+    }
+
+
+def auth_headers(role="admin"):
+    return {"Authorization": f"Bearer {create_access_token('user-1', role)}"}
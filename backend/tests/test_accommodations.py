@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.governance_middleware.accommodations import accommodation_cache, accommodation_store
+from backend.governance_middleware.decision_cache import decision_cache
+from backend.tests.helpers import accommodation_policy, make_ctx
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    accommodation_cache.invalidate()
+    decision_cache.invalidate()
+
+
+def evaluate(client, **overrides):
+    body = {"context": make_ctx("use_genai_cheat", **overrides), "policies": [accommodation_policy()]}
+    response = client.post("/api/v1/policy/evaluate", json=body)
+    assert response.status_code == 200
+    return response.json()["decision"]
+
+
+def test_client_supplied_accommodations_are_ignored(client):
+    assert evaluate(client, approved_accommodations=["genai_use"]) == "DENY"
+
+
+def test_stored_grants_apply_per_course_until_revoked_or_expired(client, session_factory):
+    db = session_factory()
+    accommodation_store.grant(db, "stu_x", "genai_use", course_id="CS202")
+    assert evaluate(client) == "DENY"
+
+    accommodation_store.grant(db, "stu_x", "genai_use", course_id="CS101")
+    assert evaluate(client) == "ALLOW"
+    assert evaluate(client, actor_id_pseudonym="stu_y") == "DENY"
+
+    assert accommodation_store.revoke(db, "stu_x", "genai_use") == 2
+    assert evaluate(client) == "DENY"
+
+    accommodation_store.grant(db, "stu_x", "genai_use", expires_at=datetime.utcnow() - timedelta(days=1))
+    assert evaluate(client) == "DENY"
+    db.close()
+
+
+def test_batch_resolves_each_pseudonym_once(client, session_factory, monkeypatch):
+    db = session_factory()
+    accommodation_store.grant(db, "stu_a", "genai_use")
+    db.close()
+    queries = []
+    original = accommodation_store._keep
+    monkeypatch.setattr(
+        accommodation_store, "_keep", lambda pseudonyms, rows: queries.append(pseudonyms) or original(pseudonyms, rows)
+    )
+
+    body = {
+        "policies": [accommodation_policy()],
+        "contexts": [
+            make_ctx("use_genai_cheat", actor_id_pseudonym="stu_a"),
+            make_ctx("use_genai_cheat", actor_id_pseudonym="stu_b", approved_accommodations=["genai_use"]),
+            {"course_id": "CS101"},
+            make_ctx("use_genai_cheat", actor_id_pseudonym="stu_a"),
+        ],
+    }
+    data = client.post("/api/v1/policy/evaluate/batch", json=body).json()
+    assert [r["decision"]["decision"] if r["decision"] else r["error"][:15] for r in data["results"]] == [
+        "ALLOW", "DENY", "Invalid context", "ALLOW"
+    ]
+    assert queries == [["stu_a", "stu_b"]]
@@ -0,0 +1,127 @@
+import threading
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.pool import StaticPool
+
+from backend.db import async_database_url, get_db
+from backend.governance_middleware.accommodations import accommodation_cache, accommodation_store
+from backend.governance_middleware.api import analytics_cache, router
+from backend.governance_middleware.registry import PolicyRegistry
+from backend.transparency_ledger import AIUseLogORM
+from backend.transparency_ledger.aio import get_course_analytics_async, log_to_transparency_ledger_async
+from backend.transparency_ledger.merkle import seal_pending
+from backend.tests.helpers import accommodation_policy, make_ctx, make_policy, store
+
+pytest.importorskip("aiosqlite")
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+
+@pytest.fixture
+async def async_session_factory():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(AIUseLogORM.metadata.create_all)
+    yield async_sessionmaker(engine)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def async_client(async_session_factory):
+    async def override_get_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_db] = override_get_db
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+
+def test_async_database_url():
+    assert async_database_url("sqlite:///genai_governance.db") == "sqlite+aiosqlite:///genai_governance.db"
+    assert async_database_url("postgresql://u:p@db:5432/gov") == "postgresql+asyncpg://u:p@db:5432/gov"
+    with pytest.raises(ValueError):
+        async_database_url("mysql://u:p@db/gov")
+
+
+@pytest.mark.asyncio
+async def test_routes_run_on_async_session(async_client, async_session_factory):
+    analytics_cache.invalidate()
+    policy = make_policy("p1").model_dump(mode="json")
+    for action in ("use_genai_cheat", "use_genai_brainstorm"):
+        response = await async_client.post("/api/v1/policy/evaluate", json={"context": make_ctx(action), "policies": [policy]})
+        assert response.status_code == 200
+    batch = await async_client.post(
+        "/api/v1/policy/evaluate/batch",
+        json={"contexts": [make_ctx("use_genai_brainstorm")], "policies": [policy]}
+    )
+    assert batch.json()["succeeded"] == 1
+
+    view = (await async_client.get("/api/transparency/my-logs/stu_x")).json()
+    assert view["summary"].startswith("You have 3 AI-use events")
+    page = (await async_client.get("/api/transparency/my-logs/stu_x/events", params={"limit": 2})).json()
+    assert len(page["items"]) == 2 and page["next_cursor"]
+    async with async_session_factory() as db:
+        await db.run_sync(seal_pending)  # the app's LedgerSealer
+    analytics = (await async_client.get("/api/transparency/course-analytics/CS101")).json()
+    assert analytics["total_events"] == 3
+
+
+@pytest.mark.asyncio
+async def test_async_entry_points(async_session_factory):
+    async with async_session_factory() as db:
+        await db.run_sync(lambda session: store(session, make_policy("p1")))
+        compiled = await PolicyRegistry().get_async("CS101", db)
+        assert compiled.version == (("p1", make_policy("p1").version),)
+
+        log = await log_to_transparency_ledger_async(
+            db, actor_id_pseudonym="stu_1", action="use_genai_brainstorm", assessment_type="project",
+            policy_id="p1", decision="ALLOW", course_id="CS101"
+        )
+        assert log.batch_id is None  # sealed later, off the request path
+        await db.run_sync(seal_pending)
+        analytics = await get_course_analytics_async("CS101", db)
+        assert analytics.total_events == 1
+
+
+@pytest.mark.asyncio
+async def test_async_routes_await_queries_and_evaluate_off_the_loop(async_client, async_session_factory, monkeypatch):
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from backend.governance_middleware import api
+
+    async with async_session_factory() as db:
+        await db.run_sync(lambda session: store(session, make_policy("p1")))
+
+    def run_sync(*args, **kwargs):
+        raise AssertionError("AsyncSession.run_sync runs the whole route on the event loop")
+
+    monkeypatch.setattr(AsyncSession, "run_sync", run_sync)
+    loop_thread = threading.get_ident()
+    deciding_threads = []
+    real_decide = api._decide
+    monkeypatch.setattr(api, "_decide", lambda *a: deciding_threads.append(threading.get_ident()) or real_decide(*a))
+
+    # Server-side policies: the registry is read through the async driver
+    response = await async_client.post("/api/v1/policy/evaluate", json={"context": make_ctx("use_genai_cheat")})
+    assert response.status_code == 200 and response.json()["decision"] == "DENY"
+    assert deciding_threads and loop_thread not in deciding_threads
+    batch = await async_client.post("/api/v1/policy/evaluate/batch", json={"contexts": [make_ctx("use_genai_brainstorm")]})
+    assert batch.json()["succeeded"] == 1
+    assert (await async_client.get("/api/transparency/my-logs/stu_x")).json()["summary"].startswith("You have 2")
+
+
+@pytest.mark.asyncio
+async def test_async_routes_resolve_accommodations_server_side(async_client, async_session_factory):
+    accommodation_cache.invalidate()
+    body = {
+        "context": make_ctx("use_genai_cheat", approved_accommodations=["genai_use"]),
+        "policies": [accommodation_policy()],
+    }
+    assert (await async_client.post("/api/v1/policy/evaluate", json=body)).json()["decision"] == "DENY"
+
+    async with async_session_factory() as db:
+        await db.run_sync(lambda session: accommodation_store.grant(session, "stu_x", "genai_use"))
+    assert (await async_client.post("/api/v1/policy/evaluate", json=body)).json()["decision"] == "ALLOW"
@@ -0,0 +1,28 @@
+from backend.transparency_ledger import AIUseLogORM
+from backend.tests.helpers import make_ctx, make_policy
+
+
+def test_batch_keeps_order_and_reports_item_errors(client, session_factory):
+    body = {
+        "policies": [make_policy("p1").model_dump(mode="json")],
+        "contexts": [
+            make_ctx("use_genai_cheat"),
+            {"course_id": "CS101"},
+            make_ctx(""),
+            make_ctx("use_genai_brainstorm"),
+        ],
+    }
+    response = client.post("/api/v1/policy/evaluate/batch", json=body)
+    assert response.status_code == 200
+    data = response.json()
+
+    assert [r["index"] for r in data["results"]] == [0, 1, 2, 3]
+    assert data["results"][0]["decision"]["decision"] == "DENY"
+    assert data["results"][1]["error"].startswith("Invalid context")
+    assert data["results"][2]["error"] == "No action provided in context"
+    assert data["results"][3]["decision"]["decision"] == "ALLOW"
+    assert (data["total"], data["succeeded"], data["failed"]) == (4, 2, 2)
+
+    db = session_factory()
+    assert db.query(AIUseLogORM).count() == 2
+    db.close()
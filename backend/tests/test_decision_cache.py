@@ -0,0 +1,81 @@
+import time
+
+from backend.models import GovernanceContext
+from backend.governance_middleware.decision_cache import DecisionCache, decision_cache
+from backend.governance_middleware.enforcement import compile_policies
+from backend.tests.helpers import make_policy
+
+
+def test_lru_eviction_and_counters():
+    cache = DecisionCache(maxsize=2, ttl_seconds=60)
+    cache.put("h", "a", 1)
+    cache.put("h", "b", 2)
+    assert cache.get("h", "a") == 1  # "b" is now least recently used
+    cache.put("h", "c", 3)
+    assert cache.get("h", "b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry_and_invalidate_by_hash():
+    cache = DecisionCache(maxsize=10, ttl_seconds=0.01)
+    cache.put("h1", "a", 1)
+    time.sleep(0.02)
+    assert cache.get("h1", "a") is None
+
+    cache.ttl_seconds = 60
+    cache.put("h1", "a", 1)
+    cache.put("h2", "a", 2)
+    assert cache.invalidate("h1") == 1
+    assert cache.get("h1", "a") is None
+    assert cache.get("h2", "a") == 2
+
+
+def test_policy_edit_changes_cache_key():
+    ctx = GovernanceContext(
+        course_id="CS101",
+        actor_role="student",
+        action="use_genai_cheat",
+        assessment_type="project",
+        assessment_phase="submission",
+        actor_id_pseudonym="stu_x",
+    )
+    policy = make_policy("p1")
+    compiled = compile_policies([policy])
+    assert compiled.decide(ctx).decision.value == "DENY"
+    hits = decision_cache.hits
+    compiled.decide(ctx.model_copy(update={"actor_id_pseudonym": "stu_y"}))
+    assert decision_cache.hits == hits + 1
+
+    # Same policy_id and version, different content: must not reuse cached decisions
+    edited_policy = policy.model_copy(deep=True)
+    edited_policy.actions.prohibited_actions = []
+    edited = compile_policies([edited_policy])
+    assert edited.content_hash != compiled.content_hash
+    assert edited.decide(ctx).decision.value == "REQUIRE_JUSTIFICATION"
+
+
+def test_compiled_sets_follow_policy_content():
+    from backend.governance_middleware.enforcement import f
+
+    policies = [make_policy("p1"), make_policy("p2")]
+    compiled = compile_policies(policies)
+    # Re-validated copies (a new request body) share the compiled set
+    assert compile_policies([p.model_copy(deep=True) for p in policies]) is compiled
+
+    ctx = GovernanceContext(
+        course_id="CS101",
+        actor_role="student",
+        action="use_genai_brainstorm",
+        assessment_type="project",
+        assessment_phase="submission",
+        actor_id_pseudonym="stu_x",
+    )
+    assert f(policies, ctx, ctx.action).decision.value == "ALLOW"
+
+    # PolicyJSON is mutable: a policy edited in place gets a new compiled set
+    for policy in policies:
+        policy.actions.allowed_actions = []
+    assert compile_policies(policies) is not compiled
+    assert f(policies, ctx, ctx.action).decision.value != "ALLOW"
@@ -1,69 +1,11 @@
 import pytest
-from datetime import datetime
 
 from backend.models import (
     GovernanceContext,
-    PolicyJSON,
-    PolicyMetadata,
-    PolicyScope,
     RoleDefinition,
-    ActionsConfig,
-    AllowedAction,
-    ProhibitedAction,
-    DisclosureRequirement,
-    LoggingConfig,
 )
 from backend.governance_middleware.enforcement import decide
-
-
-def make_policy(policy_id: str) -> PolicyJSON:
-    return PolicyJSON(
-        policy_id=policy_id,
-        institution_id="inst-1",
-        course_id="CS101",
-        academic_year="2025-2026",
-        created_at=datetime.utcnow(),
-        effective_from=datetime.utcnow(),
-        version="1.0.0",
-        metadata=PolicyMetadata(title="Test", author_id="admin", description="desc"),
-        scope=PolicyScope(
-            applies_to=["students"],
-            assessment_types=["project"],
-            assessment_phases=["submission"],
-            roles=[RoleDefinition(role="student", description="")],
-            course_id="CS101",
-        ),
-        actions=ActionsConfig(
-            allowed_actions=[
-                AllowedAction(
-                    action="use_genai_brainstorm",
-                    description="",
-                    applies_to_roles=["student"],
-                    applies_to_assessment_types=["project"],
-                    applies_to_assessment_phases=["submission"],
-                    disclosure_required=True,
-                    disclosure_format="inline_comment",
-                )
-            ],
-            prohibited_actions=[
-                ProhibitedAction(
-                    action="use_genai_cheat",
-                    description="",
-                    applies_to_roles=["student"],
-                    applies_to_assessment_types=["project"],
-                    applies_to_assessment_phases=["submission"],
-                )
-            ],
-        ),
-        disclosure_requirements=[
-            DisclosureRequirement(
-                req_id="d1",
-                trigger_action="use_genai_brainstorm",
-                required_disclosure={"format": "inline_comment"},
-            )
-        ],
-        logging=LoggingConfig(),
-    )
+from backend.tests.helpers import make_policy
 
 
 def test_decide_allow_with_disclosure():
@@ -93,3 +35,107 @@ def test_decide_deny():
     )
     decision = decide([policy], ctx)
     assert decision.decision.value == "DENY"
+
+
+def _without_timestamp(decision):
+    data = decision.model_dump()
+    data["trace"].pop("timestamp")
+    return data
+
+
+def test_compiled_policy_set_matches_decide():
+    from itertools import product
+    from backend.models import OverrideRule
+    from backend.governance_middleware.enforcement import CompiledPolicySet
+
+    course_policy = make_policy("p1")
+    # Course-agnostic policy that allows what p1 prohibits -> conflict
+    open_policy = make_policy("p2")
+    open_policy.scope.course_id = None
+    open_policy.actions.allowed_actions[0].action = "use_genai_cheat"
+    open_policy.scope.roles.append(RoleDefinition(role="ta", description="", condition="course_id = 'CS102'"))
+    override_policy = make_policy("p3")
+    override_policy.scope.course_id = "CS102"
+    override_policy.override_rules = [
+        OverrideRule(
+            override_id="o1",
+            description="",
+            condition="has_approved_accommodation('genai_use')",
+            effect="allow_all_actions",
+            requires_disclosure="email",
+        )
+    ]
+    deny_policy = make_policy("p4")
+    deny_policy.override_rules = [
+        OverrideRule(
+            override_id="o2",
+            description="",
+            condition="action in ['use_genai_brainstorm'] and not has_approved_accommodation('genai_use')",
+            effect="deny_all_actions",
+        )
+    ]
+    policies = [course_policy, open_policy, override_policy, deny_policy]
+    compiled = CompiledPolicySet(policies)
+
+    for course_id, action, assessment_type, phase, role, accommodations in product(
+        ["CS101", "CS102", "OTHER"],
+        ["use_genai_brainstorm", "use_genai_cheat", "unknown_action"],
+        ["project", "exam"],
+        ["submission", "drafting"],
+        ["student", "ta"],
+        [[], ["genai_use"], ["extra_time"]],
+    ):
+        ctx = GovernanceContext(
+            course_id=course_id,
+            actor_role=role,
+            action=action,
+            assessment_type=assessment_type,
+            assessment_phase=phase,
+            actor_id_pseudonym="stu_x",
+            approved_accommodations=accommodations,
+        )
+        # Twice: first call fills the index, second is served from it
+        for _ in range(2):
+            assert _without_timestamp(compiled.decide(ctx)) == _without_timestamp(decide(policies, ctx))
+
+
+def test_trace_levels():
+    from backend.models import TraceLevel
+    from backend.governance_middleware.enforcement import compile_policies
+
+    policy = make_policy("p1")
+    ctx = GovernanceContext(
+        course_id="CS101",
+        actor_role="student",
+        action="use_genai_cheat",
+        assessment_type="project",
+        assessment_phase="submission",
+        actor_id_pseudonym="stu_x",
+    )
+    compiled = compile_policies([policy])
+
+    none = compiled.decide(ctx, TraceLevel.NONE)
+    assert none.trace == {}
+    assert none.decision.value == "DENY"
+    assert none.applied_rules == ["use_genai_cheat"]
+
+    summary = compiled.decide(ctx, TraceLevel.SUMMARY)
+    assert "context" not in summary.trace
+    assert summary.trace["matched_policies"] == [{"policy_id": "p1", "version": "1.0.0", "effect": "prohibited"}]
+
+    full = compiled.decide(ctx, TraceLevel.FULL)
+    assert full.trace["context"]["actor_id_pseudonym"] == "stu_x"
+    assert _without_timestamp(full) == _without_timestamp(decide([policy], ctx, TraceLevel.FULL))
+
+
+def test_public_engine_api_without_pydantic_contexts():
+    from backend.governance_middleware.core import Decision, DecisionContext, ObligationRecord
+    from backend.governance_middleware.enforcement import evaluate
+
+    policy = make_policy("p1")
+    ctx = DecisionContext("CS101", "student", "use_genai_brainstorm", "project", "submission", "stu_x")
+    result = evaluate([policy], ctx)
+    assert isinstance(result, Decision)
+    assert result.decision.value == "ALLOW"
+    assert result.obligations == (ObligationRecord("disclosure_required", "inline_comment"),)
+    assert result.trace["context"]["actor_id_pseudonym"] == "stu_x"
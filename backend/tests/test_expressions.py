@@ -0,0 +1,40 @@
+import pytest
+
+from backend.models import GovernanceContext
+from backend.governance_middleware.expressions import ExpressionError, compile_expression
+
+
+CTX = GovernanceContext(
+    course_id="CS101",
+    actor_role="student",
+    action="use_genai_brainstorm",
+    assessment_type="project",
+    assessment_phase="drafting",
+    actor_id_pseudonym="stu_x",
+    approved_accommodations=["genai_use"],
+)
+
+
+@pytest.mark.parametrize("source, expected", [
+    ("has_approved_accommodation('genai_use')", True),
+    ("has_approved_accommodation('extra_time')", False),
+    ("role='student'", True),
+    ("actor_role == 'ta' or assessment_type in ['project', 'exam']", True),
+    ("not (phase != 'drafting') && course_id not in ['CS101']", False),
+    ("TRUE and !false", True),
+])
+def test_expression_evaluation(source, expected):
+    assert compile_expression(source).evaluate(CTX) is expected
+
+
+def test_expressions_are_compiled_once_per_text():
+    expr = compile_expression("role = 'student' and has_approved_accommodation('genai_use')")
+    assert compile_expression("role = 'student' and has_approved_accommodation('genai_use')") is expr
+    assert expr.literals == {"actor_role": frozenset({"student"})}
+    assert expr.accommodations == frozenset({"genai_use"})
+
+
+@pytest.mark.parametrize("source", ["", "role", "__import__('os')", "role == course_id", "role = 'a' extra", "ctx.action = 'x'"])
+def test_rejects_unsafe_or_malformed(source):
+    with pytest.raises(ExpressionError):
+        compile_expression(source)
@@ -0,0 +1,68 @@
+import io
+import json
+
+from backend.transparency_ledger import AIUseLogORM
+from backend.transparency_ledger.ingest import ingest_ledger
+from backend.tests.helpers import auth_headers, make_policy, store
+
+
+def event(**overrides):
+    return {
+        "course_id": "CS101",
+        "actor_id_pseudonym": "stu_1",
+        "action": "use_genai_brainstorm",
+        "assessment_type": "project",
+        "policy_id": "p1",
+        "decision": "ALLOW",
+        "timestamp": "2025-01-01T10:00:00Z",
+        **overrides,
+    }
+
+
+def test_ndjson_streams_in_chunks_and_rejects_bad_rows(session_factory):
+    db = session_factory()
+    store(db, make_policy("p1"))
+    lines = [json.dumps(event(actor_id_pseudonym=f"stu_{i}")) for i in range(5)]
+    lines += [
+        json.dumps(event(decision="MAYBE")),
+        json.dumps(event(policy_id="nope")),
+        "{not json",
+        "",
+        json.dumps(event(timestamp=None)),
+    ]
+    seen = []
+    report = ingest_ledger(io.StringIO("\n".join(lines)), "ndjson", db, chunk_size=2,
+                           progress=lambda r: seen.append(r.inserted))
+
+    assert (report.total_rows, report.inserted, report.rejected) == (9, 5, 4)
+    assert [e["line"] for e in report.errors] == [6, 7, 8, 10]
+    assert seen == [2, 4, 5] and report.backend == "executemany"
+    assert db.query(AIUseLogORM).count() == 5
+    row = db.query(AIUseLogORM).first()
+    assert row.timestamp.hour == 10 and (row.retention_until - row.timestamp).days == 90
+    db.close()
+
+
+def test_csv_ingest_through_api(client, session_factory):
+    db = session_factory()
+    store(db, make_policy("p1"))
+    db.close()
+    header = "course_id,actor_id_pseudonym,action,assessment_type,policy_id,decision,timestamp,student_email"
+    body = "\n".join([
+        header,
+        "CS101,stu_1,use_genai_brainstorm,project,p1,ALLOW,2025-01-01T10:00:00,x@example.edu",
+        "CS101,stu_2,use_genai_cheat,project,p1,deny,2025-01-02T10:00:00,",
+        "CS101,,use_genai_cheat,project,p1,DENY,2025-01-02T10:00:00,",
+    ])
+
+    url = "/api/v1/ledger/ingest?format=csv"
+    assert client.post(url, content=body.encode()).status_code == 403
+    assert client.post(url, content=body.encode(), headers=auth_headers("faculty")).status_code == 403
+
+    resp = client.post(url, content=body.encode(), headers=auth_headers())
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["inserted"], data["rejected"]) == (2, 1)
+    assert data["errors"][0]["error"] == "missing actor_id_pseudonym"
+
+    assert client.post("/api/v1/ledger/ingest?format=xml", content=b"", headers=auth_headers()).status_code == 400
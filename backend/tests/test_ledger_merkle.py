@@ -0,0 +1,89 @@
+import pytest
+
+from backend.transparency_ledger import AIUseLogORM, log_batch_to_transparency_ledger, log_to_transparency_ledger
+from backend.transparency_ledger.merkle import (
+    LedgerSealer, build_tree, get_chain_head, get_inclusion_proof, seal_pending, tree_proof, verify_chain, verify_inclusion
+)
+
+
+def entry(i):
+    return {
+        "course_id": "CS101",
+        "actor_id_pseudonym": f"stu_{i}",
+        "action": "use_genai_brainstorm",
+        "assessment_type": "project",
+        "policy_id": "p1",
+        "decision": "ALLOW",
+    }
+
+
+@pytest.mark.parametrize("leaf_count", [1, 2, 5, 8, 13])
+def test_every_leaf_proves_into_root(leaf_count):
+    import hashlib
+    leaves = [hashlib.sha256(bytes([i])).digest() for i in range(leaf_count)]
+    root, tree = build_tree(leaves)
+    for i, leaf in enumerate(leaves):
+        proof = [{"position": p, "hash": h.hex()} for p, h in tree_proof(tree, leaf_count, i)]
+        assert len(proof) <= max(1, (leaf_count - 1).bit_length())
+        assert verify_inclusion(leaf.hex(), proof, root.hex())
+    assert not verify_inclusion(leaves[0].hex(), [], hashlib.sha256(b"x").hexdigest())
+
+
+def test_rows_are_sealed_chained_and_provable(client, session_factory):
+    db = session_factory()
+    log_batch_to_transparency_ledger([entry(i) for i in range(6)], db, seal=True)
+    single = log_to_transparency_ledger(db=db, **entry(9))
+    assert single.batch_id is None and get_chain_head(db)["batch_id"] == 1
+    assert client.get(f"/api/v1/ledger/proof/{single.log_id}").status_code == 404
+
+    # Decisions written unsealed are sealed in bulk, one head lock per pass
+    log_to_transparency_ledger(db=db, **entry(10))
+    assert seal_pending(db) == 2 and seal_pending(db) == 0
+    assert get_chain_head(db)["batch_id"] == 2
+    assert verify_chain(db, check_trees=True)["ok"]
+
+    log = db.query(AIUseLogORM).filter(AIUseLogORM.batch_id == 1, AIUseLogORM.leaf_index == 4).one()
+    proof = get_inclusion_proof(db, log.log_id)
+    assert proof.row_matches and proof.leaf_count == 6
+    assert verify_inclusion(proof.leaf_hash, proof.proof, proof.merkle_root)
+
+    resp = client.get(f"/api/v1/ledger/proof/{single.log_id}")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["batch_id"] == 2 and body["prev_batch_hash"] == proof.batch_hash
+
+    # Editing a sealed row is detected without touching any other row
+    log.decision = "DENY"
+    db.commit()
+    assert not get_inclusion_proof(db, log.log_id).row_matches
+    db.close()
+
+
+def test_tampered_batch_header_breaks_chain(session_factory):
+    from backend.transparency_ledger.merkle import LedgerBatchORM
+
+    db = session_factory()
+    for i in range(3):
+        log_batch_to_transparency_ledger([entry(i)], db, seal=True)
+    db.get(LedgerBatchORM, 2).merkle_root = "00" * 32
+    db.commit()
+    assert verify_chain(db) == {"ok": False, "verified_batches": 1, "first_bad_batch": 2}
+    assert verify_chain(db, from_batch_id=3)["ok"]
+    db.close()
+
+
+def test_sealer_seals_pending_rows_and_on_stop(session_factory):
+    db = session_factory()
+    for i in range(3):
+        log_to_transparency_ledger(db=db, **entry(i))
+    db.close()
+
+    sealer = LedgerSealer(session_factory, interval=60.0, max_rows=2)
+    sealer.start()
+    sealer.stop(timeout=5)  # final pass before exiting
+
+    db = session_factory()
+    assert db.query(AIUseLogORM).filter(AIUseLogORM.batch_id.is_(None)).count() == 0
+    assert get_chain_head(db)["batch_id"] == 2  # max_rows per batch
+    assert verify_chain(db, check_trees=True)["ok"]
+    db.close()
@@ -0,0 +1,119 @@
+import threading
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.transparency_ledger import AIUseLogORM
+from backend.transparency_ledger.merkle import seal_pending, verify_chain
+from backend.transparency_ledger.write_behind import LedgerWriteBehind
+
+
+def entry(i=0):
+    return {
+        "course_id": "CS101",
+        "actor_id_pseudonym": f"stu_{i}",
+        "action": "use_genai_brainstorm",
+        "assessment_type": "project",
+        "policy_id": "p1",
+        "decision": "ALLOW",
+    }
+
+
+def count(session_factory):
+    db = session_factory()
+    try:
+        return db.query(AIUseLogORM).count()
+    finally:
+        db.close()
+
+
+def test_batches_and_drains_on_stop(session_factory):
+    writer = LedgerWriteBehind(session_factory, maxsize=100, batch_size=10, flush_interval=5.0)
+    captured = datetime(2025, 1, 1)
+    assert writer.submit_many([entry(i) for i in range(25)] + [{**entry(), "timestamp": captured}]) == 26
+
+    # Full batches go out without waiting for the interval; stop() drains the rest
+    writer.stop()
+    assert count(session_factory) == 26
+    stats = writer.stats()
+    assert stats["written"] == 26 and stats["queue_depth"] == 0 and not stats["running"]
+    assert stats["flushes"] >= 3 and stats["max_flush_ms"] > 0
+
+    db = session_factory()
+    assert db.query(AIUseLogORM).filter(AIUseLogORM.timestamp == captured).count() == 1
+    db.close()
+
+
+@pytest.fixture
+def file_session_factory(tmp_path):
+    # A connection per session, so concurrent flushers contend as they would in production
+    engine = create_engine(f"sqlite:///{tmp_path / 'ledger.db'}", connect_args={"timeout": 10})
+    AIUseLogORM.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def test_backpressure_when_full(file_session_factory):
+    session_factory = file_session_factory
+    release = threading.Event()
+
+    def slow_flusher_factory():
+        # Only the background flushers are stalled; synchronous fallbacks write at once
+        if threading.current_thread().name == "ledger-write-behind":
+            release.wait()
+        return session_factory()
+
+    dropping = LedgerWriteBehind(slow_flusher_factory, maxsize=2, batch_size=1, flush_interval=0.01,
+                                 backpressure="drop")
+    syncing = LedgerWriteBehind(slow_flusher_factory, maxsize=2, batch_size=1, flush_interval=0.01,
+                                backpressure="sync")
+    # The stalled flusher holds at most one record and the queue two; the rest overflow
+    accepted = sum(dropping.submit(entry(i)) for i in range(10))
+    assert accepted <= 3 and dropping.stats()["dropped"] == 10 - accepted
+    assert all(syncing.submit(entry(i)) for i in range(10))
+    assert count(session_factory) == syncing.stats()["sync_writes"] >= 7
+
+    # Both flushers at once: each seals its flushes under the chain head lock
+    release.set()
+    dropping.stop()
+    syncing.stop()
+    assert count(session_factory) == accepted + 10
+    assert dropping.stats()["failed"] == syncing.stats()["failed"] == 0
+
+    # Overflow rows were written unsealed by the caller; sealing them leaves one unforked chain
+    db = session_factory()
+    assert seal_pending(db) == syncing.stats()["sync_writes"]
+    assert db.query(AIUseLogORM).filter(AIUseLogORM.batch_id.is_(None)).count() == 0
+    assert verify_chain(db, check_trees=True)["ok"]
+    db.close()
+
+
+def test_block_mode_overflows_once_per_call(file_session_factory, monkeypatch):
+    import atexit
+    import time
+
+    registered = []
+    monkeypatch.setattr(atexit, "register", lambda *args: registered.append(args))
+    release = threading.Event()
+
+    def stalled_flusher_factory():
+        if threading.current_thread().name == "ledger-write-behind":
+            release.wait()
+        return file_session_factory()
+
+    writer = LedgerWriteBehind(stalled_flusher_factory, maxsize=2, batch_size=1, flush_interval=0.01,
+                               backpressure="block", enqueue_timeout=0.2)
+    started = time.monotonic()
+    assert writer.submit_many([entry(i) for i in range(20)]) == 20
+    # One enqueue_timeout wait, then everything left is written in one synchronous batch
+    assert time.monotonic() - started < 1.0
+    assert writer.stats()["sync_writes"] >= 17
+
+    release.set()
+    writer.stop()
+    writer.start()
+    writer.stop()
+    assert count(file_session_factory) == 20
+    assert len(registered) == 1
@@ -0,0 +1,102 @@
+import re
+
+import pytest
+from sqlalchemy import create_engine
+
+from backend.db import expose_pool_metrics
+from metrics import MetricsRegistry, registry
+from backend.tests.helpers import make_ctx, make_policy
+
+
+def sample(text, name, **labels):
+    """Value of one series in a Prometheus text scrape (None when absent)."""
+    wanted = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    pattern = "^" + re.escape(name + (f"{{{wanted}}}" if wanted else "")) + r" (\S+)$"
+    match = re.search(pattern, text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_counter_gauge_histogram_render():
+    r = MetricsRegistry()
+    r.counter("jobs_total", "Jobs", ("kind",)).labels(kind='a"b').inc(2)
+    r.gauge("depth", "Depth").set(3)
+    latency = r.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 7):
+        latency.observe(value)
+    text = r.render()
+
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{kind="a\\"b"} 2' in text
+    assert sample(text, "depth") == 3
+    assert sample(text, "latency_seconds_bucket", le="0.1") == 2
+    assert sample(text, "latency_seconds_bucket", le="1") == 3
+    assert sample(text, "latency_seconds_bucket", le="+Inf") == 4
+    assert sample(text, "latency_seconds_count") == 4
+    assert sample(text, "latency_seconds_sum") == pytest.approx(7.65)
+
+
+def test_registration_and_labels_are_checked():
+    r = MetricsRegistry()
+    first = r.counter("hits_total", "Hits", ("cache",))
+    assert r.counter("hits_total", "Hits", ("cache",)) is first
+    with pytest.raises(ValueError):
+        r.gauge("hits_total", "Hits", ("cache",))
+    with pytest.raises(ValueError):
+        first.labels(course="CS101")
+
+
+def test_callbacks_and_stats_are_read_at_scrape_time():
+    r = MetricsRegistry()
+    stats = {"hits": 1, "hit_rate": 0.5}
+    r.expose_stats("cache", lambda: stats, counters={"hits": "Hits"}, gauges={"hit_rate": "Rate"}, cache="d")
+    r.gauge("broken", "Raises").set_function(lambda: 1 / 0)
+    stats.update(hits=4, hit_rate=0.8)
+    text = r.render()
+
+    assert sample(text, "cache_hits_total", cache="d") == 4
+    assert sample(text, "cache_hit_rate", cache="d") == 0.8
+    assert "# TYPE broken gauge" in text and sample(text, "broken") is None
+
+
+def test_pool_metrics(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=3, max_overflow=2)
+    expose_pool_metrics(engine, "test")
+    with engine.connect():
+        text = registry.render()
+    assert sample(text, "db_pool_checked_out", engine="test") == 1
+    assert sample(text, "db_pool_capacity", engine="test") == 5
+    assert sample(text, "db_pool_checked_out", engine="test") == 1
+
+
+def test_metrics_endpoint_reports_decisions_ledger_and_caches(client):
+    before = sample(registry.render(), "ledger_entries_written_total") or 0
+    body = {
+        "policies": [make_policy("p1").model_dump(mode="json")],
+        "contexts": [make_ctx("use_genai_cheat"), make_ctx("use_genai_brainstorm")],
+    }
+    assert client.post("/api/v1/policy/evaluate/batch", json=body).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert sample(text, "governance_decide_seconds_count", decision="DENY") >= 1
+    assert sample(text, "governance_decide_seconds_count", decision="ALLOW") >= 1
+    assert sample(text, "ledger_entries_written_total") == before + 2
+    assert sample(text, "ledger_commit_seconds_count", mode="batch") >= 1
+    assert sample(text, "cache_hit_rate", cache="decision") is not None
+    assert sample(text, "cache_size", cache="analytics") is not None
+    assert sample(text, "ledger_write_behind_queue_depth") is not None
+
+
+async def test_copilot_answers_are_counted():
+    from backend.rag_copilot import ask_policy_question
+
+    before = sample(registry.render(), "copilot_answers_total", confidence="high") or 0
+    policy = {"course_id": "CS101", "policy_id": "p1", "allowed_actions": [{"action": "brainstorm"}]}
+    result = await ask_policy_question("Can I brainstorm?", "CS101", [policy])
+
+    assert result.confidence >= 0.7 and result.policy_ids == ["p1"]
+    text = registry.render()
+    assert sample(text, "copilot_answers_total", confidence="high") == before + 1
+    assert sample(text, "copilot_ask_seconds_count") >= 1
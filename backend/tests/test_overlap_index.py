@@ -0,0 +1,119 @@
+from datetime import datetime
+
+from backend.models import AllowedAction, Policy, ProhibitedAction
+from backend.policy_compiler import deprecate_policy, detect_conflicts
+from backend.policy_compiler.overlap_index import OverlapIndex, overlap_index
+from backend.tests.helpers import make_policy, store
+
+
+def institution_policy(policy_id, prohibited):
+    # Institution-level: no scope.course_id, applies to every course of inst-1
+    policy = make_policy(policy_id)
+    policy.scope.course_id = None
+    policy.actions.allowed_actions = []
+    policy.actions.prohibited_actions = [ProhibitedAction(
+        action=prohibited,
+        description="",
+        applies_to_roles=["student"],
+        applies_to_assessment_types=["project"],
+        applies_to_assessment_phases=["submission"],
+    )]
+    return policy
+
+
+def course_policy(policy_id, course_id):
+    policy = make_policy(policy_id)
+    policy.course_id = course_id
+    policy.scope.course_id = course_id
+    return policy
+
+
+def test_conflicts_across_course_and_institution_policies():
+    index = OverlapIndex([course_policy("cs", "CS101"), course_policy("ma", "MA101")])
+    assert index.conflicts() == []
+
+    added = index.add(institution_policy("inst", "use_genai_brainstorm"))
+    assert sorted(c["course_id"] for c in added) == ["CS101", "MA101"]
+    conflict = index.conflicts(course_id="CS101")[0]
+    assert conflict["allowed_by"] == ["cs"] and conflict["prohibited_by"] == ["inst"]
+    assert (conflict["role"], conflict["assessment_type"], conflict["assessment_phase"], conflict["action"]) == (
+        "student", "project", "submission", "use_genai_brainstorm"
+    )
+    assert index.conflicts(institution_id="other") == []
+
+
+def test_incremental_reindex_and_remove():
+    index = OverlapIndex([course_policy("cs", "CS101"), institution_policy("inst", "use_genai_brainstorm")])
+    assert len(index.conflicts()) == 1
+
+    # Re-indexing a policy replaces its previous cells
+    assert index.add(institution_policy("inst", "use_genai_cheat")) == []
+    assert index.conflicts() == []
+
+    # Dry run does not mutate the index
+    assert len(index.conflicts_for(institution_policy("inst", "use_genai_brainstorm"))) == 1
+    assert index.conflicts() == []
+
+    index.add(institution_policy("inst", "use_genai_brainstorm"))
+    index.remove("cs")
+    assert index.conflicts() == [] and len(index) == 1
+
+
+def test_new_version_replaces_the_previous_one():
+    index = OverlapIndex([course_policy("cs_v1", "CS101"), institution_policy("inst", "use_genai_brainstorm")])
+    v2 = course_policy("cs_v2", "CS101")
+    v2.previous_version_id = "cs_v1"
+    v2.actions.allowed_actions = []
+
+    assert index.conflicts_for(v2) == []
+    assert index.add(v2) == []
+    assert index.conflicts() == [] and len(index) == 2
+
+
+def test_index_follows_deprecations(db):
+    overlap_index.invalidate()
+    store(db, course_policy("cs", "CS101"))
+    store(db, institution_policy("inst", "use_genai_brainstorm"))
+    overlap_index.ensure_loaded(db)
+    assert len(overlap_index.conflicts()) == 1
+
+    assert deprecate_policy("inst", db) and not deprecate_policy("inst", db)
+    assert overlap_index.conflicts() == [] and len(overlap_index) == 1
+
+    # Deprecated outside the app: dropped when the index is next reconciled
+    store(db, institution_policy("inst_2", "use_genai_brainstorm"))
+    overlap_index.ensure_loaded(db)
+    assert len(overlap_index.conflicts()) == 1
+    db.query(Policy).filter(Policy.policy_id == "cs").update({"deprecated_at": datetime.utcnow()})
+    db.commit()
+    overlap_index.ensure_loaded(db)
+    assert overlap_index.conflicts() == [] and len(overlap_index) == 1
+    overlap_index.invalidate()
+
+
+def test_replaced_versions_stay_out_of_the_index(db):
+    overlap_index.invalidate()
+    store(db, course_policy("p1", "CS101"))
+    p2 = institution_policy("p2", "use_genai_brainstorm")
+    p2.previous_version_id = "p1"
+    store(db, p2)
+
+    for _ in range(2):
+        overlap_index.ensure_loaded(db)
+        assert overlap_index.conflicts() == [] and len(overlap_index) == 1
+    overlap_index.invalidate()
+
+
+def test_detect_conflicts_reports_rule_contradictions():
+    new_policy = course_policy("new", "CS102")
+    new_policy.actions.allowed_actions.append(AllowedAction(
+        action="use_genai_cheat",
+        description="",
+        applies_to_roles=["student"],
+        applies_to_assessment_types=["project"],
+        applies_to_assessment_phases=["submission"],
+    ))
+    report = detect_conflicts(new_policy, [course_policy("cs", "CS101")], "CS102")
+    assert report.blocking == []
+    assert [c["action"] for c in report.non_blocking] == ["use_genai_cheat"]
+    assert report.non_blocking[0]["allowed_by"] == report.non_blocking[0]["prohibited_by"] == ["new"]
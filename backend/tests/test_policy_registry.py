@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from backend.models import Policy, GovernanceContext
+from backend.governance_middleware.registry import PolicyRegistry
+from backend.tests.helpers import make_policy, store
+
+
+def make_ctx(action):
+    return GovernanceContext(
+        course_id="CS101",
+        actor_role="student",
+        action=action,
+        assessment_type="project",
+        assessment_phase="submission",
+        actor_id_pseudonym="stu_x",
+    )
+
+
+def test_registry_caches_until_version_changes(db):
+    registry = PolicyRegistry()
+    assert registry.get("CS101", db) is None
+
+    store(db, make_policy("p1"))
+    compiled = registry.get("CS101", db)
+    assert compiled.decide(make_ctx("use_genai_cheat")).decision.value == "DENY"
+    assert registry.get("CS101", db) is compiled
+
+    # Publishing v2 and deprecating v1 swaps the compiled set
+    v2 = make_policy("p1_v2")
+    v2.version = "2.0.0"
+    v2.actions.prohibited_actions = []
+    store(db, v2)
+    db.query(Policy).filter(Policy.policy_id == "p1").update({"deprecated_at": datetime.utcnow()})
+    db.commit()
+
+    recompiled = registry.get("CS101", db)
+    assert recompiled is not compiled
+    assert recompiled.version == (("p1_v2", "2.0.0"),)
+    assert recompiled.decide(make_ctx("use_genai_cheat")).decision.value == "REQUIRE_JUSTIFICATION"
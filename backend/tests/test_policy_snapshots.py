@@ -0,0 +1,127 @@
+import json
+from itertools import product
+
+import pytest
+from sqlalchemy import event, text
+
+from backend.models import GovernanceContext, OverrideRule, Policy, RoleDefinition
+from backend.governance_middleware import enforcement
+from backend.governance_middleware.enforcement import compile_policy_rows, decide
+from backend.governance_middleware.registry import PolicyRegistry
+from backend.policy_compiler.snapshots import (
+    SNAPSHOT_FORMAT, build_snapshot, content_hash, pack_snapshot, refresh_snapshots, snapshot_columns
+)
+from backend.tests.helpers import make_policy, store
+
+
+def policies():
+    course_policy = make_policy("p1")
+    course_policy.scope.roles.append(RoleDefinition(role="ta", description="", condition="course_id = 'CS101'"))
+    override_policy = make_policy("p2")
+    override_policy.override_rules = [
+        OverrideRule(
+            override_id="o1",
+            description="",
+            condition="has_approved_accommodation('genai_use')",
+            effect="allow_all_actions",
+            requires_disclosure="email",
+        )
+    ]
+    return [course_policy, override_policy]
+
+
+def store_with_snapshot(db, policy):
+    db.add(Policy(
+        policy_id=policy.policy_id,
+        institution_id=policy.institution_id,
+        course_id=policy.course_id,
+        version=policy.version,
+        created_at=policy.created_at,
+        effective_from=policy.effective_from,
+        **snapshot_columns(policy),
+    ))
+    db.commit()
+
+
+@pytest.fixture
+def validations(monkeypatch):
+    """Count PolicyJSON validations done by the loader."""
+    calls = []
+    original = enforcement.PolicyJSON.model_validate
+
+    def counting(content, *args, **kwargs):
+        calls.append(content["policy_id"])
+        return original(content, *args, **kwargs)
+
+    monkeypatch.setattr(enforcement.PolicyJSON, "model_validate", counting)
+    return calls
+
+
+def test_snapshot_loads_decide_like_validated_policies(db, validations):
+    for policy in policies():
+        store_with_snapshot(db, policy)
+    compiled = compile_policy_rows(db.query(Policy).order_by(Policy.policy_id).all())
+    assert validations == []
+    assert compiled.version == tuple((p.policy_id, p.version) for p in policies())
+
+    for action, role, accommodations in product(
+        ["use_genai_brainstorm", "use_genai_cheat", "unknown_action"], ["student", "ta"], [[], ["genai_use"]]
+    ):
+        ctx = GovernanceContext(
+            course_id="CS101",
+            actor_role=role,
+            action=action,
+            assessment_type="project",
+            assessment_phase="submission",
+            actor_id_pseudonym="stu_x",
+            approved_accommodations=accommodations,
+        )
+        expected = decide(policies(), ctx).model_dump(exclude={"trace": {"timestamp"}})
+        assert compiled.decide(ctx).model_dump(exclude={"trace": {"timestamp"}}) == expected
+
+
+def test_stale_or_missing_snapshots_fall_back_to_validation(db, validations):
+    stale, corrupt, old_format, rehashed = make_policy("p1"), make_policy("p2"), make_policy("p3"), make_policy("p5")
+    for policy in (stale, corrupt, old_format, rehashed):
+        store_with_snapshot(db, policy)
+    store(db, make_policy("p4"))  # written before snapshots existed
+    rows = {row.policy_id: row for row in db.query(Policy)}
+
+    # Content edited behind the snapshot's back: the database clears content_hash
+    edited = dict(rows["p1"].content, version="9.9")
+    db.execute(text("UPDATE policies SET content = :content WHERE policy_id = 'p1'"), {"content": json.dumps(edited)})
+    rows["p2"].compiled_snapshot = b"\xc1not msgpack"
+    rows["p3"].compiled_snapshot = pack_snapshot(dict(build_snapshot(old_format), format=SNAPSHOT_FORMAT + 1))
+    # content_hash recomputed for new content, snapshot left as it was
+    rehashed_content = dict(rows["p5"].content, version="9.9")
+    rows["p5"].content = rehashed_content
+    rows["p5"].content_hash = content_hash(rehashed_content)
+    db.commit()
+
+    ordered = db.query(Policy).order_by(Policy.policy_id).all()
+    assert ordered[0].content_hash is None and ordered[0].compiled_snapshot is None
+    before = compile_policy_rows(ordered)
+    assert sorted(validations) == ["p1", "p2", "p3", "p4", "p5"]
+    assert dict(before.version)["p1"] == dict(before.version)["p5"] == "9.9"
+
+    assert refresh_snapshots(db, chunk_size=3) == 5
+    validations.clear()
+    after = compile_policy_rows(db.query(Policy).order_by(Policy.policy_id).all())
+    assert validations == []
+    assert after.version == before.version
+    assert after.content_hash == before.content_hash
+
+
+def test_registry_reads_content_only_for_rows_without_a_snapshot(db, validations):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    store_with_snapshot(db, make_policy("p1"))
+    store(db, make_policy("p2"))
+    db.expunge_all()
+    statements.clear()
+
+    compiled = PolicyRegistry().get("CS101", db)
+    assert validations == ["p2"]
+    assert [p for p, _ in compiled.version] == ["p1", "p2"]
+    reading_content = [s for s in statements if "policies.content," in s or "policies.content\n" in s]
+    assert len(reading_content) == 1 and "IN" in reading_content[0]
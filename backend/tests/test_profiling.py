@@ -0,0 +1,117 @@
+import pstats
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.config import Settings
+from backend.db import get_db
+from backend.governance_middleware.api import router
+from backend.tests.helpers import make_ctx, make_policy
+import profiling
+from profiling import DeterministicProfile, ProfilingMiddleware
+
+
+def profiled_client(session_factory, tmp_path, **config):
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_db] = override_get_db
+    settings = Settings(profiling_output_dir=str(tmp_path), profiling_interval_ms=0.2, **config)
+    app.add_middleware(ProfilingMiddleware, config=settings)
+    return TestClient(app)
+
+
+def evaluate_body():
+    return {"policies": [make_policy("p1").model_dump(mode="json")], "contexts": [make_ctx("use_genai_cheat")] * 50}
+
+
+def test_deterministic_profile_follows_worker_threads(session_factory, tmp_path):
+    client = profiled_client(session_factory, tmp_path, debug=True)
+    response = client.post("/api/v1/policy/evaluate/batch", json=evaluate_body(), headers={"X-Profile": "pstats"})
+
+    assert response.status_code == 200
+    name = response.headers["x-profile-file"]
+    assert name.endswith(".pstats")
+    functions = {func for _, _, func in pstats.Stats(str(tmp_path / name)).stats}
+    # _evaluate_batch runs through run_in_session in a worker thread
+    assert "_evaluate_batch" in functions and "evaluate" in functions
+
+
+def test_one_process_wide_profiler_is_not_doubled_in_worker_threads(monkeypatch):
+    # 3.12+: cProfile sits on sys.monitoring, so a second enabled profiler raises ValueError
+    monkeypatch.setattr(profiling, "_SHARED_PROFILER", True)
+    profile = DeterministicProfile()
+    profile._new = lambda: pytest.fail("a second cProfile profiler was created")
+    profile.start()
+    try:
+        assert profile.run(sum, [1, 2]) == 3
+    finally:
+        profile.stop()
+
+
+def test_pstats_falls_back_to_sampling_when_cprofile_is_taken(session_factory, tmp_path, monkeypatch):
+    def taken(self):
+        raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(DeterministicProfile, "start", taken)
+    client = profiled_client(session_factory, tmp_path, debug=True)
+    response = client.post("/api/v1/policy/evaluate/batch", json=evaluate_body(), headers={"X-Profile": "pstats"})
+
+    assert response.status_code == 200
+    name = response.headers["x-profile-file"]
+    assert name.endswith(".collapsed") and (tmp_path / name).exists()
+
+
+def test_profiles_implement_the_whole_interface():
+    class Partial(profiling._Profile):
+        def start(self):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_collapsed_profile(session_factory, tmp_path):
+    client = profiled_client(session_factory, tmp_path, debug=True)
+    response = client.post("/api/v1/policy/evaluate/batch", json=evaluate_body(), headers={"X-Profile": "collapsed"})
+
+    lines = (tmp_path / response.headers["x-profile-file"]).read_text().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and ";" in stack
+
+
+def test_profiles_need_debug_or_admin_token(session_factory, tmp_path):
+    client = profiled_client(session_factory, tmp_path, debug=False, profiling_admin_token="s3cret")
+
+    denied = client.get("/api/v1/policy/decision-cache", headers={"X-Profile": "pstats", "X-Admin-Token": "nope"})
+    assert denied.headers["x-profile-status"] == "unauthorized"
+    assert "x-profile-file" not in denied.headers
+    assert not list(tmp_path.iterdir())
+
+    allowed = client.get("/api/v1/policy/decision-cache", headers={"X-Profile": "pstats", "X-Admin-Token": "s3cret"})
+    assert (tmp_path / allowed.headers["x-profile-file"]).is_file()
+
+
+@pytest.mark.parametrize("rate, saved", [(1.0, 1), (0.0, 0)])
+def test_sampling(session_factory, tmp_path, rate, saved):
+    client = profiled_client(
+        session_factory, tmp_path, debug=False, profiling_sample_rate=rate, profiling_sample_paths="/api/v1/policy/evaluate"
+    )
+    client.post("/api/v1/policy/evaluate/batch", json=evaluate_body())
+    client.get("/api/v1/policy/decision-cache")  # not a sampled path
+
+    assert len(list(tmp_path.glob("*.collapsed"))) == saved
+
+
+def test_profiling_disabled_by_default_in_production():
+    assert not Settings(debug=False).profiling_enabled
+    assert Settings(debug=False, profiling_sample_rate=0.01).profiling_enabled
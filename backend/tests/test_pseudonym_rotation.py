@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from backend.config import settings
+from backend.transparency_ledger import AIUseLogORM, log_batch_to_transparency_ledger
+from backend.transparency_ledger.merkle import get_inclusion_proof
+from backend.transparency_ledger.pseudonyms import (
+    derive, epoch_for, epoch_start, pseudonym_history, rotate_pseudonyms
+)
+from backend.tests.helpers import make_policy, store
+
+SECRET = "test-secret"
+
+
+def entry(i, timestamp):
+    return {
+        "course_id": "CS101",
+        "actor_id_pseudonym": f"stu_{i % 3}",
+        "action": "use_genai_brainstorm",
+        "assessment_type": "project",
+        "policy_id": "p1",
+        "decision": "ALLOW",
+        "timestamp": timestamp,
+    }
+
+
+def test_derivation_chains_per_epoch():
+    assert epoch_for(epoch_start(4, 30), 30) == 4
+    assert epoch_for(epoch_start(4, 30) - timedelta(seconds=1), 30) == 3
+    history = pseudonym_history("stu_1", 3, SECRET)
+    assert history[0] == "stu_1" and len(set(history)) == 4
+    assert derive("stu_1", 0, 3, SECRET) == history[3] == derive(history[1], 1, 3, SECRET)
+    assert derive("stu_1", 0, 3, "other-secret") != history[3]
+
+
+def test_rotation_is_chunked_resumable_and_skips_current_epoch(session_factory):
+    db = session_factory()
+    now = epoch_start(5, 30) + timedelta(days=3)
+    old = epoch_start(2, 30)
+    log_batch_to_transparency_ledger([entry(i, old + timedelta(hours=i)) for i in range(10)], db)
+    log_batch_to_transparency_ledger([entry(0, now - timedelta(hours=1))], db)
+
+    # Interrupted after two chunks, then resumed
+    first = rotate_pseudonyms(db, SECRET, 30, now=now, chunk_size=3, max_chunks=2)
+    assert first.target_epoch == 5 and first.rows_rotated == 6 and not first.completed
+    second = rotate_pseudonyms(db, SECRET, 30, now=now, chunk_size=3)
+    assert second.rows_rotated == 4 and second.completed
+    assert rotate_pseudonyms(db, SECRET, 30, now=now).rows_rotated == 0
+
+    rotated = derive("stu_0", 0, 5, SECRET)
+    assert db.query(AIUseLogORM).filter(AIUseLogORM.actor_id_pseudonym == rotated).count() == 4
+    # Current-epoch rows keep their logged pseudonym until the epoch ends
+    assert db.query(AIUseLogORM).filter(AIUseLogORM.actor_id_pseudonym == "stu_0").count() == 1
+    assert db.query(AIUseLogORM).filter(AIUseLogORM.pseudonym_epoch == 5).count() == 10
+    db.close()
+
+
+def test_rotated_history_stays_visible_and_provable(client, session_factory):
+    db = session_factory()
+    log_batch_to_transparency_ledger([entry(i, datetime(2025, 2, 1) + timedelta(hours=i)) for i in range(6)], db)
+    rotate_pseudonyms(db, settings.secret_key, settings.pseudonym_rotation_days)
+    log = db.query(AIUseLogORM).filter(AIUseLogORM.leaf_index == 1).one()
+    assert log.pseudonym_epoch > 0 and log.actor_id_pseudonym != "stu_1"
+    db.close()
+
+    assert "You have 2 AI-use events" in client.get("/api/transparency/my-logs/stu_1").json()["summary"]
+    assert len(client.get("/api/transparency/my-logs/stu_1/events").json()["items"]) == 2
+
+    url = f"/api/v1/ledger/proof/{log.log_id}"
+    assert client.get(url).json()["row_matches"] is None
+    assert client.get(url, params={"pseudonym": "stu_1"}).json()["row_matches"] is True
+    assert client.get(url, params={"pseudonym": "stu_2"}).json()["row_matches"] is False
+
+
+def test_policies_can_opt_out_of_rotation(session_factory):
+    db = session_factory()
+    policy = make_policy("p1")
+    policy.logging.pseudonym_rotation = False
+    store(db, policy)
+    log_batch_to_transparency_ledger([entry(i, epoch_start(1, 30)) for i in range(3)], db)
+    report = rotate_pseudonyms(db, SECRET, 30, now=epoch_start(3, 30))
+    assert report.rows_rotated == 0 and report.completed
+    assert get_inclusion_proof(db, db.query(AIUseLogORM).first().log_id).row_matches
+    db.close()
@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import pytest
+
+from backend.models import AIUseLogORM, ProhibitedAction
+from backend.governance_middleware.decision_cache import decision_cache
+from backend.governance_middleware.replay import replay_policy
+from backend.tests.helpers import auth_headers, make_policy, store
+
+
+def log(db, action, decision, count, assessment_type="project", course_id="CS101"):
+    for i in range(count):
+        db.add(AIUseLogORM(
+            course_id=course_id,
+            actor_id_pseudonym=f"stu_{i}",
+            action=action,
+            assessment_type=assessment_type,
+            policy_id="p1",
+            decision=decision,
+            timestamp=datetime(2025, 1, 1),
+        ))
+    db.commit()
+
+
+def make_draft():
+    # Draft tightens brainstorming from ALLOW to DENY
+    draft = make_policy("p1")
+    draft.version = "2.0.0"
+    draft.actions.allowed_actions = []
+    draft.actions.prohibited_actions.append(ProhibitedAction(
+        action="use_genai_brainstorm",
+        description="",
+        applies_to_roles=["student"],
+        applies_to_assessment_types=["project"],
+        applies_to_assessment_phases=["submission"],
+    ))
+    return draft
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_replay_counts_changed_decisions(db, workers):
+    store(db, make_policy("p1"))
+    log(db, "use_genai_brainstorm", "ALLOW", 3)
+    log(db, "use_genai_cheat", "DENY", 2)
+
+    report = replay_policy(make_draft(), db, course_id="CS101", workers=workers, chunk_size=1)
+
+    assert report.total_events == 5
+    assert report.changed_events == 3
+    assert report.summary == {"ALLOW->DENY": 3}
+    first = report.transitions[0]
+    assert (first.action, first.old_decision, first.new_decision, first.count) == (
+        "use_genai_brainstorm", "ALLOW", "DENY", 3
+    )
+
+
+def test_replay_by_institution_and_requires_scope(db):
+    store(db, make_policy("p1"))
+    log(db, "use_genai_brainstorm", "ALLOW", 1)
+
+    report = replay_policy(make_draft(), db, institution_id="inst-1", workers=1)
+    assert report.changed_events == 1
+    assert replay_policy(make_draft(), db, institution_id="other", workers=1).total_events == 0
+
+    with pytest.raises(ValueError):
+        replay_policy(make_draft(), db)
+
+
+def test_institution_replay_of_a_course_draft_skips_other_courses(db):
+    store(db, make_policy("p1"))
+    other = make_policy("p2")
+    other.course_id = other.scope.course_id = "CS202"
+    store(db, other)
+    log(db, "use_genai_brainstorm", "ALLOW", 2)
+    log(db, "use_genai_brainstorm", "ALLOW", 1, course_id="CS202")
+
+    report = replay_policy(make_policy("p1"), db, institution_id="inst-1", workers=1)
+    assert (report.course_id, report.total_events, report.summary) == ("CS101", 2, {})
+
+    with pytest.raises(ValueError):
+        replay_policy(make_policy("p1"), db, course_id="CS202", workers=1)
+
+
+def test_in_process_replay_leaves_the_shared_decision_cache_alone(db):
+    store(db, make_policy("p1"))
+    log(db, "use_genai_brainstorm", "ALLOW", 1)
+    decision_cache.invalidate()
+
+    assert replay_policy(make_draft(), db, course_id="CS101", workers=1).changed_events == 1
+    assert len(decision_cache) == 0
+
+
+def test_replay_route_is_admin_only(client, session_factory):
+    db = session_factory()
+    store(db, make_policy("p1"))
+    log(db, "use_genai_brainstorm", "ALLOW", 1)
+    db.close()
+    url, body = "/api/v1/policy/replay?course_id=CS101", make_draft().model_dump(mode="json")
+
+    assert client.post(url, json=body).status_code == 403
+    assert client.post(url, json=body, headers=auth_headers("faculty")).status_code == 403
+    resp = client.post(url, json=body, headers=auth_headers())
+    assert resp.status_code == 200 and resp.json()["summary"] == {"ALLOW->DENY": 1}
@@ -0,0 +1,134 @@
+import io
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from backend.transparency_ledger import AIUseLogORM, log_batch_to_transparency_ledger, log_to_transparency_ledger
+from backend.transparency_ledger.ingest import ingest_ledger
+from backend.transparency_ledger.retention import (
+    DEFAULT_PARTITION, create_partition_sql, ensure_partitions, partition_bounds, partition_name,
+    partitions_to_sweep, run_retention, sweep_expired_rows
+)
+
+
+def entry(timestamp, pseudonym="stu_1"):
+    return {
+        "course_id": "CS101",
+        "actor_id_pseudonym": pseudonym,
+        "action": "use_genai_brainstorm",
+        "assessment_type": "project",
+        "policy_id": "p1",
+        "decision": "ALLOW",
+        "timestamp": timestamp,
+    }
+
+
+def test_written_rows_follow_the_configured_retention(session_factory, monkeypatch):
+    from backend.transparency_ledger import settings
+
+    monkeypatch.setattr(settings, "log_retention_days", 30)
+    db = session_factory()
+    now = datetime(2026, 6, 1)
+    log_batch_to_transparency_ledger([entry(now - timedelta(days=40))], db)
+    log_to_transparency_ledger("stu_2", "use_genai_brainstorm", "project", "p1", "ALLOW", "CS101", db)
+    record = {**entry("2026-05-01T00:00:00"), "actor_id_pseudonym": "stu_3"}
+    ingest_ledger(io.StringIO(json.dumps(record)), "ndjson", db, validate_policies=False)
+
+    rows = db.query(AIUseLogORM).all()
+    assert len(rows) == 3 and {(log.retention_until - log.timestamp).days for log in rows} == {30}
+    # A 30-day setting sweeps what a fixed 90 days would have kept
+    assert run_retention(db, 30, now=now, chunk_size=10, pause_seconds=0)["deleted_rows"] == 2
+    db.close()
+
+
+def test_sweeper_deletes_expired_rows_in_chunks(session_factory):
+    db = session_factory()
+    now = datetime(2026, 6, 1)
+    log_batch_to_transparency_ledger([entry(now - timedelta(days=100 + i)) for i in range(7)], db)
+    log_batch_to_transparency_ledger([entry(now - timedelta(days=10))], db)
+    # Rows without retention_until fall back to retention_days on timestamp
+    db.add(AIUseLogORM(course_id="CS101", actor_id_pseudonym="stu_2", action="a", assessment_type="project",
+                       policy_id="p1", decision="ALLOW", timestamp=now - timedelta(days=91)))
+    db.commit()
+
+    assert sweep_expired_rows(db, 90, now=now, chunk_size=3, pause_seconds=0, max_chunks=1) == 3
+    assert run_retention(db, 90, now=now, chunk_size=3, pause_seconds=0) == {
+        "mode": "chunked_delete", "deleted_rows": 5
+    }
+    assert [log.timestamp for log in db.query(AIUseLogORM)] == [now - timedelta(days=10)]
+    db.close()
+
+
+def test_monthly_partition_naming():
+    start = datetime(2026, 12, 1)
+    assert partition_name(start) == "ai_use_logs_2026_12"
+    assert partition_bounds("ai_use_logs_2026_12") == (start, datetime(2027, 1, 1))
+    assert partition_bounds("ai_use_logs_default") is None
+    assert create_partition_sql(start).endswith("FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')")
+
+
+def test_orm_primary_key_matches_partitioned_table():
+    assert list(AIUseLogORM.__table__.primary_key.columns.keys()) == ["log_id", "timestamp"]
+
+
+def test_sweeper_can_target_one_partition(session_factory):
+    db = session_factory()
+    now = datetime(2026, 6, 1)
+    log_batch_to_transparency_ledger([entry(now - timedelta(days=100)) for _ in range(2)], db)
+    db.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} AS SELECT * FROM ai_use_logs"))
+    db.commit()
+
+    # Only the named table is swept; the parent's expired rows stay
+    assert sweep_expired_rows(db, 90, now=now, pause_seconds=0, partition=DEFAULT_PARTITION) == 2
+    assert db.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}")).scalar() == 0
+    assert db.query(AIUseLogORM).count() == 2
+    db.close()
+
+
+class _PartitionCatalog:
+    """Records statements; answers the catalog and default-partition probes of retention.py."""
+
+    def __init__(self, partitions, stranded_months=()):
+        self.partitions = partitions
+        self.stranded_months = stranded_months
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        if sql.startswith("SELECT c.relname"):
+            return [(name,) for name in self.partitions]
+        if sql.startswith(f"SELECT 1 FROM {DEFAULT_PARTITION}"):
+            return _First(params["start"] in self.stranded_months)
+        return None
+
+
+class _First:
+    def __init__(self, found):
+        self.found = found
+
+    def first(self):
+        return (1,) if self.found else None
+
+
+def test_partition_for_rows_stranded_in_default_is_attached_after_moving_them():
+    db = _PartitionCatalog(["ai_use_logs_2026_05", DEFAULT_PARTITION], stranded_months=[datetime(2026, 6, 1)])
+    created = ensure_partitions(db, now=datetime(2026, 5, 20), months_ahead=2)
+    assert created == ["ai_use_logs_2026_06", "ai_use_logs_2026_07"]
+
+    ddl = [s for s in db.statements if not s.startswith("SELECT")]
+    assert ddl[0] == "CREATE TABLE ai_use_logs_2026_06 (LIKE ai_use_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    assert ddl[1].startswith(f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE timestamp >= '2026-06-01'")
+    assert ddl[2] == (
+        "ALTER TABLE ai_use_logs ATTACH PARTITION ai_use_logs_2026_06 FOR VALUES FROM ('2026-06-01') TO ('2026-07-01')"
+    )
+    assert ddl[3] == create_partition_sql(datetime(2026, 7, 1))
+
+
+def test_partitions_to_sweep_are_those_reaching_past_the_cutoff():
+    db = _PartitionCatalog(["ai_use_logs_2026_01", "ai_use_logs_2026_03", "ai_use_logs_2026_06", DEFAULT_PARTITION])
+    # Cutoff 2026-03-03: January was kept for a later retention_until, March spans the cutoff
+    assert partitions_to_sweep(db, 90, now=datetime(2026, 6, 1)) == [
+        "ai_use_logs_2026_01", "ai_use_logs_2026_03", DEFAULT_PARTITION
+    ]
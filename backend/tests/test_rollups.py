@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+from backend.transparency_ledger import (
+    AIUseLogORM, get_course_analytics, log_batch_to_transparency_ledger, log_to_transparency_ledger
+)
+from backend.transparency_ledger.hll import HyperLogLog
+from backend.transparency_ledger.merkle import seal_pending
+from backend.transparency_ledger.rollups import AIUseRollupORM, rebuild_rollups, update_rollups
+
+
+def entry(pseudonym, action="use_genai_brainstorm", **overrides):
+    return {
+        "course_id": "CS101",
+        "actor_id_pseudonym": pseudonym,
+        "action": action,
+        "assessment_type": "project",
+        "policy_id": "p1",
+        "decision": "ALLOW",
+        **overrides,
+    }
+
+
+def test_hyperloglog_estimates_and_merges():
+    a = HyperLogLog().update(f"stu_{i}" for i in range(20000))
+    b = HyperLogLog().update(f"stu_{i}" for i in range(10000, 30000))
+    assert abs(a.count() - 20000) < 20000 * 0.05
+    assert abs(HyperLogLog(a.to_bytes()).merge(b).count() - 30000) < 30000 * 0.05
+    assert HyperLogLog().update(["x", "y", "x"]).count() == 2
+
+
+def test_analytics_read_rollups_folded_when_sealed(session_factory):
+    db = session_factory()
+    log_batch_to_transparency_ledger([entry(f"stu_{i % 3}") for i in range(6)], db, seal=True)
+    log_to_transparency_ledger(db=db, **entry("stu_9", action="use_genai_cheat", decision="DENY"))
+    old = datetime.utcnow() - timedelta(days=30)
+    log_batch_to_transparency_ledger([entry("stu_old", timestamp=old)], db)
+    # Decisions are not folded in their own transaction, only when sealed
+    assert get_course_analytics("CS101", db).total_events == 6
+    assert seal_pending(db) == 2
+
+    analytics = get_course_analytics("CS101", db)
+    assert analytics.total_events == 7
+    assert analytics.total_unique_students == 4
+    by_action = {a["action"]: a for a in analytics.by_action}
+    assert by_action["use_genai_brainstorm"]["total_events"] == 6
+    assert by_action["use_genai_brainstorm"]["unique_students"] == 3
+    assert by_action["use_genai_cheat"]["unique_students"] == 1
+
+    # Raw logs are no longer read: analytics only see rollups
+    db.query(AIUseLogORM).delete()
+    db.commit()
+    assert get_course_analytics("CS101", db).total_events == 7
+    db.close()
+
+
+def test_rebuild_rollups_from_raw_logs(session_factory):
+    db = session_factory()
+    now = datetime.utcnow()
+    for i in range(5):
+        db.add(AIUseLogORM(course_id="CS101", actor_id_pseudonym=f"stu_{i}", action="use_genai_brainstorm",
+                           assessment_type="project", policy_id="p1", decision="ALLOW",
+                           timestamp=now - timedelta(hours=i)))
+    db.commit()
+    seal_pending(db)
+    db.query(AIUseRollupORM).delete()
+    db.commit()
+
+    assert rebuild_rollups(db, chunk_size=2) == 5
+    assert db.query(AIUseRollupORM).count() == 5
+    analytics = get_course_analytics("CS101", db)
+    assert (analytics.total_events, analytics.total_unique_students) == (5, 5)
+    db.close()
+
+
+def test_upsert_adds_to_rows_other_writers_created(session_factory):
+    db = session_factory()
+    now = datetime.utcnow()
+    update_rollups(db, [("CS101", "use_genai_brainstorm", "project", f"stu_{i}", now) for i in range(3)])
+    db.commit()
+
+    # Same key from a second writer: no primary-key violation, counts and sketches combine
+    other = session_factory()
+    assert update_rollups(other, [("CS101", "use_genai_brainstorm", "project", "stu_9", now + timedelta(seconds=1))]) == 1
+    other.commit()
+    row = other.query(AIUseRollupORM).one()
+    assert row.event_count == 4 and row.last_event == now + timedelta(seconds=1)
+    assert HyperLogLog.from_bytes(row.student_sketch).count() == 4
+    other.close()
+    db.close()
+
+
+def test_rebuild_leaves_pending_rows_to_the_sealer(session_factory):
+    db = session_factory()
+    log_batch_to_transparency_ledger([entry("stu_1")], db, seal=True)
+    log_to_transparency_ledger(db=db, **entry("stu_2"))
+    assert rebuild_rollups(db) == 1
+    seal_pending(db)
+    assert get_course_analytics("CS101", db).total_events == 2
+    db.close()
@@ -0,0 +1,57 @@
+import json
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.models import GovernanceContext, TraceLevel
+from backend.governance_middleware.enforcement import compile_policies
+from backend.governance_middleware.serialization import dumps
+from backend.transparency_ledger import get_student_log_page, log_batch_to_transparency_ledger
+from backend.tests.helpers import entry, make_policy
+
+
+def test_dumps_matches_default_encoding(session_factory):
+    ctx = GovernanceContext(
+        course_id="CS101",
+        actor_role="student",
+        action="use_genai_brainstorm",
+        assessment_type="project",
+        assessment_phase="submission",
+        actor_id_pseudonym="stu_x",
+    )
+    decision = compile_policies([make_policy("p1")]).decide(ctx, TraceLevel.FULL)
+    assert json.loads(dumps(decision)) == jsonable_encoder(decision)
+
+    db = session_factory()
+    log_batch_to_transparency_ledger([entry("use_genai_brainstorm", datetime(2025, 3, 1, 12, 0, 0, 250))], db)
+    page = get_student_log_page("stu_1", None, db)
+    assert json.loads(dumps(page)) == jsonable_encoder(page)
+    assert json.loads(dumps({"tags": frozenset(["a"])})) == {"tags": ["a"]}
+    db.close()
+
+
+def test_history_and_analytics_stream_as_ndjson(client, session_factory):
+    from backend.governance_middleware.api import analytics_cache
+
+    db = session_factory()
+    now = datetime.utcnow()
+    log_batch_to_transparency_ledger(
+        [entry("use_genai_brainstorm", now - timedelta(hours=i)) for i in range(7)]
+        + [entry("use_genai_cheat", now - timedelta(hours=1))],
+        db,
+        seal=True
+    )
+    db.close()
+
+    response = client.get("/api/transparency/my-logs/stu_1/events", params={"format": "ndjson", "limit": 3})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert len(events) == 8  # three keyset pages, one stream
+    assert [e["timestamp"] for e in events] == sorted((e["timestamp"] for e in events), reverse=True)
+
+    analytics_cache.invalidate()
+    rows = client.get("/api/transparency/course-analytics/CS101", params={"format": "ndjson"}).text.splitlines()
+    assert sorted(json.loads(row)["action"] for row in rows) == ["use_genai_brainstorm", "use_genai_cheat"]
+
+    assert client.get("/api/transparency/my-logs/stu_1/events", params={"format": "xml"}).status_code == 400
+    assert client.get("/api/transparency/my-logs/stu_1/events", params={"format": "ndjson", "cursor": "bad"}).status_code == 400
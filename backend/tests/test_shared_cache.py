@@ -0,0 +1,135 @@
+import time
+
+import pytest
+import redis
+
+from backend.governance_middleware.decision_cache import DecisionCache
+from backend.governance_middleware.registry import PolicyRegistry
+from backend.governance_middleware.shared_cache import RedisTier
+from backend.models import OverrideRule, RoleDefinition
+from backend.tests.helpers import make_policy, store
+from backend.governance_middleware.core import DecisionContext
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def worker_tier(server, namespace):
+    """One uvicorn worker's view of the shared Redis."""
+    return RedisTier(namespace, fakeredis.FakeRedis(server=server), ttl_seconds=60)
+
+
+def eventually(check, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not check():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_worker_reuses_values_computed_by_another(server):
+    a = DecisionCache(maxsize=10, ttl_seconds=60, l2=worker_tier(server, "analytics"))
+    b = DecisionCache(maxsize=10, ttl_seconds=60, l2=worker_tier(server, "analytics"))
+    a.put("hash1", ("CS101", "student"), {"decision": "ALLOW"})
+
+    assert b.get("hash1", ("CS101", "student")) == {"decision": "ALLOW"}
+    assert b.stats()["l2"]["hits"] == 1
+    # Now held in b's L1: no second round trip
+    assert b.get("hash1", ("CS101", "student")) == {"decision": "ALLOW"}
+    assert b.stats()["l2"]["hits"] == 1
+    assert b.get("hash2", ("CS101", "student")) is None
+    for cache in (a, b):
+        cache.l2.close()
+
+
+def test_bump_is_broadcast_to_other_workers(server):
+    a = DecisionCache(maxsize=10, ttl_seconds=60, l2=worker_tier(server, "analytics"))
+    b = DecisionCache(maxsize=10, ttl_seconds=60, l2=worker_tier(server, "analytics"))
+    a.put("CS101", "last_7_days", "old")
+    a.put("CS202", "last_7_days", "other")
+    assert b.get("CS101", "last_7_days") == "old"
+
+    a.bump("CS101")
+    assert eventually(lambda: len(b) == 0)
+    assert a.get("CS101", "last_7_days") is None
+    assert b.get("CS202", "last_7_days") == "other"
+
+    b.bump()
+    assert eventually(lambda: a.get("CS202", "last_7_days") is None)
+    for cache in (a, b):
+        cache.l2.close()
+
+
+def test_registry_shares_compilations_and_invalidations(server, db):
+    store(db, make_policy("p1"))
+    a = PolicyRegistry(l2=worker_tier(server, "policies"))
+    b = PolicyRegistry(l2=worker_tier(server, "policies"))
+
+    compiled = a.get("CS101", db)
+    shared = b.get("CS101", db)
+    assert shared is not compiled and shared.content_hash == compiled.content_hash
+    assert b.l2.stats()["hits"] == 1
+
+    a.invalidate("CS101")
+    assert eventually(lambda: "CS101" not in b._compiled)
+    b.get("CS101", db)
+    assert b.l2.stats()["misses"] == 1  # the bumped version is a fresh key
+    for registry in (a, b):
+        registry.l2.close()
+
+
+def test_unreachable_redis_degrades_to_local_cache():
+    down = redis.Redis(host="127.0.0.1", port=1, socket_connect_timeout=0.05, socket_timeout=0.05)
+    cache = DecisionCache(maxsize=10, ttl_seconds=60, l2=RedisTier("analytics", down))
+    cache.put("hash1", "key", "value")
+    assert cache.get("hash1", "key") == "value"
+    assert cache.get("hash1", "other") is None
+    # subscribe, put and get failed in a row: Redis is skipped for backoff_seconds
+    # instead of paying the socket timeout on every miss
+    assert cache.stats()["l2"]["errors"] == 3
+    cache.bump("hash1")
+    assert cache.stats()["l2"]["skipped"] == 1
+    started = time.monotonic()
+    for i in range(20):
+        assert cache.get("hash1", i) is None
+    assert time.monotonic() - started < 0.05
+    assert cache.stats()["l2"]["errors"] == 3 and cache.stats()["l2"]["skipped"] == 21
+
+    cache.l2._retry_at = time.monotonic() - 1  # backoff over: one probe, failing again re-opens
+    cache.get("hash1", "probe")
+    cache.get("hash1", "probe")
+    assert cache.stats()["l2"]["errors"] == 4 and cache.stats()["l2"]["skipped"] == 22
+
+
+def test_registry_shares_policies_with_conditions(server, db):
+    # Compiled conditions are closures; the L2 carries snapshots and recompiles them
+    policy = make_policy("p1")
+    policy.scope.roles.append(RoleDefinition(role="ta", description="", condition="assessment_type = 'project'"))
+    policy.override_rules = [
+        OverrideRule(override_id="o1", description="", condition="has_approved_accommodation('genai_use')",
+                     effect="allow_all_actions")
+    ]
+    store(db, policy)
+    a = PolicyRegistry(l2=worker_tier(server, "policies"))
+    b = PolicyRegistry(l2=worker_tier(server, "policies"))
+
+    compiled = a.get("CS101", db)
+    assert a.l2.stats()["errors"] == 0
+    shared = b.get("CS101", db)
+    assert b.l2.stats()["hits"] == 1
+    ctx = DecisionContext("CS101", "student", "use_genai_cheat", "project", "submission", "stu_x", ["genai_use"])
+    assert shared.evaluate(ctx).decision == compiled.evaluate(ctx).decision
+
+
+def test_unpicklable_values_and_corrupt_entries_are_misses(server):
+    tier = worker_tier(server, "analytics")
+    tier.put("h", "k", lambda: None)
+    assert tier.get("h", "k") is None
+    tier.client.set(tier._key("h", "k"), b"not a pickle")
+    assert tier.get("h", "k") is None
+    assert tier.stats()["errors"] == 2
@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from backend.config import Settings
+from backend.db import apply_pragmas, read_only_url, sqlite_pragmas
+
+
+def test_profile_settings():
+    tuned = Settings(sqlite_profile="throughput", database_url="sqlite:///gov.db")
+    assert tuned.sqlite_throughput and tuned.ledger_write_behind_active
+    assert not Settings(sqlite_profile="throughput", database_url="postgresql://u:p@db/gov").sqlite_throughput
+    assert not Settings(database_url="sqlite:///gov.db").ledger_write_behind_active
+
+
+def test_read_only_url():
+    assert read_only_url("sqlite:///gov.db") == "sqlite:///file:gov.db?mode=ro&uri=true"
+    assert read_only_url("sqlite://") is None
+    assert read_only_url("postgresql://u:p@db/gov") is None
+
+
+def test_readers_do_not_block_the_writer(tmp_path):
+    path = tmp_path / "gov.db"
+    writer = create_engine(f"sqlite:///{path}")
+    apply_pragmas(writer, sqlite_pragmas())
+    reader = create_engine(read_only_url(f"sqlite:///{path}"))
+    apply_pragmas(reader, sqlite_pragmas(read_only=True))
+
+    with writer.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        conn.execute(text("CREATE TABLE logs (id INTEGER)"))
+        conn.execute(text("INSERT INTO logs VALUES (1)"))
+        conn.commit()
+
+    with reader.connect() as read_conn, writer.connect() as write_conn:
+        # An open read transaction (snapshot) ...
+        read_conn.execute(text("BEGIN"))
+        assert read_conn.execute(text("SELECT count(*) FROM logs")).scalar() == 1
+        # ... does not stop a concurrent commit, and keeps its snapshot
+        write_conn.execute(text("INSERT INTO logs VALUES (2)"))
+        write_conn.commit()
+        assert read_conn.execute(text("SELECT count(*) FROM logs")).scalar() == 1
+        read_conn.rollback()
+        assert read_conn.execute(text("SELECT count(*) FROM logs")).scalar() == 2
+
+        with pytest.raises(exc.OperationalError):
+            read_conn.execute(text("INSERT INTO logs VALUES (3)"))
+    writer.dispose()
+    reader.dispose()
@@ -0,0 +1,73 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.scripts.import_report import parse_importtime, summarise
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def test_main_mounts_governance_router():
+    from backend.main import app
+
+    paths = {route.path for route in app.routes}
+    assert "/health" in paths
+    assert "/api/v1/policy/evaluate" in paths
+    assert TestClient(app).get("/api/v1/policy/decision-cache").status_code == 200
+
+
+def test_lifespan_runs_the_sealer_and_drains_the_ledger_on_shutdown(monkeypatch):
+    from backend import main
+
+    calls = []
+
+    class Recorder:
+        def __init__(self, name):
+            self.name = name
+
+        def start(self):
+            calls.append(f"{self.name}.start")
+
+        def stop(self, timeout=None):
+            calls.append(f"{self.name}.stop")
+
+    monkeypatch.setattr(main.governance_api, "ledger_writer", Recorder("writer"))
+    monkeypatch.setattr(main.governance_api, "ledger_sealer", Recorder("sealer"))
+    with TestClient(main.app) as client:
+        assert client.get("/health").status_code == 200
+        assert calls == ["sealer.start"]
+    assert calls == ["sealer.start", "writer.stop", "sealer.stop"]
+
+
+def test_main_import_leaves_deferred_subsystems_unloaded():
+    # Fresh interpreter from backend/, as uvicorn main:app runs in the container
+    probe = "import json, sys, main; print(json.dumps(sorted(sys.modules)))"
+    out = subprocess.run(
+        [sys.executable, "-c", probe], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        env={"PATH": "", "SHARED_CACHE_ENABLED": "false"}
+    ).stdout
+    loaded = set(json.loads(out.splitlines()[-1]))
+
+    assert "backend.governance_middleware.api" in loaded
+    for deferred in ("rag_copilot", "governance_middleware.replay", "transparency_ledger.ingest"):
+        assert not any(name.endswith(deferred) for name in loaded), deferred
+    assert "redis" not in loaded
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     json.decoder\n"
+        "import time:       300 |        420 |   json\n"
+        "import time:        50 |        470 | main\n"
+    )
+    rows = parse_importtime(stderr)
+
+    assert [(r["module"], r["depth"]) for r in rows] == [("json.decoder", 2), ("json", 1), ("main", 0)]
+    report = summarise(rows, top=2)
+    assert report["total_ms"] == 0.5
+    assert [r["module"] for r in report["by_cumulative"]] == ["main", "json"]
+    assert report["by_package_ms"] == {"json": 0.4, "main": 0.1}
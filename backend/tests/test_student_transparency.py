@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from backend.transparency_ledger import (
+    get_student_log_page, get_student_transparency_logs, log_batch_to_transparency_ledger
+)
+from backend.tests.helpers import entry
+
+
+def test_aggregates_are_grouped_in_sql_with_latest_event(session_factory):
+    db = session_factory()
+    t0 = datetime(2025, 3, 1, 12)
+    # Inserted out of time order: the last event must not depend on row order
+    log_batch_to_transparency_ledger([
+        entry("use_genai_brainstorm", t0 + timedelta(days=2), policy_id="p2"),
+        entry("use_genai_brainstorm", t0),
+        entry("use_genai_cheat", t0 + timedelta(days=5)),
+        entry("use_genai_brainstorm", t0 + timedelta(days=1)),
+        entry("use_genai_brainstorm", t0 + timedelta(days=9), pseudonym="stu_2"),
+    ], db)
+
+    view = get_student_transparency_logs("stu_1", None, db)
+    assert view.summary == "You have 4 AI-use events logged (last event: 2025-03-06)"
+    brainstorm = next(a for a in view.aggregates if a.action == "use_genai_brainstorm")
+    assert brainstorm.count == 3
+    assert brainstorm.last_event_timestamp == t0 + timedelta(days=2)
+    assert brainstorm.policy_id == "p2"
+    assert get_student_transparency_logs("stu_1", "OTHER", db).aggregates == []
+    db.close()
+
+
+def test_keyset_pagination_walks_history_newest_first(client, session_factory):
+    db = session_factory()
+    t0 = datetime(2025, 3, 1, 12)
+    # Duplicate timestamps exercise the log_id tie-breaker
+    log_batch_to_transparency_ledger(
+        [entry("use_genai_brainstorm", t0 + timedelta(hours=i // 2)) for i in range(7)], db
+    )
+
+    seen, cursor = [], None
+    while True:
+        page = get_student_log_page("stu_1", None, db, limit=3, cursor=cursor)
+        seen.extend(page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert len(seen) == 7 and len({item.log_id for item in seen}) == 7
+    assert [item.timestamp for item in seen] == sorted((item.timestamp for item in seen), reverse=True)
+    db.close()
+
+    resp = client.get("/api/transparency/my-logs/stu_1/events", params={"limit": 5})
+    assert resp.status_code == 200 and len(resp.json()["items"]) == 5
+    assert client.get("/api/transparency/my-logs/stu_1/events", params={"cursor": "bogus"}).status_code == 400
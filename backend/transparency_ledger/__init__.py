@@ -1,13 +1,34 @@
 """
 Transparency Ledger Module
 Metadata-only logging and privacy-preserving analytics
+(rows are sealed into hash-chained Merkle batches shortly after they are written,
+see merkle.py, and folded into the rollups course analytics read, see rollups.py;
+commit and query latencies are recorded in the metrics registry)
 """
 
-from models import AIUseLog, StudentTransparencyView, CourseAnalytics, AIUseLogORM, AggregatedMetrics
+from models import (
+    AIUseLog, StudentTransparencyView, CourseAnalytics, AIUseLogORM, AggregatedMetrics, StudentLogPage
+)
+import base64
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Any, Optional, List, Dict, Sequence, Tuple, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, func, insert, or_, select
+from sqlalchemy.orm import aliased
+
+from .hll import HyperLogLog
+from .merkle import seal_rows
+from .rollups import read_rollups, update_rollups
+from config import settings
+from metrics import registry as metrics
+
+COMMIT_SECONDS = metrics.histogram(
+    "ledger_commit_seconds", "Sealing, inserting and committing ledger rows, per transaction", ("mode",)
+)
+ENTRIES_WRITTEN = metrics.counter("ledger_entries_written_total", "AI-use log rows committed to the ledger")
+QUERY_SECONDS = metrics.histogram("ledger_query_seconds", "Transparency and analytics reads", ("query",))
 
 
 def log_to_transparency_ledger(
@@ -21,11 +42,25 @@ def log_to_transparency_ledger(
 ) -> AIUseLogORM:
     """
     Append-only log of AI use (metadata only, no PII).
+    The row is written unsealed; merkle.seal_pending() seals it with its neighbours
+    and folds it into the analytics rollups.
     """
-    now = datetime.utcnow()
-    retention_until = now + timedelta(days=90)
+    started = time.perf_counter()
+    log = _log_row(actor_id_pseudonym, action, assessment_type, policy_id, decision, course_id)
+    db.add(log)
+    db.commit()
+    COMMIT_SECONDS.labels(mode="single").observe(time.perf_counter() - started)
+    ENTRIES_WRITTEN.inc()
+    db.refresh(log)
+    return log
+
 
-    log = AIUseLogORM(
+def _log_row(
+    actor_id_pseudonym: str, action: str, assessment_type: str, policy_id: str, decision: str, course_id: str
+) -> AIUseLogORM:
+    now = datetime.utcnow()
+    return AIUseLogORM(
+        log_id=uuid.uuid4(),
         course_id=course_id,
         actor_id_pseudonym=actor_id_pseudonym,
         action=action,
@@ -33,66 +68,225 @@ def log_to_transparency_ledger(
         policy_id=policy_id,
         decision=decision,
         timestamp=now,
-        retention_until=retention_until
+        retention_until=_retention_until(now)
     )
-    db.add(log)
-    db.commit()
-    db.refresh(log)
-    return log
+
+
+def _retention_until(timestamp: datetime) -> datetime:
+    """When a row logged at timestamp may be swept (settings.log_retention_days)."""
+    return timestamp + timedelta(days=settings.log_retention_days)
+
+
+def log_batch_to_transparency_ledger(
+    entries: List[Dict[str, Any]],
+    db: Session,
+    seal: bool = False
+) -> int:
+    """
+    Append many AI-use logs with one bulk insert and one commit.
+    Each entry holds the log_to_transparency_ledger() fields (without db), plus an
+    optional "timestamp" for records captured earlier (e.g. by the write-behind queue).
+    With seal, the rows are sealed as one batch and folded into the rollups in the
+    same transaction (background writers); otherwise both are left to merkle.seal_pending().
+    """
+    if not entries:
+        return 0
+
+    started = time.perf_counter()
+    rows = _batch_rows(entries)
+    try:
+        if seal:
+            batch_id = seal_rows(db, [
+                (r["log_id"], r["course_id"], r["actor_id_pseudonym"], r["action"], r["assessment_type"],
+                 r["policy_id"], r["decision"], r["timestamp"])
+                for r in rows
+            ])
+            for leaf_index, r in enumerate(rows):
+                r["batch_id"] = batch_id
+                r["leaf_index"] = leaf_index
+            update_rollups(db, (
+                (r["course_id"], r["action"], r["assessment_type"], r["actor_id_pseudonym"], r["timestamp"])
+                for r in rows
+            ))
+        db.execute(insert(AIUseLogORM), rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    COMMIT_SECONDS.labels(mode="batch").observe(time.perf_counter() - started)
+    ENTRIES_WRITTEN.inc(len(rows))
+    return len(rows)
+
+
+def _batch_rows(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    now = datetime.utcnow()
+    rows = []
+    for e in entries:
+        timestamp = e.get("timestamp") or now
+        rows.append({
+            "log_id": uuid.uuid4(),
+            "course_id": e["course_id"],
+            "actor_id_pseudonym": e["actor_id_pseudonym"],
+            "action": e["action"],
+            "assessment_type": e["assessment_type"],
+            "policy_id": e["policy_id"],
+            "decision": e["decision"],
+            "timestamp": timestamp,
+            "retention_until": _retention_until(timestamp)
+        })
+    return rows
+
+
+def _pseudonym_filter(column, actor_id_pseudonym: Union[str, Sequence[str]]):
+    """Match one pseudonym, or any of its rotated forms (see pseudonyms.pseudonym_history)."""
+    if isinstance(actor_id_pseudonym, str):
+        return column == actor_id_pseudonym
+    return column.in_(list(actor_id_pseudonym))
 
 
 def get_student_transparency_logs(
-    actor_id_pseudonym: str,
+    actor_id_pseudonym: Union[str, Sequence[str]],
     course_id: Optional[str],
     db: Session
 ) -> StudentTransparencyView:
     """
     Fetch aggregated, anonymized AI-use logs for student.
+    Aggregated in SQL (GROUP BY action, assessment_type over idx_student_time);
+    each group's policy_id is that of its latest event.
     """
-    query = db.query(AIUseLogORM).filter(
-        AIUseLogORM.actor_id_pseudonym == actor_id_pseudonym
-    )
-    if course_id:
-        query = query.filter(AIUseLogORM.course_id == course_id)
+    started = time.perf_counter()
+    rows = db.execute(_student_summary_statement(actor_id_pseudonym, course_id)).all()
+    view = _student_view(rows)
+    QUERY_SECONDS.labels(query="student_summary").observe(time.perf_counter() - started)
+    return view
 
-    logs = query.all()
+
+def _student_summary_statement(actor_id_pseudonym: Union[str, Sequence[str]], course_id: Optional[str]):
+    filters = [_pseudonym_filter(AIUseLogORM.actor_id_pseudonym, actor_id_pseudonym)]
+    if course_id:
+        filters.append(AIUseLogORM.course_id == course_id)
 
     # Aggregate by action and assessment type
-    aggregates = []
-    action_groups = {}
-    for log in logs:
-        key = (log.action, log.assessment_type)
-        if key not in action_groups:
-            action_groups[key] = {
-                "action": log.action,
-                "assessment_type": log.assessment_type,
-                "count": 0,
-                "last_timestamp": log.timestamp,
-                "policy_id": log.policy_id
-            }
-        action_groups[key]["count"] += 1
-        if log.timestamp > action_groups[key]["last_timestamp"]:
-            action_groups[key]["last_timestamp"] = log.timestamp
-
-    for data in action_groups.values():
-        aggregates.append(AggregatedMetrics(
-            action=data["action"],
-            assessment_type=data["assessment_type"],
-            count=data["count"],
-            last_event_timestamp=data["last_timestamp"],
-            policy_id=data["policy_id"]
-        ))
+    grouped = select(
+        AIUseLogORM.action,
+        AIUseLogORM.assessment_type,
+        func.count().label("events"),
+        func.max(AIUseLogORM.timestamp).label("last_timestamp")
+    ).where(*filters).group_by(AIUseLogORM.action, AIUseLogORM.assessment_type).subquery()
+
+    # Join each group back to its latest event (an index lookup) for its policy_id
+    latest = aliased(AIUseLogORM)
+    return (
+        select(
+            grouped.c.action,
+            grouped.c.assessment_type,
+            grouped.c.events,
+            grouped.c.last_timestamp,
+            func.max(latest.policy_id).label("policy_id")
+        ).join(latest, and_(
+            _pseudonym_filter(latest.actor_id_pseudonym, actor_id_pseudonym),
+            latest.timestamp == grouped.c.last_timestamp,
+            latest.action == grouped.c.action,
+            latest.assessment_type == grouped.c.assessment_type,
+            *([latest.course_id == course_id] if course_id else [])
+        )).group_by(
+            grouped.c.action, grouped.c.assessment_type, grouped.c.events, grouped.c.last_timestamp
+        ).order_by(grouped.c.last_timestamp.desc(), grouped.c.action, grouped.c.assessment_type)
+    )
+
 
-    summary = f"You have {len(logs)} AI-use events logged"
-    if logs:
-        summary += f" (last event: {logs[-1].timestamp.strftime('%Y-%m-%d')})";
+def _student_view(rows) -> StudentTransparencyView:
+    aggregates = [
+        AggregatedMetrics(
+            action=row.action,
+            assessment_type=row.assessment_type,
+            count=row.events,
+            last_event_timestamp=row.last_timestamp,
+            policy_id=row.policy_id
+        )
+        for row in rows
+    ]
+    total_events = sum(row.events for row in rows)
+
+    summary = f"You have {total_events} AI-use events logged"
+    if rows:
+        summary += f" (last event: {rows[0].last_timestamp.strftime('%Y-%m-%d')})"
 
     return StudentTransparencyView(
         summary=summary,
         aggregates=aggregates,
         disclosure_instructions="This log shows when you used AI tools in your coursework. The institution logs metadata only (action, time, policy version)—not content.",
         policy_link_template="/policies/{policy_id}",
-        privacy_commitment="We do not store your identity with these logs. Logs are deleted 90 days after creation. You can opt out of logging at any time."
+        privacy_commitment=f"We do not store your identity with these logs. Logs are deleted {settings.log_retention_days} days after creation. You can opt out of logging at any time."
+    )
+
+
+def _encode_cursor(timestamp: datetime, log_id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{log_id.hex}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        timestamp, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), uuid.UUID(log_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def get_student_log_page(
+    actor_id_pseudonym: Union[str, Sequence[str]],
+    course_id: Optional[str],
+    db: Session,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> StudentLogPage:
+    """
+    One page of a student's raw events, newest first. Keyset pagination on
+    (timestamp, log_id): each page is an index range read, however deep.
+    Pass the returned next_cursor to get the following page.
+    """
+    started = time.perf_counter()
+    logs = db.execute(_log_page_statement(actor_id_pseudonym, course_id, limit, cursor)).scalars().all()
+    page = _log_page(logs, limit)
+    QUERY_SECONDS.labels(query="student_log_page").observe(time.perf_counter() - started)
+    return page
+
+
+def _log_page_statement(
+    actor_id_pseudonym: Union[str, Sequence[str]], course_id: Optional[str], limit: int, cursor: Optional[str]
+):
+    query = select(AIUseLogORM).where(_pseudonym_filter(AIUseLogORM.actor_id_pseudonym, actor_id_pseudonym))
+    if course_id:
+        query = query.where(AIUseLogORM.course_id == course_id)
+    if cursor:
+        timestamp, log_id = _decode_cursor(cursor)
+        query = query.where(or_(
+            AIUseLogORM.timestamp < timestamp,
+            and_(AIUseLogORM.timestamp == timestamp, AIUseLogORM.log_id < log_id)
+        ))
+    # One extra row tells whether another page exists
+    return query.order_by(AIUseLogORM.timestamp.desc(), AIUseLogORM.log_id.desc()).limit(limit + 1)
+
+
+def _log_page(logs: Sequence[AIUseLogORM], limit: int) -> StudentLogPage:
+    has_more = len(logs) > limit
+    logs = logs[:limit]
+    return StudentLogPage(
+        items=[
+            AIUseLog(
+                log_id=str(log.log_id),
+                course_id=log.course_id,
+                actor_id_pseudonym=log.actor_id_pseudonym,
+                action=log.action,
+                assessment_type=log.assessment_type,
+                policy_id=log.policy_id,
+                decision=log.decision,
+                timestamp=log.timestamp,
+                retention_until=log.retention_until
+            )
+            for log in logs
+        ],
+        next_cursor=_encode_cursor(logs[-1].timestamp, logs[-1].log_id) if has_more else None
     )
 
 
@@ -102,39 +296,48 @@ def get_course_analytics(
 ) -> CourseAnalytics:
     """
     Aggregated, anonymized analytics for instructors.
+    Reads hourly rollups (O(buckets)); distinct students are HyperLogLog estimates.
     """
-    # Last 7 days
-    since = datetime.utcnow() - timedelta(days=7)
-    logs = db.query(AIUseLogORM).filter(
-        AIUseLogORM.course_id == course_id,
-        AIUseLogORM.timestamp >= since
-    ).all()
+    started = time.perf_counter()
+    analytics = _course_analytics(course_id, read_rollups(db, course_id, _analytics_since()))
+    QUERY_SECONDS.labels(query="course_analytics").observe(time.perf_counter() - started)
+    return analytics
+
+
+def _analytics_since() -> datetime:
+    """Start of the analytics window: the last 7 days, at hour-bucket granularity."""
+    return datetime.utcnow() - timedelta(days=7)
+
 
-    unique_students = len(set(log.actor_id_pseudonym for log in logs))
-    total_events = len(logs)
+def _course_analytics(course_id: str, rollups: Sequence[Any]) -> CourseAnalytics:
+    all_students = HyperLogLog()
+    total_events = 0
 
     # Group by action
     by_action = {}
-    for log in logs:
-        key = (log.action, log.assessment_type)
+    for r in rollups:
+        key = (r.action, r.assessment_type)
         if key not in by_action:
             by_action[key] = {
-                "action": log.action,
-                "assessment_type": log.assessment_type,
-                "unique_students": set(),
+                "action": r.action,
+                "assessment_type": r.assessment_type,
+                "unique_students": HyperLogLog(),
                 "total_events": 0,
-                "last_event": log.timestamp
+                "last_event": r.last_event
             }
-        by_action[key]["unique_students"].add(log.actor_id_pseudonym)
-        by_action[key]["total_events"] += 1
-        if log.timestamp > by_action[key]["last_event"]:
-            by_action[key]["last_event"] = log.timestamp
+        sketch = HyperLogLog.from_bytes(r.student_sketch)
+        by_action[key]["unique_students"].merge(sketch)
+        by_action[key]["total_events"] += r.event_count
+        if r.last_event > by_action[key]["last_event"]:
+            by_action[key]["last_event"] = r.last_event
+        all_students.merge(sketch)
+        total_events += r.event_count
 
     by_action_list = [
         {
             "action": data["action"],
             "assessment_type": data["assessment_type"],
-            "unique_students": len(data["unique_students"]),
+            "unique_students": data["unique_students"].count(),
             "total_events": data["total_events"],
             "last_event": data["last_event"].isoformat()
         }
@@ -144,7 +347,7 @@ def get_course_analytics(
     return CourseAnalytics(
         course_id=course_id,
         period="last 7 days",
-        total_unique_students=unique_students,
+        total_unique_students=all_students.count(),
         total_events=total_events,
         by_action=by_action_list
     )
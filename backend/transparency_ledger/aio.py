@@ -0,0 +1,83 @@
+"""
+Async entry points for the transparency ledger (for AsyncSession callers)
+
+The statements are built by the synchronous implementations' helpers and awaited
+on the async driver, so the SQL stays in one place and the event loop is never
+blocked on I/O. Rows are written unsealed, like every decision: merkle.seal_pending()
+(LedgerSealer) seals them and folds them into the rollups.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import AIUseLogORM, CourseAnalytics, StudentLogPage, StudentTransparencyView
+
+from . import (
+    COMMIT_SECONDS, ENTRIES_WRITTEN, QUERY_SECONDS, _analytics_since, _batch_rows, _course_analytics,
+    _log_page, _log_page_statement, _log_row, _student_summary_statement, _student_view
+)
+from .rollups import rollups_statement
+
+
+async def log_to_transparency_ledger_async(db: AsyncSession, **entry: Any) -> AIUseLogORM:
+    started = time.perf_counter()
+    log = _log_row(**entry)
+    db.add(log)
+    await db.commit()
+    COMMIT_SECONDS.labels(mode="single").observe(time.perf_counter() - started)
+    ENTRIES_WRITTEN.inc()
+    await db.refresh(log)
+    return log
+
+
+async def log_batch_to_transparency_ledger_async(entries: List[Dict[str, Any]], db: AsyncSession) -> int:
+    if not entries:
+        return 0
+    started = time.perf_counter()
+    rows = _batch_rows(entries)
+    try:
+        await db.execute(insert(AIUseLogORM), rows)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    COMMIT_SECONDS.labels(mode="batch").observe(time.perf_counter() - started)
+    ENTRIES_WRITTEN.inc(len(rows))
+    return len(rows)
+
+
+async def get_student_transparency_logs_async(
+    actor_id_pseudonym: Union[str, Sequence[str]],
+    course_id: Optional[str],
+    db: AsyncSession
+) -> StudentTransparencyView:
+    started = time.perf_counter()
+    rows = (await db.execute(_student_summary_statement(actor_id_pseudonym, course_id))).all()
+    view = _student_view(rows)
+    QUERY_SECONDS.labels(query="student_summary").observe(time.perf_counter() - started)
+    return view
+
+
+async def get_student_log_page_async(
+    actor_id_pseudonym: Union[str, Sequence[str]],
+    course_id: Optional[str],
+    db: AsyncSession,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> StudentLogPage:
+    started = time.perf_counter()
+    logs = (await db.execute(_log_page_statement(actor_id_pseudonym, course_id, limit, cursor))).scalars().all()
+    page = _log_page(logs, limit)
+    QUERY_SECONDS.labels(query="student_log_page").observe(time.perf_counter() - started)
+    return page
+
+
+async def get_course_analytics_async(course_id: str, db: AsyncSession) -> CourseAnalytics:
+    started = time.perf_counter()
+    rollups = (await db.execute(rollups_statement(course_id, _analytics_since()))).scalars().all()
+    analytics = _course_analytics(course_id, rollups)
+    QUERY_SECONDS.labels(query="course_analytics").observe(time.perf_counter() - started)
+    return analytics
@@ -0,0 +1,207 @@
+"""
+Bulk ingestion of ai_use_logs from NDJSON / CSV exports (LMS, partner proxy)
+
+- Streams the input: rows are parsed and validated one at a time and written in chunks
+- Fastest path per backend: COPY FROM STDIN on Postgres, chunked executemany
+  elsewhere (SQLite), all inside one transaction
+- Each chunk is sealed as one Merkle batch, and analytics rollups are updated,
+  in the same transaction
+- Invalid rows are rejected with their line number instead of failing the load;
+  only metadata columns are stored, any other field is ignored
+"""
+
+import csv
+import io
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import AIUseLogORM, DecisionEnum, IngestReport, Policy
+from .merkle import seal_rows
+from .rollups import update_rollups
+
+INGEST_FORMATS = ("ndjson", "csv")
+INGEST_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+COLUMNS = (
+    "log_id", "course_id", "actor_id_pseudonym", "action", "assessment_type",
+    "policy_id", "decision", "timestamp", "retention_until", "batch_id", "leaf_index"
+)
+REQUIRED = ("course_id", "actor_id_pseudonym", "action", "assessment_type", "policy_id", "decision", "timestamp")
+DECISIONS = frozenset(d.value for d in DecisionEnum)
+
+Row = Tuple[uuid.UUID, str, str, str, str, str, str, datetime, datetime]
+
+
+class RowError(ValueError):
+    """A single input row failed validation."""
+
+
+def parse_records(stream: IO[str], fmt: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (line number, raw record) from an NDJSON or CSV text stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "ndjson":
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, {"__error__": f"Invalid JSON: {e}"}
+                continue
+            yield line_no, record if isinstance(record, dict) else {"__error__": "Expected a JSON object"}
+    else:
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {INGEST_FORMATS}")
+
+
+def _timestamp(value: Any, field: str) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        raise RowError(f"{field}: invalid ISO-8601 timestamp")
+    # Ledger timestamps are naive UTC
+    if parsed.tzinfo is not None:
+        parsed = datetime.utcfromtimestamp(parsed.timestamp())
+    return parsed
+
+
+def validate_record(
+    record: Dict[str, Any], known_policies: Optional[Set[str]] = None, retention_days: Optional[int] = None
+) -> Row:
+    """
+    Normalize one raw record into an ai_use_logs row, or raise RowError. Without its own
+    retention_until, a row is kept retention_days (default settings.log_retention_days).
+    """
+    if "__error__" in record:
+        raise RowError(record["__error__"])
+    missing = [f for f in REQUIRED if not record.get(f)]
+    if missing:
+        raise RowError(f"missing {', '.join(missing)}")
+    decision = str(record["decision"]).upper()
+    if decision not in DECISIONS:
+        raise RowError(f"decision must be one of {sorted(DECISIONS)}")
+    policy_id = str(record["policy_id"])
+    if known_policies is not None and policy_id not in known_policies:
+        raise RowError(f"unknown policy_id {policy_id}")
+    timestamp = _timestamp(record["timestamp"], "timestamp")
+    retention_until = (
+        _timestamp(record["retention_until"], "retention_until") if record.get("retention_until")
+        else timestamp + timedelta(days=settings.log_retention_days if retention_days is None else retention_days)
+    )
+    try:
+        log_id = uuid.UUID(str(record["log_id"])) if record.get("log_id") else uuid.uuid4()
+    except ValueError:
+        raise RowError("log_id: invalid UUID")
+    return (
+        log_id, str(record["course_id"]), str(record["actor_id_pseudonym"]), str(record["action"]),
+        str(record["assessment_type"]), policy_id, decision, timestamp, retention_until
+    )
+
+
+def _copy_chunk(db: Session, rows: List[tuple]) -> None:
+    """COPY FROM STDIN on the session's connection (same transaction)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([v.isoformat() if isinstance(v, datetime) else v for v in row])
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {AIUseLogORM.__tablename__} ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+
+def _executemany_chunk(db: Session, rows: List[tuple]) -> None:
+    # Core insert on the table: one executemany, no ORM unit-of-work bookkeeping
+    db.execute(insert(AIUseLogORM.__table__), [dict(zip(COLUMNS, row)) for row in rows])
+
+
+def ingest_ledger_stream(
+    records: Iterable[Tuple[int, Dict[str, Any]]],
+    db: Session,
+    fmt: str = "ndjson",
+    chunk_size: int = INGEST_CHUNK_SIZE,
+    validate_policies: bool = True,
+    progress: Optional[Callable[[IngestReport], None]] = None
+) -> IngestReport:
+    """
+    Validate and insert (line number, record) pairs in chunks within one transaction.
+    Calls progress(report) after every chunk. Rolls back everything on a database error.
+    """
+    started = time.perf_counter()
+    use_copy = db.get_bind().dialect.name == "postgresql"
+    write_chunk = _copy_chunk if use_copy else _executemany_chunk
+    report = IngestReport(format=fmt, backend="copy" if use_copy else "executemany")
+    known = {pid for (pid,) in db.query(Policy.policy_id)} if validate_policies else None
+
+    # Plain counters per row; the report model is only updated per chunk
+    total = rejected = 0
+
+    def flush(chunk: List[Row]) -> None:
+        if chunk:
+            # Each chunk is sealed as one Merkle batch
+            batch_id = seal_rows(db, [row[:8] for row in chunk])
+            write_chunk(db, [row + (batch_id, leaf_index) for leaf_index, row in enumerate(chunk)])
+            update_rollups(db, ((r[1], r[3], r[4], r[2], r[7]) for r in chunk))
+        elapsed = time.perf_counter() - started
+        report.total_rows = total
+        report.rejected = rejected
+        report.inserted += len(chunk)
+        report.elapsed_seconds = elapsed
+        report.rows_per_second = report.inserted / elapsed if elapsed else 0.0
+
+    chunk: List[Row] = []
+    try:
+        for line_no, record in records:
+            total += 1
+            try:
+                chunk.append(validate_record(record, known))
+            except RowError as e:
+                rejected += 1
+                if len(report.errors) < MAX_REPORTED_ERRORS:
+                    report.errors.append({"line": line_no, "error": str(e)})
+                continue
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+                if progress:
+                    progress(report)
+        flush(chunk)
+        if chunk and progress:
+            progress(report)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return report
+
+
+def ingest_ledger(
+    stream: IO[str],
+    fmt: str,
+    db: Session,
+    chunk_size: int = INGEST_CHUNK_SIZE,
+    validate_policies: bool = True,
+    progress: Optional[Callable[[IngestReport], None]] = None
+) -> IngestReport:
+    """Bulk-load an NDJSON or CSV text stream into ai_use_logs."""
+    return ingest_ledger_stream(
+        parse_records(stream, fmt), db,
+        fmt=fmt, chunk_size=chunk_size, validate_policies=validate_policies, progress=progress
+    )
@@ -0,0 +1,323 @@
+"""
+Tamper evidence for the transparency ledger
+
+Rows are sealed into batches: their leaf hashes form a Merkle tree, and each batch
+hash commits to the previous batch hash, its Merkle root, id and size, forming a
+hash chain. Sealing locks the single chain head, so it stays off the decision path:
+decisions are written unsealed and seal_pending() (run by LedgerSealer every few
+seconds) seals them in bulk and folds them into the analytics rollups; write-behind
+flushes and ingest chunks seal and fold their own rows.
+
+- Hashing is done once per batch, in memory: one SHA-256 per row plus the tree
+- Each batch stores all its tree levels, so an inclusion proof is O(log n) slices
+- Hashes follow RFC 6962 domain separation (0x00 leaves, 0x01 nodes); an unpaired
+  last node is promoted to the next level unchanged
+- Chain verification reads batch headers only, never the ledger rows
+"""
+
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, bindparam
+from sqlalchemy.orm import Session
+
+from models import AIUseLogORM, InclusionProof, LedgerBatchORM, LedgerHeadORM, ProofStep
+from .rollups import update_rollups
+
+logger = logging.getLogger(__name__)
+
+GENESIS_HASH = "0" * 64
+HASH_SIZE = 32
+
+# Rows awaiting seal_pending(); rows rotated before sealing (legacy) are never sealed
+_UNSEALED = (AIUseLogORM.batch_id.is_(None), AIUseLogORM.pseudonym_epoch == 0)
+
+# (log_id, course_id, actor_id_pseudonym, action, assessment_type, policy_id, decision, timestamp)
+LeafFields = Tuple[Any, str, str, str, str, str, str, datetime]
+
+
+def leaf_hash(log_id, course_id, actor_id_pseudonym, action, assessment_type, policy_id, decision, timestamp) -> bytes:
+    canonical = "|".join((
+        log_id.hex if hasattr(log_id, "hex") else str(log_id).replace("-", ""),
+        course_id, actor_id_pseudonym, action, assessment_type, policy_id, decision,
+        timestamp.isoformat()
+    ))
+    return hashlib.sha256(b"\x00" + canonical.encode("utf-8")).digest()
+
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def _level_sizes(leaf_count: int) -> List[int]:
+    sizes = [leaf_count]
+    while sizes[-1] > 1:
+        sizes.append((sizes[-1] + 1) // 2)
+    return sizes
+
+
+def build_tree(leaves: Sequence[bytes]) -> Tuple[bytes, bytes]:
+    """Return (root, all levels concatenated leaves-first)."""
+    if not leaves:
+        raise ValueError("cannot build a Merkle tree without leaves")
+    level = list(leaves)
+    levels = [b"".join(level)]
+    while len(level) > 1:
+        level = [
+            _node(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+            for i in range(0, len(level), 2)
+        ]
+        levels.append(b"".join(level))
+    return level[0], b"".join(levels)
+
+
+def tree_proof(tree: bytes, leaf_count: int, index: int) -> List[Tuple[str, bytes]]:
+    """Sibling path for leaf `index`, read by offset from the stored levels."""
+    if not 0 <= index < leaf_count:
+        raise IndexError("leaf index out of range")
+    proof = []
+    offset = 0
+    for size in _level_sizes(leaf_count)[:-1]:
+        sibling = index ^ 1
+        if sibling < size:
+            start = offset + sibling * HASH_SIZE
+            proof.append(("left" if sibling < index else "right", tree[start:start + HASH_SIZE]))
+        offset += size * HASH_SIZE
+        index //= 2
+    return proof
+
+
+def tree_leaf(tree: bytes, index: int) -> bytes:
+    return tree[index * HASH_SIZE:(index + 1) * HASH_SIZE]
+
+
+def verify_inclusion(leaf_hex: str, proof: Iterable[Any], root_hex: str) -> bool:
+    """Client-side check: fold the proof steps (ProofStep or dict) into the root."""
+    running = bytes.fromhex(leaf_hex)
+    for step in proof:
+        position, sibling = (step["position"], step["hash"]) if isinstance(step, dict) else (step.position, step.hash)
+        sibling = bytes.fromhex(sibling)
+        running = _node(sibling, running) if position == "left" else _node(running, sibling)
+    return running.hex() == root_hex
+
+
+def chain_hash(prev_hash: str, merkle_root: str, batch_id: int, leaf_count: int) -> str:
+    return hashlib.sha256(
+        bytes.fromhex(prev_hash) + bytes.fromhex(merkle_root)
+        + batch_id.to_bytes(8, "big") + leaf_count.to_bytes(8, "big")
+    ).hexdigest()
+
+
+def seal_rows(db: Session, rows: Sequence[LeafFields]) -> int:
+    """
+    Seal rows (in order; leaf_index = position) into a new batch chained to the
+    current head, and return its batch_id. The head row is locked until the
+    caller's commit, so concurrent sealers extend the chain one at a time.
+    """
+    root, tree = build_tree([leaf_hash(*row) for row in rows])
+    head = _lock_head(db)
+    batch_id = head.batch_id + 1
+    batch_hash = chain_hash(head.batch_hash, root.hex(), batch_id, len(rows))
+    db.add(LedgerBatchORM(
+        batch_id=batch_id,
+        merkle_root=root.hex(),
+        prev_hash=head.batch_hash,
+        batch_hash=batch_hash,
+        leaf_count=len(rows),
+        created_at=datetime.utcnow(),
+        tree=tree
+    ))
+    head.batch_id = batch_id
+    head.batch_hash = batch_hash
+    db.flush()
+    return batch_id
+
+
+def _lock_head(db: Session) -> LedgerHeadORM:
+    head = db.query(LedgerHeadORM).filter(LedgerHeadORM.id == 1).with_for_update().one_or_none()
+    if head is None:
+        head = LedgerHeadORM(id=1, batch_id=0, batch_hash=GENESIS_HASH)
+        db.add(head)
+    return head
+
+
+def seal_pending(db: Session, max_rows: int = 10000) -> int:
+    """
+    Seal rows written unsealed into batches of up to max_rows (oldest first) and fold
+    them into the rollups, one commit per batch; return how many were sealed. Takes
+    no lock when nothing is pending.
+    """
+    table = AIUseLogORM.__table__
+    # timestamp in the WHERE lets Postgres prune to one partition per row
+    mark = table.update().where(and_(
+        table.c.log_id == bindparam("b_log_id"),
+        table.c.timestamp == bindparam("b_timestamp")
+    )).values(batch_id=bindparam("b_batch_id"), leaf_index=bindparam("b_leaf_index"))
+
+    sealed = 0
+    while db.query(AIUseLogORM.log_id).filter(*_UNSEALED).first() is not None:
+        try:
+            # Selected under the head lock: a concurrent sealer cannot pick the same rows
+            _lock_head(db)
+            rows = db.query(
+                AIUseLogORM.log_id, AIUseLogORM.course_id, AIUseLogORM.actor_id_pseudonym, AIUseLogORM.action,
+                AIUseLogORM.assessment_type, AIUseLogORM.policy_id, AIUseLogORM.decision, AIUseLogORM.timestamp
+            ).filter(*_UNSEALED).order_by(AIUseLogORM.timestamp, AIUseLogORM.log_id).limit(max_rows).all()
+            if rows:
+                batch_id = seal_rows(db, rows)
+                db.execute(mark, [
+                    {"b_log_id": row[0], "b_timestamp": row[7], "b_batch_id": batch_id, "b_leaf_index": i}
+                    for i, row in enumerate(rows)
+                ])
+                update_rollups(db, ((row[1], row[3], row[4], row[2], row[7]) for row in rows))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        sealed += len(rows)
+        if len(rows) < max_rows:
+            break
+    return sealed
+
+
+class LedgerSealer:
+    """Background thread running seal_pending() every `interval` seconds."""
+
+    def __init__(self, session_factory: Callable[[], Session], interval: float = 2.0, max_rows: int = 10000):
+        self._session_factory = session_factory
+        self.interval = interval
+        self.max_rows = max_rows
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        """Start the sealer thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="ledger-sealer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the thread after a final pass, so rows written before shutdown are sealed."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopping.set()
+        thread.join(timeout)
+        if not thread.is_alive():
+            self._thread = None
+
+    def seal(self) -> int:
+        db = self._session_factory()
+        try:
+            return seal_pending(db, self.max_rows)
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while True:
+            stopping = self._stopping.wait(self.interval)
+            try:
+                self.seal()
+            except Exception:
+                logger.exception("Sealing pending ledger rows failed; retrying in %.1fs", self.interval)
+            if stopping:
+                return
+
+
+def get_inclusion_proof(
+    db: Session,
+    log_id: Any,
+    pseudonym: Optional[str] = None,
+    derive: Optional[Callable[[str, int], str]] = None
+) -> Optional[InclusionProof]:
+    """
+    Inclusion proof for a sealed row, or None if unknown or sealed before tamper evidence.
+    Leaves hash the pseudonym as logged; for a rotated row (pseudonym_epoch > 0),
+    row_matches is only checked given the logged pseudonym and derive(pseudonym, epoch)
+    reproducing the stored one, else it is None.
+    """
+    log = db.query(AIUseLogORM).filter(AIUseLogORM.log_id == log_id).one_or_none()
+    if log is None or log.batch_id is None:
+        return None
+    batch = db.get(LedgerBatchORM, log.batch_id)
+    if batch is None:
+        return None
+
+    sealed_leaf = tree_leaf(batch.tree, log.leaf_index)
+    logged_pseudonym = log.actor_id_pseudonym
+    if log.pseudonym_epoch:
+        logged_pseudonym = pseudonym if derive is not None else None
+    if logged_pseudonym is None:
+        row_matches = None
+    elif log.pseudonym_epoch and derive(logged_pseudonym, log.pseudonym_epoch) != log.actor_id_pseudonym:
+        row_matches = False
+    else:
+        row_matches = sealed_leaf == leaf_hash(
+            log.log_id, log.course_id, logged_pseudonym, log.action, log.assessment_type,
+            log.policy_id, log.decision, log.timestamp
+        )
+    return InclusionProof(
+        log_id=str(log.log_id),
+        batch_id=batch.batch_id,
+        leaf_index=log.leaf_index,
+        leaf_hash=sealed_leaf.hex(),
+        proof=[ProofStep(position=p, hash=h.hex()) for p, h in tree_proof(batch.tree, batch.leaf_count, log.leaf_index)],
+        merkle_root=batch.merkle_root,
+        batch_hash=batch.batch_hash,
+        prev_batch_hash=batch.prev_hash,
+        leaf_count=batch.leaf_count,
+        row_matches=row_matches
+    )
+
+
+def get_chain_head(db: Session) -> Dict[str, Any]:
+    head = db.get(LedgerHeadORM, 1)
+    if head is None:
+        return {"batch_id": 0, "batch_hash": GENESIS_HASH}
+    return {"batch_id": head.batch_id, "batch_hash": head.batch_hash}
+
+
+def verify_chain(
+    db: Session,
+    from_batch_id: int = 1,
+    to_batch_id: Optional[int] = None,
+    check_trees: bool = False
+) -> Dict[str, Any]:
+    """
+    Re-derive batch hashes over a range of batch headers and check their links
+    (and, with check_trees, each stored tree against its root). Ledger rows are not read.
+    """
+    query = db.query(LedgerBatchORM).filter(LedgerBatchORM.batch_id >= from_batch_id)
+    if to_batch_id is not None:
+        query = query.filter(LedgerBatchORM.batch_id <= to_batch_id)
+
+    expected_prev: Optional[str] = None
+    checked = 0
+    last: Optional[LedgerBatchORM] = None
+    for batch in query.order_by(LedgerBatchORM.batch_id).yield_per(1000):
+        ok = (expected_prev is None or batch.prev_hash == expected_prev) and (
+            chain_hash(batch.prev_hash, batch.merkle_root, batch.batch_id, batch.leaf_count) == batch.batch_hash
+        )
+        if ok and check_trees:
+            leaves = [tree_leaf(batch.tree, i) for i in range(batch.leaf_count)]
+            ok = build_tree(leaves)[0].hex() == batch.merkle_root
+        if not ok:
+            return {"ok": False, "verified_batches": checked, "first_bad_batch": batch.batch_id}
+        expected_prev = batch.batch_hash
+        checked += 1
+        last = batch
+
+    head = get_chain_head(db)
+    if to_batch_id is None and last is not None and head["batch_hash"] != last.batch_hash:
+        return {"ok": False, "verified_batches": checked, "first_bad_batch": head["batch_id"]}
+    return {
+        "ok": True,
+        "verified_batches": checked,
+        "last_batch_id": last.batch_id if last is not None else None,
+        "last_batch_hash": last.batch_hash if last is not None else None,
+    }
@@ -0,0 +1,154 @@
+"""
+Pseudonym rotation for the transparency ledger
+
+Time is divided into epochs of pseudonym_rotation_days. Rotating a row to epoch e
+replaces its pseudonym with HMAC(k_e, pseudonym), where k_e is derived from the
+server secret, so rotated rows cannot be linked to earlier pseudonyms without it.
+Rotation chains epoch by epoch, so the server (holding the secret) can still map
+a student's logged pseudonym to every later form (pseudonym_history()).
+
+rotate_pseudonyms() rotates rows from past epochs in keyset-paginated chunks:
+- each chunk is read, updated with one executemany and committed on its own,
+  so no snapshot or lock is held across the run
+- progress is the rows themselves (pseudonym_epoch), so an interrupted run
+  resumes by running again
+- max_chunks / max_seconds / pause_seconds bound a run to a low-traffic window
+"""
+
+import hashlib
+import hmac
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, select
+from sqlalchemy.orm import Session
+
+from models import AIUseLogORM, Policy, PolicyJSON, RotationReport
+from .merkle import seal_pending
+
+EPOCH_ORIGIN = datetime(2025, 1, 1)
+PSEUDONYM_PREFIX = "ps_"
+
+
+def epoch_for(moment: datetime, rotation_days: int) -> int:
+    return max(0, (moment - EPOCH_ORIGIN).days // rotation_days)
+
+
+def epoch_start(epoch: int, rotation_days: int) -> datetime:
+    return EPOCH_ORIGIN + timedelta(days=epoch * rotation_days)
+
+
+@lru_cache(maxsize=256)
+def epoch_key(secret: str, epoch: int) -> bytes:
+    return hmac.new(secret.encode("utf-8"), f"pseudonym-epoch:{epoch}".encode(), hashlib.sha256).digest()
+
+
+def derive(pseudonym: str, from_epoch: int, to_epoch: int, secret: str) -> str:
+    """Pseudonym at to_epoch of a row whose pseudonym is `pseudonym` at from_epoch."""
+    for epoch in range(from_epoch + 1, to_epoch + 1):
+        digest = hmac.new(epoch_key(secret, epoch), pseudonym.encode("utf-8"), hashlib.sha256).hexdigest()
+        pseudonym = PSEUDONYM_PREFIX + digest[:32]
+    return pseudonym
+
+
+def pseudonym_history(pseudonym: str, current_epoch: int, secret: str) -> List[str]:
+    """Every form a logged pseudonym can take in the ledger, from as-logged to current_epoch."""
+    history = [pseudonym]
+    for epoch in range(1, current_epoch + 1):
+        history.append(derive(history[-1], epoch - 1, epoch, secret))
+    return history
+
+
+def _rotation_exempt_policies(db: Session) -> List[str]:
+    """Policies whose LoggingConfig turns pseudonym rotation off."""
+    exempt = []
+    for policy_id, content in db.query(Policy.policy_id, Policy.content):
+        try:
+            if not PolicyJSON.model_validate(content).logging.pseudonym_rotation:
+                exempt.append(policy_id)
+        except Exception:
+            continue
+    return exempt
+
+
+def rotate_pseudonyms(
+    db: Session,
+    secret: str,
+    rotation_days: int,
+    now: Optional[datetime] = None,
+    chunk_size: int = 5000,
+    pause_seconds: float = 0.0,
+    max_chunks: Optional[int] = None,
+    max_seconds: Optional[float] = None,
+    progress: Optional[Callable[[RotationReport], None]] = None
+) -> RotationReport:
+    """
+    Rotate every row logged before the current epoch to the current epoch.
+    Safe to stop at any point and re-run.
+    """
+    started = time.perf_counter()
+    # Leaves hash the pseudonym as logged: seal rows still waiting before rewriting them
+    seal_pending(db)
+    target = epoch_for(now or datetime.utcnow(), rotation_days)
+    report = RotationReport(target_epoch=target)
+    table = AIUseLogORM.__table__
+
+    due = [table.c.pseudonym_epoch < target, table.c.timestamp < epoch_start(target, rotation_days)]
+    exempt = _rotation_exempt_policies(db)
+    if exempt:
+        due.append(table.c.policy_id.notin_(exempt))
+
+    # timestamp in the WHERE lets Postgres prune to one partition per row
+    update = table.update().where(and_(
+        table.c.log_id == bindparam("b_log_id"),
+        table.c.timestamp == bindparam("b_timestamp")
+    )).values(actor_id_pseudonym=bindparam("b_pseudonym"), pseudonym_epoch=target)
+
+    last_log_id = None
+    while True:
+        query = select(table.c.log_id, table.c.timestamp, table.c.actor_id_pseudonym, table.c.pseudonym_epoch).where(*due)
+        if last_log_id is not None:
+            query = query.where(table.c.log_id > last_log_id)
+        rows = db.execute(query.order_by(table.c.log_id).limit(chunk_size)).all()
+        if not rows:
+            report.completed = True
+            break
+
+        # Students appear many times per chunk; derive each (pseudonym, epoch) once
+        derived: Dict[Tuple[str, int], str] = {}
+        params = []
+        for log_id, timestamp, pseudonym, epoch in rows:
+            key = (pseudonym, epoch)
+            if key not in derived:
+                derived[key] = derive(pseudonym, epoch, target, secret)
+            params.append({"b_log_id": log_id, "b_timestamp": timestamp, "b_pseudonym": derived[key]})
+        try:
+            db.execute(update, params)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        last_log_id = rows[-1][0]
+        report.rows_rotated += len(rows)
+        report.chunks += 1
+        report.last_log_id = str(last_log_id)
+        report.elapsed_seconds = time.perf_counter() - started
+        report.rows_per_second = report.rows_rotated / report.elapsed_seconds if report.elapsed_seconds else 0.0
+        if progress:
+            progress(report)
+        if len(rows) < chunk_size:
+            report.completed = True
+            break
+        if (max_chunks is not None and report.chunks >= max_chunks) or (
+            max_seconds is not None and report.elapsed_seconds >= max_seconds
+        ):
+            break
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    report.elapsed_seconds = time.perf_counter() - started
+    report.rows_per_second = report.rows_rotated / report.elapsed_seconds if report.elapsed_seconds else 0.0
+    return report
@@ -0,0 +1,210 @@
+"""
+Retention for ai_use_logs
+
+- Postgres (after the 20261018_02 migration): ai_use_logs is range-partitioned by
+  month on timestamp. Retention drops whole partitions whose range has expired,
+  a metadata operation instead of a table-wide DELETE, and keeps future
+  partitions created ahead of time. Partitions that can still hold expired rows
+  (kept for a later retention_until, the one spanning the cutoff, the default
+  partition) are swept like an unpartitioned table.
+- SQLite / unpartitioned: a throttled sweeper deletes expired rows in small
+  chunks, committing and pausing between chunks so writers are never blocked long.
+
+A row is expired when retention_until has passed (or, without one, when it is
+older than retention_days).
+"""
+
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import MetaData, Table, and_, or_, select, text
+from sqlalchemy.orm import Session
+
+from models import AIUseLogORM
+
+PARTITION_PREFIX = "ai_use_logs_"
+DEFAULT_PARTITION = "ai_use_logs_default"
+_PARTITION_NAME = re.compile(r"^ai_use_logs_(\d{4})_(\d{2})$")
+
+
+def month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(start: datetime) -> datetime:
+    return start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{PARTITION_PREFIX}{start.year:04d}_{start.month:02d}"
+
+
+def partition_bounds(name: str) -> Optional[Tuple[datetime, datetime]]:
+    """[start, end) of a monthly partition, or None for other tables (e.g. the default partition)."""
+    match = _PARTITION_NAME.match(name)
+    if not match:
+        return None
+    start = datetime(int(match.group(1)), int(match.group(2)), 1)
+    return start, next_month(start)
+
+
+def is_partitioned(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = 'ai_use_logs'"
+    )).first() is not None
+
+
+def list_partitions(db: Session) -> List[str]:
+    rows = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'ai_use_logs' ORDER BY c.relname"
+    ))
+    return [row[0] for row in rows]
+
+
+def create_partition_sql(start: datetime) -> str:
+    end = next_month(start)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF ai_use_logs "
+        f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+    )
+
+
+def attach_partition_sql(start: datetime) -> List[str]:
+    """
+    Statements creating a month's partition when the default partition already holds
+    rows of that month (CREATE TABLE ... PARTITION OF would fail): the rows are moved
+    into a standalone table, which is then attached.
+    """
+    end = next_month(start)
+    name = partition_name(start)
+    in_month = f"timestamp >= '{start:%Y-%m-%d}' AND timestamp < '{end:%Y-%m-%d}'"
+    return [
+        f"CREATE TABLE {name} (LIKE ai_use_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {in_month} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved",
+        f"ALTER TABLE ai_use_logs ATTACH PARTITION {name} FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')",
+    ]
+
+
+def ensure_partitions(db: Session, now: Optional[datetime] = None, months_ahead: int = 2) -> List[str]:
+    """Create this month's and the next months_ahead partitions if missing (caller commits)."""
+    existing = set(list_partitions(db))
+    start = month_start(now or datetime.utcnow())
+    created = []
+    for _ in range(months_ahead + 1):
+        if partition_name(start) not in existing:
+            stranded = DEFAULT_PARTITION in existing and db.execute(
+                text(f"SELECT 1 FROM {DEFAULT_PARTITION} WHERE timestamp >= :start AND timestamp < :end LIMIT 1"),
+                {"start": start, "end": next_month(start)}
+            ).first() is not None
+            for statement in attach_partition_sql(start) if stranded else [create_partition_sql(start)]:
+                db.execute(text(statement))
+            created.append(partition_name(start))
+        start = next_month(start)
+    return created
+
+
+def drop_expired_partitions(db: Session, retention_days: int, now: Optional[datetime] = None) -> List[str]:
+    """
+    Drop monthly partitions whose whole range is older than retention_days. A partition
+    still holding a row with a later retention_until is kept (and left to the sweeper).
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=retention_days)
+    dropped = []
+    for name in list_partitions(db):
+        bounds = partition_bounds(name)
+        if bounds is None or bounds[1] > cutoff:
+            continue
+        held = db.execute(
+            text(f"SELECT 1 FROM {name} WHERE retention_until > :now LIMIT 1"), {"now": now}
+        ).first()
+        if held is None:
+            db.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    return dropped
+
+
+def partitions_to_sweep(db: Session, retention_days: int, now: Optional[datetime] = None) -> List[str]:
+    """Partitions that can hold rows older than the cutoff: every one starting before it, and the default."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    sweep = []
+    for name in list_partitions(db):
+        bounds = partition_bounds(name)
+        if bounds is None or bounds[0] < cutoff:
+            sweep.append(name)
+    return sweep
+
+
+def _expired(table: Table, now: datetime, retention_days: int):
+    return or_(
+        table.c.retention_until < now,
+        and_(table.c.retention_until.is_(None), table.c.timestamp < now - timedelta(days=retention_days))
+    )
+
+
+def sweep_expired_rows(
+    db: Session,
+    retention_days: int,
+    now: Optional[datetime] = None,
+    chunk_size: int = 5000,
+    pause_seconds: float = 0.05,
+    max_chunks: Optional[int] = None,
+    partition: Optional[str] = None
+) -> int:
+    """
+    Delete expired rows chunk by chunk, committing and sleeping pause_seconds after
+    each chunk (from one partition only, if given). Returns the number of rows deleted.
+    """
+    now = now or datetime.utcnow()
+    table = AIUseLogORM.__table__
+    if partition is not None:
+        table = table.to_metadata(MetaData(), name=partition)
+    deleted = chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        ids = select(table.c.log_id).where(_expired(table, now, retention_days)).limit(chunk_size).scalar_subquery()
+        count = db.execute(table.delete().where(table.c.log_id.in_(ids))).rowcount
+        db.commit()
+        deleted += count
+        chunks += 1
+        if count < chunk_size:
+            break
+        time.sleep(pause_seconds)
+    return deleted
+
+
+def run_retention(
+    db: Session,
+    retention_days: int,
+    now: Optional[datetime] = None,
+    chunk_size: int = 5000,
+    pause_seconds: float = 0.05
+) -> Dict[str, Any]:
+    """Apply retention with the cheapest mechanism the database supports."""
+    if is_partitioned(db):
+        try:
+            created = ensure_partitions(db, now)
+            dropped = drop_expired_partitions(db, retention_days, now)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        deleted = sum(
+            sweep_expired_rows(db, retention_days, now, chunk_size=chunk_size, pause_seconds=pause_seconds,
+                               partition=name)
+            for name in partitions_to_sweep(db, retention_days, now)
+        )
+        return {
+            "mode": "partition_drop", "dropped_partitions": dropped, "created_partitions": created,
+            "deleted_rows": deleted
+        }
+
+    deleted = sweep_expired_rows(db, retention_days, now, chunk_size=chunk_size, pause_seconds=pause_seconds)
+    return {"mode": "chunked_delete", "deleted_rows": deleted}
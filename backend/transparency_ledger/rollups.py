@@ -0,0 +1,155 @@
+"""
+Incremental analytics rollups for the transparency ledger
+
+One ai_use_rollups row per (course_id, action, assessment_type, hour bucket) with
+the event count, last event time and a HyperLogLog of distinct students.
+
+- Folded when rows are sealed (merkle.seal_pending(), write-behind flushes, ingest
+  chunks), in that transaction and under the chain head lock: never per decision,
+  and one INSERT ... ON CONFLICT DO UPDATE per batch
+- rebuild_rollups() is the compaction job for rows logged before rollups existed
+  or written around them
+- Course analytics read O(buckets) rollup rows instead of raw logs
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, case, not_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models import AIUseLogORM, AIUseRollupORM, LedgerHeadORM
+from .hll import HyperLogLog
+
+BUCKET = timedelta(hours=1)
+
+RollupKey = Tuple[str, str, str, datetime]
+# (course_id, action, assessment_type, actor_id_pseudonym, timestamp)
+LedgerEvent = Tuple[str, str, str, str, datetime]
+
+# Rows merkle.seal_pending() has yet to seal, and so to fold
+_PENDING = and_(AIUseLogORM.batch_id.is_(None), AIUseLogORM.pseudonym_epoch == 0)
+
+
+def bucket_start(timestamp: datetime) -> datetime:
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+class _Delta:
+    __slots__ = ("count", "last_event", "sketch")
+
+    def __init__(self):
+        self.count = 0
+        self.last_event: Optional[datetime] = None
+        self.sketch = HyperLogLog()
+
+
+def _collect(events: Iterable[LedgerEvent]) -> Dict[RollupKey, _Delta]:
+    deltas: Dict[RollupKey, _Delta] = {}
+    for course_id, action, assessment_type, pseudonym, timestamp in events:
+        key = (course_id, action, assessment_type, bucket_start(timestamp))
+        delta = deltas.get(key)
+        if delta is None:
+            delta = deltas[key] = _Delta()
+        delta.count += 1
+        if delta.last_event is None or timestamp > delta.last_event:
+            delta.last_event = timestamp
+        delta.sketch.add(pseudonym)
+    return deltas
+
+
+def update_rollups(db: Session, events: Iterable[LedgerEvent]) -> int:
+    """
+    Fold ledger events into their rollup rows (caller commits) with one upsert:
+    counts and last events are combined in SQL, so a key another writer inserted
+    first is updated rather than violating the primary key. Sketches are merged
+    with the stored ones read beforehand, which callers serialise on by holding the
+    chain head lock. Returns the number of rollup rows touched.
+    """
+    deltas = _collect(events)
+    if not deltas:
+        return 0
+    stored = db.query(AIUseRollupORM).filter(
+        AIUseRollupORM.course_id.in_({key[0] for key in deltas}),
+        AIUseRollupORM.bucket_start.in_({key[3] for key in deltas})
+    )
+    for row in stored:
+        delta = deltas.get((row.course_id, row.action, row.assessment_type, row.bucket_start))
+        if delta is not None:
+            delta.sketch = HyperLogLog.from_bytes(row.student_sketch).merge(delta.sketch)
+
+    table = AIUseRollupORM.__table__
+    upsert = (postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert)(table)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[table.c.course_id, table.c.action, table.c.assessment_type, table.c.bucket_start],
+        set_={
+            "event_count": table.c.event_count + upsert.excluded.event_count,
+            "last_event": case(
+                (upsert.excluded.last_event > table.c.last_event, upsert.excluded.last_event),
+                else_=table.c.last_event
+            ),
+            "student_sketch": upsert.excluded.student_sketch,
+        }
+    )
+    db.execute(upsert, [
+        {
+            "course_id": course_id,
+            "action": action,
+            "assessment_type": assessment_type,
+            "bucket_start": start,
+            "event_count": delta.count,
+            "last_event": delta.last_event,
+            "student_sketch": delta.sketch.to_bytes(),
+        }
+        for (course_id, action, assessment_type, start), delta in deltas.items()
+    ])
+    return len(deltas)
+
+
+def rebuild_rollups(db: Session, course_id: Optional[str] = None, chunk_size: int = 10000) -> int:
+    """
+    Compaction job: recompute rollups from raw ai_use_logs (one course, or all),
+    streaming the logs in chunks. Rows still waiting to be sealed are left to the
+    sealer, which folds them. Returns the number of logs folded in.
+    """
+    rollups = db.query(AIUseRollupORM)
+    logs = db.query(
+        AIUseLogORM.course_id, AIUseLogORM.action, AIUseLogORM.assessment_type,
+        AIUseLogORM.actor_id_pseudonym, AIUseLogORM.timestamp
+    ).filter(not_(_PENDING))
+    if course_id:
+        rollups = rollups.filter(AIUseRollupORM.course_id == course_id)
+        logs = logs.filter(AIUseLogORM.course_id == course_id)
+    try:
+        # The chain head lock keeps sealers from folding rows while the rollups are rebuilt
+        db.query(LedgerHeadORM).filter(LedgerHeadORM.id == 1).with_for_update().one_or_none()
+        rollups.delete(synchronize_session=False)
+        total = 0
+        chunk: List[LedgerEvent] = []
+        # Materialize each chunk before writing so the streaming cursor stays valid
+        for row in logs.yield_per(chunk_size):
+            chunk.append(tuple(row))
+            if len(chunk) >= chunk_size:
+                total += len(chunk)
+                update_rollups(db, chunk)
+                chunk = []
+        if chunk:
+            total += len(chunk)
+            update_rollups(db, chunk)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return total
+
+
+def rollups_statement(course_id: str, since: datetime):
+    return select(AIUseRollupORM).where(
+        AIUseRollupORM.course_id == course_id,
+        AIUseRollupORM.bucket_start >= bucket_start(since)
+    )
+
+
+def read_rollups(db: Session, course_id: str, since: datetime) -> List[AIUseRollupORM]:
+    return db.execute(rollups_statement(course_id, since)).scalars().all()
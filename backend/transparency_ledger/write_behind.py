@@ -0,0 +1,258 @@
+"""
+Write-behind queue for transparency ledger logging
+
+Decision requests enqueue a compact record and return; a background thread writes
+batches when batch_size records are waiting or flush_interval has passed, sealing
+each flush as one Merkle batch (see merkle.py).
+
+- Bounded memory: the queue holds at most maxsize records
+- Backpressure when full: "block" waits up to enqueue_timeout and then writes
+  synchronously, "sync" writes synchronously at once, "drop" discards (counted);
+  once a submit_many() call overflows, the rest of its records go into the same
+  synchronous write instead of waiting again
+- Drains on stop(): the app calls it on shutdown (main.py lifespan), and an atexit
+  hook registered once per writer covers other exits
+- stats() reports queue depth and flush latency; expose_metrics() puts them on /metrics
+"""
+
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from . import log_batch_to_transparency_ledger
+from metrics import registry as metrics
+
+BACKPRESSURE_MODES = ("block", "sync", "drop")
+
+# How often an idle or gathering flusher re-checks for stop()
+_POLL_SECONDS = 0.1
+_EXIT_DRAIN_SECONDS = 30.0
+
+
+class LedgerRecord(NamedTuple):
+    """One ledger row as captured at decision time."""
+    course_id: str
+    actor_id_pseudonym: str
+    action: str
+    assessment_type: str
+    policy_id: str
+    decision: str
+    timestamp: datetime
+
+
+class LedgerWriteBehind:
+    """Bounded queue plus one flusher thread writing ledger records in batches."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        maxsize: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        backpressure: str = "block",
+        enqueue_timeout: float = 0.05,
+        max_retries: int = 3
+    ):
+        if backpressure not in BACKPRESSURE_MODES:
+            raise ValueError(f"backpressure must be one of {BACKPRESSURE_MODES}")
+        self._session_factory = session_factory
+        self._queue: "queue.Queue[LedgerRecord]" = queue.Queue(maxsize=maxsize)
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.backpressure = backpressure
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._atexit_registered = False
+        self._lock = threading.Lock()
+        self._enqueued = 0
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._sync_writes = 0
+        self._max_depth = 0
+        self._flushes = 0
+        self._flush_seconds = 0.0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._last_batch_size = 0
+
+    def start(self) -> None:
+        """Start the flusher thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="ledger-write-behind", daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                # Drain at interpreter exit, without hanging shutdown on a dead database
+                atexit.register(self.stop, _EXIT_DRAIN_SECONDS)
+                self._atexit_registered = True
+
+    def submit(self, entry: Dict[str, Any]) -> bool:
+        """Queue one record (log_to_transparency_ledger() fields). False if it was dropped."""
+        return self.submit_many([entry]) == 1
+
+    def submit_many(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """Queue records, applying backpressure when full. Returns how many were accepted."""
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        now = datetime.utcnow()
+        overflow: List[LedgerRecord] = []
+        accepted = 0
+        for e in entries:
+            record = LedgerRecord(
+                e["course_id"], e["actor_id_pseudonym"], e["action"], e["assessment_type"],
+                e["policy_id"], e["decision"], e.get("timestamp") or now
+            )
+            if overflow:
+                # Already overflowing: this call's remaining records join the synchronous write
+                overflow.append(record)
+                accepted += 1
+                continue
+            try:
+                if self.backpressure == "block":
+                    self._queue.put(record, timeout=self.enqueue_timeout)
+                else:
+                    self._queue.put_nowait(record)
+            except queue.Full:
+                if self.backpressure == "drop":
+                    with self._lock:
+                        self._dropped += 1
+                    continue
+                overflow.append(record)
+            accepted += 1
+
+        with self._lock:
+            self._enqueued += accepted - len(overflow)
+            self._max_depth = max(self._max_depth, self._queue.qsize())
+        if overflow:
+            # Queue full: the caller pays for the write instead of growing memory (not the
+            # head lock: these rows are left to merkle.seal_pending())
+            self._write(overflow, seal=False)
+            with self._lock:
+                self._sync_writes += len(overflow)
+        return accepted
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued record has been written (or failed). False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Drain the queue and stop the flusher thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopping.set()
+        thread.join(timeout)
+        if not thread.is_alive():
+            self._thread = None
+
+    def _take(self) -> List[LedgerRecord]:
+        """Wait for a first record, then gather more until batch_size or flush_interval."""
+        try:
+            batch = [self._queue.get(timeout=_POLL_SECONDS)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0 or self._stopping.is_set():
+                    # Past the interval or stopping: take only what is already queued
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=min(remaining, _POLL_SECONDS)))
+            except queue.Empty:
+                if remaining <= 0 or self._stopping.is_set():
+                    break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take()
+            if batch:
+                started = time.perf_counter()
+                written = self._write(batch)
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self._flushes += 1
+                    self._flush_seconds += elapsed
+                    self._last_flush_ms = elapsed * 1000
+                    self._max_flush_ms = max(self._max_flush_ms, self._last_flush_ms)
+                    self._last_batch_size = len(batch)
+                    self._written += written
+                for _ in batch:
+                    self._queue.task_done()
+            elif self._stopping.is_set() and self._queue.empty():
+                return
+
+    def _write(self, records: List[LedgerRecord], seal: bool = True) -> int:
+        entries = [r._asdict() for r in records]
+        for attempt in range(1, self.max_retries + 1):
+            db = self._session_factory()
+            try:
+                return log_batch_to_transparency_ledger(entries, db, seal=seal)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"Warning: Failed to write {len(entries)} ledger records: {e}")
+                else:
+                    time.sleep(0.1 * attempt)
+            finally:
+                db.close()
+        with self._lock:
+            self._failed += len(entries)
+        return 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_depth,
+                "capacity": self.maxsize,
+                "backpressure": self.backpressure,
+                "enqueued": self._enqueued,
+                "written": self._written,
+                "sync_writes": self._sync_writes,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "flushes": self._flushes,
+                "last_batch_size": self._last_batch_size,
+                "last_flush_ms": self._last_flush_ms,
+                "avg_flush_ms": (self._flush_seconds * 1000 / self._flushes) if self._flushes else 0.0,
+                "max_flush_ms": self._max_flush_ms,
+            }
+
+    def expose_metrics(self) -> None:
+        """Report queue depth and record counters on /metrics (ledger_write_behind_*)."""
+        metrics.expose_stats(
+            "ledger_write_behind", self.stats,
+            counters={
+                "enqueued": "Records accepted into the queue",
+                "written": "Records written by the flusher thread",
+                "sync_writes": "Records written by the caller because the queue was full",
+                "dropped": "Records discarded because the queue was full (backpressure=drop)",
+                "failed": "Records lost after every write retry failed",
+                "flushes": "Batches written by the flusher thread",
+            },
+            gauges={
+                "queue_depth": "Records waiting to be written",
+                "max_queue_depth": "Deepest the queue has been since start",
+                "capacity": "Queue bound (Settings.ledger_queue_size)",
+            }
+        )